@@ -1,4 +1,15 @@
+from ._codec import JsonCodec
+from ._deadline import DeadlineExceeded, deadline
+from ._hashing import ChecksumMismatchError
+from ._hedging import HedgePolicy
+from ._pipeline import Call, Middleware
+from ._progress import Progress, ProgressReporter, TransferMonitor
+from ._retry_events import RetryEvent, RetryStats, retry_stats
 from ._retry_strategy import RetryStrategy
+from ._scheduler import PriorityScheduler
+from ._throttle import BandwidthLimiter, set_process_bandwidth_limit
+from ._upload_journal import UploadJournal
+from ._upload_queue import UploadQueue
 from .sumo_client import SumoClient
 
 try:
@@ -8,4 +19,25 @@ try:
 except ImportError:
     __version__ = "0.0.0"
 
-__all__ = ["RetryStrategy", "SumoClient"]
+__all__ = [
+    "BandwidthLimiter",
+    "Call",
+    "ChecksumMismatchError",
+    "DeadlineExceeded",
+    "HedgePolicy",
+    "JsonCodec",
+    "Middleware",
+    "PriorityScheduler",
+    "Progress",
+    "ProgressReporter",
+    "RetryEvent",
+    "RetryStats",
+    "RetryStrategy",
+    "SumoClient",
+    "TransferMonitor",
+    "UploadJournal",
+    "UploadQueue",
+    "deadline",
+    "retry_stats",
+    "set_process_bandwidth_limit",
+]
@@ -9,17 +9,15 @@ from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from urllib.parse import parse_qs
 
-import jwt
-import msal
 import tenacity as tn
-from azure.identity import ManagedIdentityCredential
-from msal_extensions.persistence import FilePersistence
-from msal_extensions.token_cache import PersistedTokenCache
 
-from ._retry_strategy import _log_retry_info, _return_last_value
+from ._deadline import stop_at_deadline
+from ._retry_events import log_retry
+from ._retry_strategy import _return_last_value
 
-if not sys.platform.startswith("linux"):
-    from msal_extensions import build_encrypted_persistence
+# msal, msal_extensions, azure.identity and jwt are slow to import, so
+# they are imported by the auth providers that use them. Processes that
+# authenticate with a shared key or an access token do not pay for MSAL.
 
 
 def scope_for_resource(resource_id):
@@ -56,13 +54,13 @@ class AuthProvider:
 
     @tn.retry(
         retry=tn.retry_if_exception(_maybe_nfs_exception),
-        stop=tn.stop_after_attempt(6),
+        stop=tn.stop_after_attempt(6) | stop_at_deadline(),
         wait=(
             tn.wait_exponential(multiplier=0.5, exp_base=2)
             + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
         ),
         retry_error_callback=_return_last_value,
-        before_sleep=_log_retry_info,
+        before_sleep=log_retry,
     )
     def get_token(self):
         accounts = self._app.get_accounts()
@@ -98,14 +96,41 @@ class AuthProvider:
     def delete_token(self):
         return False
 
+    def reset_after_fork(self):
+        """Replace the connection pools of the MSAL application's HTTP
+        session, which are shared with the parent process after fork.
+
+        The inherited pools are dropped without being closed, as their
+        sockets are still in use by the parent.
+        """
+        # Providers such as AuthProviderAccessToken have no application
+        throttled = getattr(getattr(self, "_app", None), "http_client", None)
+        session = getattr(throttled, "http_client", None)
+        adapters = getattr(session, "adapters", None)
+        if not adapters:
+            return
+        for prefix, adapter in list(adapters.items()):
+            session.mount(
+                prefix, type(adapter)(max_retries=adapter.max_retries)
+            )
+
 
 class AuthProviderNone(AuthProvider):
     def get_token(self):
         raise Exception("No valid authorization provider found.")
 
 
+class AuthProviderReplay(AuthProvider):
+    """Used when replaying recorded traffic; sends no credentials."""
+
+    def get_token(self):
+        return None
+
+
 class AuthProviderSilent(AuthProvider):
     def __init__(self, client_id, authority, resource_id):
+        import msal
+
         super().__init__(resource_id)
         cache = get_token_cache(resource_id, ".token")
         self._app = msal.PublicClientApplication(
@@ -118,6 +143,8 @@ class AuthProviderSilent(AuthProvider):
 
 class AuthProviderAccessToken(AuthProvider):
     def __init__(self, access_token):
+        import jwt
+
         self._access_token = access_token
         payload = jwt.decode(access_token, options={"verify_signature": False})
         self._expires = payload["exp"]
@@ -132,6 +159,8 @@ class AuthProviderAccessToken(AuthProvider):
 
 class AuthProviderRefreshToken(AuthProvider):
     def __init__(self, refresh_token, client_id, authority, resource_id):
+        import msal
+
         super().__init__(resource_id)
         self._app = msal.PublicClientApplication(
             client_id=client_id, authority=authority
@@ -142,13 +171,13 @@ class AuthProviderRefreshToken(AuthProvider):
 
 @tn.retry(
     retry=tn.retry_if_exception(_maybe_nfs_exception),
-    stop=tn.stop_after_attempt(6),
+    stop=tn.stop_after_attempt(6) | stop_at_deadline(),
     wait=(
         tn.wait_exponential(multiplier=0.5, exp_base=2)
         + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
     ),
     retry_error_callback=_return_last_value,
-    before_sleep=_log_retry_info,
+    before_sleep=log_retry,
 )
 def get_token_cache(resource_id, suffix):
     # https://github.com/AzureAD/microsoft-authentication-extensions-\
@@ -156,6 +185,8 @@ def get_token_cache(resource_id, suffix):
     # Encryption not supported on linux servers like rgs, and
     # neither is common usage from many cluster nodes.
     # Encryption is supported on Windows and Mac.
+    from msal_extensions.persistence import FilePersistence
+    from msal_extensions.token_cache import PersistedTokenCache
 
     cache = None
     token_path = get_token_path(resource_id, suffix)
@@ -163,6 +194,8 @@ def get_token_cache(resource_id, suffix):
         persistence = FilePersistence(token_path)
         cache = PersistedTokenCache(persistence)
     else:
+        from msal_extensions import build_encrypted_persistence
+
         if os.path.exists(token_path):
             encrypted_persistence = build_encrypted_persistence(token_path)
             try:
@@ -181,13 +214,13 @@ def get_token_cache(resource_id, suffix):
 
 @tn.retry(
     retry=tn.retry_if_exception(_maybe_nfs_exception),
-    stop=tn.stop_after_attempt(6),
+    stop=tn.stop_after_attempt(6) | stop_at_deadline(),
     wait=(
         tn.wait_exponential(multiplier=0.5, exp_base=2)
         + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
     ),
     retry_error_callback=_return_last_value,
-    before_sleep=_log_retry_info,
+    before_sleep=log_retry,
 )
 def protect_token_cache(resource_id, suffix, case_uuid=None):
     token_path = get_token_path(resource_id, suffix, case_uuid)
@@ -205,6 +238,8 @@ def protect_token_cache(resource_id, suffix, case_uuid=None):
 
 class AuthProviderInteractive(AuthProvider):
     def __init__(self, client_id, authority, resource_id):
+        import msal
+
         super().__init__(resource_id)
         cache = get_token_cache(resource_id, ".token")
         self._app = msal.PublicClientApplication(
@@ -219,13 +254,13 @@ class AuthProviderInteractive(AuthProvider):
 
     @tn.retry(
         retry=tn.retry_if_exception(_maybe_nfs_exception),
-        stop=tn.stop_after_attempt(6),
+        stop=tn.stop_after_attempt(6) | stop_at_deadline(),
         wait=(
             tn.wait_exponential(multiplier=0.5, exp_base=2)
             + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
         ),
         retry_error_callback=_return_last_value,
-        before_sleep=_log_retry_info,
+        before_sleep=log_retry,
     )
     def login(self):
         scopes = [self._scope + " offline_access"]
@@ -271,6 +306,8 @@ class AuthProviderInteractive(AuthProvider):
 
 class AuthProviderDeviceCode(AuthProvider):
     def __init__(self, client_id, authority, resource_id):
+        import msal
+
         super().__init__(resource_id)
         cache = get_token_cache(resource_id, ".token")
         self._app = msal.PublicClientApplication(
@@ -283,13 +320,13 @@ class AuthProviderDeviceCode(AuthProvider):
 
     @tn.retry(
         retry=tn.retry_if_exception(_maybe_nfs_exception),
-        stop=tn.stop_after_attempt(6),
+        stop=tn.stop_after_attempt(6) | stop_at_deadline(),
         wait=(
             tn.wait_exponential(multiplier=0.5, exp_base=2)
             + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
         ),
         retry_error_callback=_return_last_value,
-        before_sleep=_log_retry_info,
+        before_sleep=log_retry,
     )
     def login(self):
         try:
@@ -340,19 +377,21 @@ class AuthProviderDeviceCode(AuthProvider):
 
 class AuthProviderManaged(AuthProvider):
     def __init__(self, resource_id):
+        from azure.identity import ManagedIdentityCredential
+
         super().__init__(resource_id)
         self._app = ManagedIdentityCredential()
         self._scope = scope_for_resource(resource_id)
 
     @tn.retry(
         retry=tn.retry_if_exception(_maybe_nfs_exception),
-        stop=tn.stop_after_attempt(6),
+        stop=tn.stop_after_attempt(6) | stop_at_deadline(),
         wait=(
             tn.wait_exponential(multiplier=0.5, exp_base=2)
             + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
         ),
         retry_error_callback=_return_last_value,
-        before_sleep=_log_retry_info,
+        before_sleep=log_retry,
     )
     def get_token(self):
         return self._app.get_token(self._scope).token
@@ -361,13 +400,13 @@ class AuthProviderManaged(AuthProvider):
 class AuthProviderSumoToken(AuthProvider):
     @tn.retry(
         retry=tn.retry_if_exception(_maybe_nfs_exception),
-        stop=tn.stop_after_attempt(6),
+        stop=tn.stop_after_attempt(6) | stop_at_deadline(),
         wait=(
             tn.wait_exponential(multiplier=0.5, exp_base=2)
             + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
         ),
         retry_error_callback=_return_last_value,
-        before_sleep=_log_retry_info,
+        before_sleep=log_retry,
     )
     def __init__(self, resource_id, case_uuid=None):
         super().__init__(resource_id)
@@ -390,13 +429,13 @@ class AuthProviderSumoToken(AuthProvider):
 
 @tn.retry(
     retry=tn.retry_if_exception(_maybe_nfs_exception),
-    stop=tn.stop_after_attempt(6),
+    stop=tn.stop_after_attempt(6) | stop_at_deadline(),
     wait=(
         tn.wait_exponential(multiplier=0.5, exp_base=2)
         + tn.wait_random_exponential(multiplier=0.5, exp_base=2)
     ),
     retry_error_callback=_return_last_value,
-    before_sleep=_log_retry_info,
+    before_sleep=log_retry,
 )
 def get_auth_provider(
     client_id,
@@ -0,0 +1,226 @@
+import asyncio
+import collections
+import contextlib
+import contextvars
+import itertools
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+
+# Stays below httpx's default keep-alive pool size (20), so batched
+# requests reuse pooled connections instead of opening new ones.
+DEFAULT_MAX_WORKERS = 8
+
+_END = object()
+
+
+def batched(items, size: int):
+    """Split an iterable into lists of at most *size* items, lazily."""
+    items = iter(items)
+    while batch := list(itertools.islice(items, size)):
+        yield batch
+
+
+def run_in_threads(
+    func,
+    items,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    return_exceptions: bool = False,
+    cancel_event: threading.Event | None = None,
+) -> list:
+    """Call *func* on each item over a bounded thread pool.
+
+    Each call runs in a copy of the caller's context, so context
+    variables are visible to the worker threads.
+
+    Args:
+        func: callable taking a single item
+        items: iterable of items
+        max_workers: maximum number of concurrent calls
+        return_exceptions: if True, exceptions are returned in place of
+            results. If False, the first failure cancels the items that
+            have not started yet and is raised.
+        cancel_event: when set, items that have not started yet are
+            cancelled (they fail with CancelledError).
+
+    Returns:
+        Results, in the same order as *items*.
+    """
+
+    def _call(item):
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError()
+        return func(item)
+
+    items = list(items)
+    results = [None] * len(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(contextvars.copy_context().run, _call, item): i
+            for i, item in enumerate(items)
+        }
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as ex:
+                if not return_exceptions:
+                    raise
+                results[futures[future]] = ex
+    finally:
+        # On failure or interrupt, drop the work that has not started.
+        executor.shutdown(wait=True, cancel_futures=True)
+    return results
+
+
+def iter_in_threads(
+    func,
+    items,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True,
+    return_exceptions: bool = False,
+):
+    """Call *func* on each item over a bounded thread pool, yielding
+    (item, result) pairs as they become available.
+
+    At most *max_workers* calls are started ahead of the consumer, so
+    results that have not been consumed yet do not pile up.
+
+    Args:
+        func: callable taking a single item
+        items: iterable of items
+        max_workers: maximum number of concurrent calls
+        ordered: yield in the order of *items*; otherwise in completion
+            order
+        return_exceptions: if True, exceptions are yielded in place of
+            results. If False, the first failure is raised and the
+            remaining calls are cancelled.
+    """
+    items = iter(items)
+    pending = collections.deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _fill():
+        while len(pending) < max_workers:
+            item = next(items, _END)
+            if item is _END:
+                return
+            future = executor.submit(
+                contextvars.copy_context().run, func, item
+            )
+            pending.append((item, future))
+
+    try:
+        _fill()
+        while pending:
+            if ordered:
+                item, future = pending.popleft()
+            else:
+                futures = {future: i for i, (_, future) in enumerate(pending)}
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                item, future = pending[futures[next(iter(done))]]
+                pending.remove((item, future))
+            try:
+                result = future.result()
+            except Exception as ex:
+                if not return_exceptions:
+                    raise
+                result = ex
+            _fill()
+            yield item, result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def iter_in_tasks(
+    func,
+    items,
+    max_concurrency: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True,
+    return_exceptions: bool = False,
+):
+    """Async counterpart of iter_in_threads: await *func(item)* for each
+    item, at most *max_concurrency* at a time, yielding (item, result)
+    pairs. Calls still running when the consumer stops are cancelled."""
+    items = iter(items)
+    pending = collections.deque()
+
+    def _fill():
+        while len(pending) < max_concurrency:
+            item = next(items, _END)
+            if item is _END:
+                return
+            pending.append((item, asyncio.ensure_future(func(item))))
+
+    try:
+        _fill()
+        while pending:
+            if ordered:
+                item, task = pending[0]
+                await asyncio.wait([task])
+                pending.popleft()
+            else:
+                tasks = {task: i for i, (_, task) in enumerate(pending)}
+                done, _ = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                item, task = pending[tasks[next(iter(done))]]
+                pending.remove((item, task))
+            try:
+                result = task.result()
+            except Exception as ex:
+                if not return_exceptions:
+                    raise
+                result = ex
+            _fill()
+            yield item, result
+    finally:
+        for _, task in pending:
+            task.cancel()
+        for _, task in pending:
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+
+
+async def run_in_task_group(
+    func,
+    items,
+    max_concurrency: int = DEFAULT_MAX_WORKERS,
+    return_exceptions: bool = False,
+) -> list:
+    """Await *func(item)* for each item in an asyncio.TaskGroup, at most
+    *max_concurrency* at a time, and return the results in input order.
+
+    Without return_exceptions, the first failure cancels the calls still
+    running and is raised once they have all stopped; with it, failures
+    are returned in place of results. Cancelling the caller cancels all
+    calls, so no request outlives the batch.
+    """
+    items = enumerate(items)
+    results = {}
+
+    async def _worker():
+        # Workers share the iterator, so at most max_concurrency calls
+        # exist at any time, however many items there are.
+        for index, item in items:
+            try:
+                results[index] = await func(item)
+            except Exception as ex:
+                if not return_exceptions:
+                    raise
+                results[index] = ex
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for _ in range(max_concurrency):
+                group.create_task(_worker())
+    except ExceptionGroup as failures:
+        # Raise the first failure, like the other batch helpers; calls
+        # failing at the same time are rare, and chained here.
+        raise failures.exceptions[0] from failures
+    return [results[index] for index in range(len(results))]
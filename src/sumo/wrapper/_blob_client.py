@@ -1,60 +1,402 @@
-from ._decorators import (
-    raise_for_status,
-    raise_for_status_async,
+import asyncio
+import base64
+import logging
+import threading
+
+import httpx
+
+from ._batch import DEFAULT_MAX_WORKERS, run_in_threads
+from ._buffers import as_bytes_view, nbytes, request_content
+from ._deadline import attempt_timeout
+from ._hashing import (
+    BlockHasher,
+    HashIndex,
+    UploadStats,
+    blob_key,
+    hex_to_base64,
+    md5_hexdigest,
 )
+from ._pipeline import Call, Pipeline, RaiseForStatus, Retry, Scheduling
+from ._progress import ProgressTracker
+from ._scheduler import PriorityScheduler
+from ._throttle import BandwidthLimiter, active_limiters
+
+logger = logging.getLogger("sumo.wrapper")
+
+# Verified uploads of larger blobs are sent as blocks of this size, so
+# the blob is hashed while it is sent instead of in a pass before.
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _skipped_response(url):
+    """Response returned in place of an upload that was skipped because
+    the blob is unchanged."""
+    return httpx.Response(
+        200,
+        request=httpx.Request("PUT", url),
+        extensions={"skipped": True},
+    )
+
+
+def _with_params(url, **params) -> str:
+    return str(httpx.URL(url).copy_merge_params(params))
+
+
+def _block_id(index) -> str:
+    # Block ids of a blob must all have the same length
+    return base64.b64encode(f"{index:08d}".encode()).decode()
+
+
+def _block_list(block_ids) -> bytes:
+    latest = "".join(f"<Latest>{block_id}</Latest>" for block_id in block_ids)
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        f"<BlockList>{latest}</BlockList>"
+    ).encode()
+
+
+def _tracker(progress, url, size):
+    if progress is None:
+        return None
+    return ProgressTracker(progress, blob_key(url), size)
 
 
 class BlobClient:
     """Upload blobs to blob store using pre-authorized URLs"""
 
-    def __init__(self, client, async_client, timeout, retry_strategy):
+    def __init__(
+        self,
+        client,
+        async_client,
+        timeout,
+        retry_strategy,
+        hash_index: HashIndex | None = None,
+        stats: UploadStats | None = None,
+        scheduler: PriorityScheduler | None = None,
+        middleware: list | None = None,
+        bandwidth_limiter: BandwidthLimiter | None = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
         self._client = client
         self._async_client = async_client
         self._timeout = timeout
         self._retry_strategy = retry_strategy
+        self._hash_index = hash_index
+        self.stats = stats if stats is not None else UploadStats()
+        self._bandwidth_limiter = bandwidth_limiter
+        self._block_size = block_size
+        stack = [RaiseForStatus(), *(middleware or []), Retry(retry_strategy)]
+        if scheduler is not None:
+            stack.append(Scheduling(scheduler))
+        self.pipeline = Pipeline(stack)
 
-    @raise_for_status
-    def upload_blob(self, blob: bytes, url: str):
-        """Upload a blob.
+    def _send(self, call: Call) -> httpx.Response:
+        return self._client.request(
+            call.method,
+            call.url,
+            headers=call.headers,
+            content=call.content(),
+            timeout=attempt_timeout(self._timeout),
+        )
 
-        Parameters:
-            blob: byte string to upload
-            url: pre-authorized URL to blob store
-        """
+    async def _send_async(self, call: Call) -> httpx.Response:
+        return await self._async_client.request(
+            call.method,
+            call.url,
+            headers=call.headers,
+            content=call.content(),
+            timeout=attempt_timeout(self._timeout),
+        )
+
+    def _is_unchanged(self, md5, url, checksum_md5, nbytes) -> bool:
+        previous = checksum_md5
+        if previous is None and self._hash_index is not None:
+            previous = self._hash_index.get(url)
+        if previous is None or previous.lower() != md5:
+            return False
+        logger.info(f"Blob unchanged, skipped upload of {nbytes} bytes")
+        self.stats.add_skipped(nbytes)
+        return True
 
+    def _record_uploaded(self, md5, url, nbytes):
+        self.stats.add_uploaded(nbytes)
+        if md5 is not None and self._hash_index is not None:
+            self._hash_index.set(url, md5)
+
+    def _put_call(
+        self,
+        blob,
+        url,
+        md5,
+        tracker,
+        priority="normal",
+        asynchronous=False,
+    ):
         headers = {
             "Content-Type": "application/octet-stream",
             "x-ms-blob-type": "BlockBlob",
         }
+        if md5 is not None:
+            headers["Content-MD5"] = hex_to_base64(md5)
+        make_content, content_headers = request_content(
+            blob,
+            asynchronous=asynchronous,
+            tracker=tracker,
+            limiters=active_limiters(self._bandwidth_limiter),
+        )
+        headers.update(content_headers)
+        return Call(
+            "PUT",
+            url,
+            headers=headers,
+            make_content=make_content,
+            priority=priority,
+        )
 
-        def _put():
-            return self._client.put(
-                url, content=blob, headers=headers, timeout=self._timeout
-            )
+    def _blocks(self, blob):
+        view = as_bytes_view(blob)
+        return [
+            view[start : start + self._block_size]
+            for start in range(0, len(view), self._block_size)
+        ]
 
-        retryer = self._retry_strategy.make_retryer()
+    def _block_call(self, url, index, block, md5, priority, asynchronous):
+        make_content, headers = request_content(
+            block,
+            asynchronous=asynchronous,
+            limiters=active_limiters(self._bandwidth_limiter),
+        )
+        headers["Content-MD5"] = md5
+        return Call(
+            "PUT",
+            _with_params(url, comp="block", blockid=_block_id(index)),
+            headers=headers,
+            make_content=make_content,
+            priority=priority,
+        )
 
-        return retryer(_put)
+    def _block_list_call(self, url, n_blocks, md5, priority):
+        body = _block_list(_block_id(index) for index in range(n_blocks))
+        headers = {
+            "Content-Type": "application/xml",
+            "x-ms-blob-content-type": "application/octet-stream",
+            "x-ms-blob-content-md5": hex_to_base64(md5),
+        }
+        return Call(
+            "PUT",
+            _with_params(url, comp="blocklist"),
+            headers=headers,
+            make_content=lambda: body,
+            priority=priority,
+        )
 
-    @raise_for_status_async
-    async def upload_blob_async(self, blob: bytes, url: str):
-        """Upload a blob async.
+    def _upload_blocks(self, blob, url, tracker):
+        """Upload a blob as blocks, each with its MD5, then commit them
+        with the MD5 of the whole blob.
+
+        Returns:
+            (response, md5) of the block list commit
+        """
+        blocks = self._blocks(blob)
+        hasher = BlockHasher(blocks)
+        try:
+            for index, block in enumerate(blocks):
+                call = self._block_call(
+                    url,
+                    index,
+                    block,
+                    hasher.block_md5(index),
+                    "normal",
+                    asynchronous=False,
+                )
+                self.pipeline.send(call, self._send)
+                if tracker is not None:
+                    tracker.update(len(block))
+            md5 = hasher.hexdigest()
+            call = self._block_list_call(url, len(blocks), md5, "normal")
+            return self.pipeline.send(call, self._send), md5
+        finally:
+            hasher.close()
+
+    async def _upload_blocks_async(self, blob, url, tracker, priority):
+        blocks = self._blocks(blob)
+        hasher = BlockHasher(blocks)
+        try:
+            for index, block in enumerate(blocks):
+                call = self._block_call(
+                    url,
+                    index,
+                    block,
+                    await hasher.block_md5_async(index),
+                    priority,
+                    asynchronous=True,
+                )
+                await self.pipeline.send_async(call, self._send_async)
+                if tracker is not None:
+                    tracker.update(len(block))
+            md5 = hasher.hexdigest()
+            call = self._block_list_call(url, len(blocks), md5, priority)
+            response = await self.pipeline.send_async(call, self._send_async)
+            return response, md5
+        finally:
+            hasher.close()
+
+    def upload_blob(
+        self,
+        blob: bytes | memoryview,
+        url: str,
+        skip_unchanged: bool = False,
+        checksum_md5: str | None = None,
+        progress=None,
+        verify: bool = False,
+    ):
+        """Upload a blob.
 
         Parameters:
-            blob: byte string to upload
+            blob: bytes, or any object supporting the buffer protocol
+                (bytearray, memoryview, mmap, numpy array), uploaded
+                without copying
             url: pre-authorized URL to blob store
+            skip_unchanged: compute the MD5 of the blob and skip the
+                upload if it matches checksum_md5, or the hash recorded
+                for this blob in the client's hash index
+            checksum_md5: MD5 (hex) of the blob already stored, e.g. from
+                the existing object's metadata
+            progress: callback receiving a Progress as the blob is sent,
+                e.g. a ProgressReporter or TransferMonitor
+            verify: send the MD5 of the blob, so that blob store rejects
+                a corrupted upload and stores the MD5 for verifying
+                downloads. Blobs larger than the block size are sent as
+                blocks, each with its own MD5, and hashed while they are
+                sent; smaller blobs are hashed before they are sent.
+
+        Returns:
+            The response. A skipped upload returns a 200 response with
+            response.extensions["skipped"] set, without contacting the
+            blob store.
         """
 
-        headers = {
-            "Content-Type": "application/octet-stream",
-            "x-ms-blob-type": "BlockBlob",
-        }
+        size = nbytes(blob)
+        md5 = None
+        if skip_unchanged:
+            md5 = md5_hexdigest(blob)
+            if self._is_unchanged(md5, url, checksum_md5, size):
+                return _skipped_response(url)
 
-        async def _put():
-            return await self._async_client.put(
-                url=url, content=blob, headers=headers, timeout=self._timeout
-            )
+        tracker = _tracker(progress, url, size)
+        if verify and md5 is None and size > self._block_size:
+            response, md5 = self._upload_blocks(blob, url, tracker)
+        else:
+            # Content-MD5 is a header, so it is needed before the body is
+            # sent; a blob of one block cannot be hashed while it is sent.
+            if verify and md5 is None:
+                md5 = md5_hexdigest(blob)
+            call = self._put_call(blob, url, md5 if verify else None, tracker)
+            response = self.pipeline.send(call, self._send)
+        if response.is_success:
+            self._record_uploaded(md5, url, size)
+            if tracker is not None:
+                tracker.finish()
+        return response
+
+    def upload_blobs(
+        self,
+        pairs,
+        skip_unchanged: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+        cancel_event: threading.Event | None = None,
+        progress=None,
+        verify: bool = False,
+    ) -> list:
+        """Upload several blobs concurrently, using a bounded pool of
+        threads sharing the client's connection pool.
+
+        Parameters:
+            pairs: iterable of (blob, url) tuples
+            skip_unchanged: skip blobs whose hash matches the client's
+                hash index; see upload_blob
+            max_workers: maximum number of concurrent uploads
+            return_exceptions: return exceptions in place of responses
+                instead of raising the first failure
+            cancel_event: threading.Event; when set, uploads that have
+                not started yet are cancelled
+            progress: progress callback used for every blob; pass a
+                TransferMonitor for aggregate progress
+            verify: send MD5 checksums; see upload_blob
+
+        Returns:
+            Responses (or exceptions), in the same order as pairs
+        """
+        return run_in_threads(
+            lambda pair: self.upload_blob(
+                *pair,
+                skip_unchanged=skip_unchanged,
+                progress=progress,
+                verify=verify,
+            ),
+            pairs,
+            max_workers=max_workers,
+            return_exceptions=return_exceptions,
+            cancel_event=cancel_event,
+        )
+
+    async def upload_blob_async(
+        self,
+        blob: bytes | memoryview,
+        url: str,
+        skip_unchanged: bool = False,
+        checksum_md5: str | None = None,
+        priority: str = "bulk",
+        progress=None,
+        verify: bool = False,
+    ):
+        """Upload a blob async.
+
+        Parameters:
+            blob: bytes, or any object supporting the buffer protocol
+                (bytearray, memoryview, mmap, numpy array), uploaded
+                without copying
+            url: pre-authorized URL to blob store
+            skip_unchanged: compute the MD5 of the blob and skip the
+                upload if it is unchanged; see upload_blob
+            checksum_md5: MD5 (hex) of the blob already stored
+            priority: priority class for the client's scheduler, if any
+            progress: progress callback; see upload_blob
+            verify: send MD5 checksums; see upload_blob
+
+        Returns:
+            The response; see upload_blob.
+        """
 
-        retryer = self._retry_strategy.make_retryer_async()
+        size = nbytes(blob)
+        md5 = None
+        if skip_unchanged:
+            # hashlib releases the GIL, so hashing in a thread keeps the
+            # event loop responsive for large blobs.
+            md5 = await asyncio.to_thread(md5_hexdigest, blob)
+            if self._is_unchanged(md5, url, checksum_md5, size):
+                return _skipped_response(url)
 
-        return await retryer(_put)
+        tracker = _tracker(progress, url, size)
+        if verify and md5 is None and size > self._block_size:
+            response, md5 = await self._upload_blocks_async(
+                blob, url, tracker, priority
+            )
+        else:
+            if verify and md5 is None:
+                md5 = await asyncio.to_thread(md5_hexdigest, blob)
+            call = self._put_call(
+                blob,
+                url,
+                md5 if verify else None,
+                tracker,
+                priority,
+                asynchronous=True,
+            )
+            response = await self.pipeline.send_async(call, self._send_async)
+        if response.is_success:
+            self._record_uploaded(md5, url, size)
+            if tracker is not None:
+                tracker.finish()
+        return response
@@ -0,0 +1,182 @@
+import os
+
+from ._throttle import THROTTLED_CHUNK_SIZE, pace, pace_async
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+def as_bytes_view(blob) -> memoryview:
+    """Flat, read-only byte view of a buffer-protocol object, without
+    copying.
+
+    Raises:
+        TypeError: if blob does not support the buffer protocol
+        ValueError: if blob is not contiguous in memory
+    """
+    view = memoryview(blob)
+    if not view.contiguous:
+        raise ValueError("Blob must be contiguous in memory.")
+    return view.cast("B").toreadonly()
+
+
+def nbytes(blob) -> int:
+    """Size in bytes of a buffer-protocol object; for numpy arrays
+    len() is the number of rows, not bytes."""
+    return memoryview(blob).nbytes
+
+
+def iter_chunks(
+    view: memoryview,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    tracker=None,
+    limiters=(),
+):
+    """Yield consecutive slices of view. Slicing a memoryview does not
+    copy. A ProgressTracker is updated as each chunk is consumed, and
+    each chunk waits for the bandwidth limiters."""
+    if tracker is not None:
+        tracker.restart()
+    for start in range(0, len(view), chunk_size):
+        chunk = view[start : start + chunk_size]
+        pace(limiters, len(chunk))
+        yield chunk
+        if tracker is not None:
+            tracker.update(len(chunk))
+
+
+async def aiter_chunks(
+    view: memoryview,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    tracker=None,
+    limiters=(),
+):
+    if tracker is not None:
+        tracker.restart()
+    for start in range(0, len(view), chunk_size):
+        chunk = view[start : start + chunk_size]
+        await pace_async(limiters, len(chunk))
+        yield chunk
+        if tracker is not None:
+            tracker.update(len(chunk))
+
+
+def request_content(blob, asynchronous=False, tracker=None, limiters=()):
+    """Prepare a payload for httpx without copying it.
+
+    bytes are passed on as they are. Other buffer-protocol objects
+    (bytearray, memoryview, mmap, numpy arrays, ...) are sent as
+    memoryview slices with an explicit Content-Length, as httpx would
+    otherwise iterate over their items or copy them. With a
+    ProgressTracker or bandwidth limiters, bytes are sent in slices too,
+    so progress can be reported and the upload paced while it is sent.
+
+    Returns:
+        (make_content, headers): make_content() returns the content for
+        one attempt; a new iterator is needed for every retry.
+    """
+    if blob is None or (
+        isinstance(blob, bytes) and tracker is None and not limiters
+    ):
+        return (lambda: blob), {}
+    view = as_bytes_view(blob)
+    headers = {"Content-Length": str(view.nbytes)}
+    chunk_size = THROTTLED_CHUNK_SIZE if limiters else DEFAULT_CHUNK_SIZE
+    iterate = aiter_chunks if asynchronous else iter_chunks
+    return (lambda: iterate(view, chunk_size, tracker, limiters)), headers
+
+
+def as_writable_view(buffer) -> memoryview:
+    """Flat, writable byte view of a buffer-protocol object, without
+    copying.
+
+    Raises:
+        TypeError: if buffer is read-only or does not support the buffer
+            protocol
+        ValueError: if buffer is not contiguous in memory
+    """
+    view = memoryview(buffer)
+    if view.readonly:
+        raise TypeError("Buffer must be writable.")
+    if not view.contiguous:
+        raise ValueError("Buffer must be contiguous in memory.")
+    return view.cast("B")
+
+
+class BufferWriter:
+    """Copy a response body, chunk by chunk, into a memoryview of exactly
+    the body's size."""
+
+    def __init__(self, view: memoryview, response):
+        self._view = view
+        self._offset = 0
+        content_length = response.headers.get("content-length")
+        # With a content encoding, Content-Length is the encoded size
+        if (
+            content_length is not None
+            and "content-encoding" not in response.headers
+            and int(content_length) != len(view)
+        ):
+            raise ValueError(
+                f"Blob is {content_length} bytes, buffer is {len(view)} bytes."
+            )
+
+    def write(self, chunk):
+        end = self._offset + len(chunk)
+        if end > len(self._view):
+            raise ValueError(
+                f"Blob is larger than buffer of {len(self._view)} bytes."
+            )
+        self._view[self._offset : end] = chunk
+        self._offset = end
+
+    def abort(self):
+        pass
+
+    def close(self) -> int:
+        if self._offset != len(self._view):
+            raise ValueError(
+                f"Blob is {self._offset} bytes, "
+                f"buffer is {len(self._view)} bytes."
+            )
+        return self._offset
+
+
+class BytesWriter:
+    """Collect a response body as bytes."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, chunk):
+        self._chunks.append(chunk)
+
+    def abort(self):
+        self._chunks = []
+
+    def close(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+class FileWriter:
+    """Write a response body to a file. The body is written to a
+    temporary file next to it, which replaces the file only once the
+    body is complete."""
+
+    def __init__(self, path):
+        self._path = path
+        self._part = f"{path}.part"
+        self._file = open(self._part, "wb")  # noqa: SIM115
+        self._size = 0
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self._size += len(chunk)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._part)
+
+    def close(self) -> int:
+        self._file.close()
+        os.replace(self._part, self._path)
+        return self._size
@@ -0,0 +1,37 @@
+import httpx
+
+# Documents per bulk request. Each batch is held in memory (so it can be
+# resent on retry), but is encoded line by line while it is sent.
+DEFAULT_BULK_BATCH_SIZE = 500
+
+# Responses meaning that the server has no bulk registration endpoint.
+# Servers without the route answer 404, which may also mean that the
+# parent object does not exist, so 404 only counts until the endpoint
+# has worked once.
+BULK_UNSUPPORTED = (405, 501)
+BULK_UNKNOWN_ROUTE = 404
+
+
+def ndjson_lines(documents, dumps):
+    """Encode documents as newline-delimited JSON, one at a time."""
+    for document in documents:
+        yield dumps(document) + b"\n"
+
+
+def item_result(line, loads, request):
+    """Parse one line of a bulk registration response.
+
+    Raises:
+        httpx.HTTPStatusError: if the line reports that the item failed
+    """
+    result = loads(line)
+    status = result.get("status", 200)
+    if status >= 400:
+        response = httpx.Response(status, json=result, request=request)
+        raise httpx.HTTPStatusError(
+            f"Bulk registration of item failed with status {status}: "
+            f"{result.get('error')}",
+            request=request,
+            response=response,
+        )
+    return result
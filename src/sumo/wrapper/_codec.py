@@ -0,0 +1,110 @@
+import importlib.util
+import json
+
+
+class JsonCodec:
+    """Serialize and parse JSON using the standard library."""
+
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+        ).encode("utf-8")
+
+    def loads(self, data: bytes | str):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Serialize and parse JSON using orjson."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def __reduce__(self):
+        return (OrjsonCodec, ())
+
+    def dumps(self, obj) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: bytes | str):
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    """Serialize and parse JSON using msgspec."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def __reduce__(self):
+        return (MsgspecCodec, ())
+
+    def dumps(self, obj) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes | str):
+        return self._decoder.decode(data)
+
+
+class DefaultCodec(JsonCodec):
+    """Serialize JSON using the standard library, and parse it using the
+    fastest available codec.
+
+    orjson and msgspec serialize some values differently: they reject
+    dictionaries with non-string keys, and orjson writes NaN as null.
+    Request bodies are therefore serialized like JsonCodec does, unless a
+    codec is chosen explicitly.
+    """
+
+    name = "default"
+
+    def __init__(self):
+        self._parser = get_codec(available_codecs()[0])
+
+    def __reduce__(self):
+        return (DefaultCodec, ())
+
+    def loads(self, data: bytes | str):
+        return self._parser.loads(data)
+
+
+def available_codecs() -> list[str]:
+    """Names of the usable JSON codecs, fastest first."""
+    codecs = [
+        name
+        for name in ("orjson", "msgspec")
+        if importlib.util.find_spec(name) is not None
+    ]
+    codecs.append("json")
+    return codecs
+
+
+def get_codec(codec: "str | JsonCodec | None" = None) -> JsonCodec:
+    """Return a codec instance.
+
+    Args:
+        codec: a JsonCodec instance, a codec name ("orjson", "msgspec"
+            or "json"), or None for DefaultCodec.
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        return DefaultCodec()
+    if codec not in available_codecs():
+        raise ValueError(f"Unsupported or unavailable JSON codec: {codec}")
+    return {
+        "orjson": OrjsonCodec,
+        "msgspec": MsgspecCodec,
+        "json": JsonCodec,
+    }[codec]()
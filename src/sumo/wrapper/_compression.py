@@ -0,0 +1,67 @@
+import gzip
+import importlib.util
+
+# zstandard and brotli are imported when their encoding is first used, so
+# that clients without compression do not pay for importing them.
+_MODULES = {"zstd": "zstandard", "br": "brotli"}
+
+
+# Bodies smaller than this are sent as-is; compressing them costs more
+# CPU than it saves on the wire.
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+
+def available_encodings() -> list[str]:
+    """Content encodings usable for request bodies, best first."""
+    encodings = [
+        encoding
+        for encoding, module in _MODULES.items()
+        if importlib.util.find_spec(module) is not None
+    ]
+    encodings.append("gzip")
+    return encodings
+
+
+def resolve_encoding(compression: str | None) -> str | None:
+    """Validate a compression setting, mapping "auto" to the best
+    available encoding."""
+    if compression is None:
+        return None
+    if compression == "auto":
+        compression = available_encodings()[0]
+    elif compression not in available_encodings():
+        raise ValueError(
+            f"Unsupported or unavailable compression: {compression}"
+        )
+    if compression in _MODULES:
+        # Import now rather than on the first request
+        importlib.import_module(_MODULES[compression])
+    return compression
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        # Level 6 is the usual sweet spot for repetitive JSON.
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(data, quality=5)
+    raise ValueError(f"Unsupported compression: {encoding}")
+
+
+def compress_body(
+    content: bytes, encoding: str | None, threshold: int
+) -> tuple[bytes, dict]:
+    """Compress a request body if enabled and large enough.
+
+    Returns:
+        The (possibly compressed) body, and the headers to send with it.
+    """
+    if encoding is None or len(content) < threshold:
+        return content, {}
+    return compress(content, encoding), {"Content-Encoding": encoding}
@@ -0,0 +1,129 @@
+import contextlib
+import contextvars
+import time
+
+import httpx
+from tenacity.stop import stop_base
+
+_current_deadline = contextvars.ContextVar("sumo_deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    """The overall deadline for a call expired."""
+
+    def __init__(self, message="Deadline exceeded.", *, request=None):
+        super().__init__(message, request=request)
+
+
+class Deadline:
+    """A point in time by which a call must complete."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+@contextlib.contextmanager
+def deadline(seconds: float | None):
+    """Bound the total time spent in Sumo calls made within the block,
+    including retries, waits between retries, auth refresh and polling.
+
+    Token refreshes are sent by MSAL with its own timeouts, so a refresh
+    is not started once the deadline has expired, but one in progress
+    may run past it.
+
+    Nested deadlines cannot extend an enclosing one. A value of None
+    leaves the current deadline, if any, unchanged.
+
+    Examples:
+        Bounding a sequence of calls::
+
+            with deadline(10):
+                case = sumo.get(f"/objects('{case_uuid}')")
+                children = sumo.get(f"/objects('{case_uuid}')/search")
+    """
+    if seconds is None:
+        yield _current_deadline.get()
+        return
+    new = Deadline(seconds)
+    current = _current_deadline.get()
+    if current is not None and current.expires_at < new.expires_at:
+        new = current
+    token = _current_deadline.set(new)
+    try:
+        yield new
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    return _current_deadline.get()
+
+
+def check_deadline():
+    """Raise if the current deadline has expired.
+
+    Raises:
+        DeadlineExceeded: if the deadline has already expired
+    """
+    current = _current_deadline.get()
+    if current is not None and current.expired():
+        raise DeadlineExceeded()
+
+
+def attempt_timeout(timeout):
+    """Shrink a per-attempt timeout to the time left before the current
+    deadline.
+
+    Raises:
+        DeadlineExceeded: if the deadline has already expired
+    """
+    current = _current_deadline.get()
+    if current is None:
+        return timeout
+    remaining = current.remaining()
+    if remaining <= 0.0:
+        raise DeadlineExceeded()
+    timeout = httpx.Timeout(timeout)
+
+    def _cap(value):
+        return remaining if value is None else min(value, remaining)
+
+    return httpx.Timeout(
+        connect=_cap(timeout.connect),
+        read=_cap(timeout.read),
+        write=_cap(timeout.write),
+        pool=_cap(timeout.pool),
+    )
+
+
+def sleep_time(seconds: float) -> float:
+    """Shorten a sleep so it does not extend past the current deadline.
+
+    Raises:
+        DeadlineExceeded: if the deadline has already expired
+    """
+    current = _current_deadline.get()
+    if current is None:
+        return seconds
+    remaining = current.remaining()
+    if remaining <= 0.0:
+        raise DeadlineExceeded()
+    return min(seconds, remaining)
+
+
+class stop_at_deadline(stop_base):  # noqa: N801
+    """Stop retrying when the current deadline would expire before the
+    next attempt."""
+
+    def __call__(self, retry_state) -> bool:
+        current = _current_deadline.get()
+        if current is None:
+            return False
+        upcoming_sleep = getattr(retry_state, "upcoming_sleep", 0.0)
+        return current.remaining() <= upcoming_sleep
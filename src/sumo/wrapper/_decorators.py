@@ -1,32 +1,28 @@
 # For sphinx:
 from functools import wraps
 
+from ._deadline import deadline as deadline_scope
+
+
+def with_deadline(func):
+    """Accept a deadline= keyword (seconds) bounding the total time of
+    the call, including retries and auth refresh."""
 
-def raise_for_status(func):
     @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        # FIXME: in newer versions of httpx, raise_for_status() is chainable,
-        # so we could simply write
-        # return func(*args, **kwargs).raise_for_status()
-        response = func(self, *args, **kwargs)
-        if response.status_code == 401:
-            self._handle_invalid_shared_key()
-        response.raise_for_status()
-        return response
+    def wrapper(self, *args, deadline=None, **kwargs):
+        with deadline_scope(deadline):
+            return func(self, *args, **kwargs)
 
     return wrapper
 
 
-def raise_for_status_async(func):
+def with_deadline_async(func):
+    """Accept a deadline= keyword (seconds) bounding the total time of
+    the call, including retries and auth refresh."""
+
     @wraps(func)
-    async def wrapper(self, *args, **kwargs):
-        # FIXME: in newer versions of httpx, raise_for_status() is chainable,
-        # so we could simply write
-        # return func(*args, **kwargs).raise_for_status()
-        response = await func(self, *args, **kwargs)
-        if response.status_code == 401:
-            self._handle_invalid_shared_key()
-        response.raise_for_status()
-        return response
+    async def wrapper(self, *args, deadline=None, **kwargs):
+        with deadline_scope(deadline):
+            return await func(self, *args, **kwargs)
 
     return wrapper
@@ -0,0 +1,207 @@
+import asyncio
+import base64
+import collections
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Chunks queued for hashing before update() waits for the hashing thread
+_MAX_PENDING_CHUNKS = 8
+
+
+def md5_hexdigest(blob) -> str:
+    """MD5 of a bytes-like object, computed in place without copying."""
+    md5 = hashlib.md5(usedforsecurity=False)
+    md5.update(memoryview(blob).cast("B"))
+    return md5.hexdigest()
+
+
+def md5_base64(data) -> str:
+    """Base64-encoded MD5, as in Content-MD5 headers."""
+    md5 = hashlib.md5(usedforsecurity=False)
+    md5.update(memoryview(data).cast("B"))
+    return base64.b64encode(md5.digest()).decode()
+
+
+class ChecksumMismatchError(ValueError):
+    """A blob's MD5 does not match the checksum stored with it."""
+
+
+class StreamMD5:
+    """MD5 of a stream of chunks, updated in a background thread so that
+    hashing overlaps receiving the next chunks (hashlib releases the GIL).
+
+    Chunks must not be modified after they are passed to update().
+    """
+
+    def __init__(self):
+        self._md5 = hashlib.md5(usedforsecurity=False)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = collections.deque()
+
+    def update(self, chunk):
+        if len(self._pending) >= _MAX_PENDING_CHUNKS:
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(self._md5.update, chunk))
+
+    async def update_async(self, chunk):
+        if len(self._pending) >= _MAX_PENDING_CHUNKS:
+            await asyncio.wrap_future(self._pending.popleft())
+        self._pending.append(self._executor.submit(self._md5.update, chunk))
+
+    def base64digest(self) -> str:
+        while self._pending:
+            self._pending.popleft().result()
+        return base64.b64encode(self._md5.digest()).decode()
+
+    async def base64digest_async(self) -> str:
+        while self._pending:
+            await asyncio.wrap_future(self._pending.popleft())
+        return base64.b64encode(self._md5.digest()).decode()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def hex_to_base64(md5: str) -> str:
+    return base64.b64encode(bytes.fromhex(md5)).decode()
+
+
+class BlockHasher:
+    """MD5 of each block of a blob, and of the whole blob, computed in a
+    single pass over the data in a background thread, so hashing the
+    next blocks overlaps sending the current one.
+
+    Args:
+        blocks: memoryviews of consecutive blocks of the blob
+    """
+
+    def __init__(self, blocks):
+        self._md5 = hashlib.md5(usedforsecurity=False)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # A single worker hashes the blocks in order
+        self._futures = [
+            self._executor.submit(self._hash_block, block) for block in blocks
+        ]
+
+    def _hash_block(self, block) -> str:
+        self._md5.update(block)
+        return md5_base64(block)
+
+    def block_md5(self, index) -> str:
+        """Base64 MD5 of a block, waiting for it to be hashed."""
+        return self._futures[index].result()
+
+    async def block_md5_async(self, index) -> str:
+        return await asyncio.wrap_future(self._futures[index])
+
+    def hexdigest(self) -> str:
+        """MD5 (hex) of the whole blob, once all blocks are hashed."""
+        for future in self._futures:
+            future.result()
+        return self._md5.hexdigest()
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def expected_md5(response) -> str | None:
+    """The stored MD5 of a blob download, if it can be verified: the
+    checksum covers the stored bytes, so not with a content encoding."""
+    if "content-encoding" in response.headers:
+        return None
+    return response.headers.get("content-md5")
+
+
+def check_md5(actual: str, expected: str, name):
+    if actual != expected:
+        raise ChecksumMismatchError(
+            f"MD5 of {name} is {actual}, expected {expected}."
+        )
+
+
+def blob_key(url: str) -> str:
+    """Identify a blob by its URL without the (expiring) query string."""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+class UploadStats:
+    """Counters for blob uploads, shared by the BlobClients of a
+    SumoClient."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.uploaded = 0
+        self.uploaded_bytes = 0
+        self.skipped = 0
+        self.bytes_saved = 0
+
+    def add_uploaded(self, nbytes):
+        with self._lock:
+            self.uploaded += 1
+            self.uploaded_bytes += nbytes
+
+    def add_skipped(self, nbytes):
+        with self._lock:
+            self.skipped += 1
+            self.bytes_saved += nbytes
+
+    def __repr__(self):
+        return (
+            f"UploadStats(uploaded={self.uploaded}, "
+            f"uploaded_bytes={self.uploaded_bytes}, "
+            f"skipped={self.skipped}, bytes_saved={self.bytes_saved})"
+        )
+
+
+class HashIndex:
+    """Local record of the MD5 of blobs already uploaded, keyed by blob
+    location.
+
+    Stored as an append-only file of JSON lines; the latest entry for a
+    blob wins.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hashes = {}
+        line = "\n"
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Partial last line from an interrupted write
+                        continue
+                    self._hashes[record["key"]] = record["md5"]
+        self._file = open(path, "a", buffering=1, encoding="utf-8")  # noqa: SIM115
+        if not line.endswith("\n"):
+            self._file.write("\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        return False
+
+    def close(self):
+        self._file.close()
+
+    def get(self, url) -> str | None:
+        with self._lock:
+            return self._hashes.get(blob_key(url))
+
+    def set(self, url, md5):
+        key = blob_key(url)
+        with self._lock:
+            if self._hashes.get(key) == md5:
+                return
+            self._hashes[key] = md5
+            self._file.write(json.dumps({"key": key, "md5": md5}) + "\n")
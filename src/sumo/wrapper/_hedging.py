@@ -0,0 +1,143 @@
+import asyncio
+import collections
+import contextlib
+import threading
+
+
+class HedgePolicy:
+    """Hedging of idempotent async GET-requests to cut tail latency.
+
+    If a request has not completed within the hedge delay, a duplicate
+    request is sent and whichever completes first is used; the other is
+    cancelled. The delay is the given percentile of recently observed
+    latencies, clamped to [min_delay, max_delay]; until enough latencies
+    have been observed, initial_delay is used.
+
+    To cap the extra load, hedges are only sent while the number of
+    hedges is below *budget* times the number of requests.
+
+    Attributes:
+        requests: number of requests handled
+        hedges_fired: number of duplicate requests sent
+        hedges_won: number of times the duplicate completed first
+        hedges_denied: number of hedges not sent because the budget was
+            exhausted
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.01,
+        max_delay: float = 2.0,
+        initial_delay: float = 0.5,
+        budget: float = 0.05,
+        window: int = 1000,
+        min_samples: int = 20,
+    ):
+        self._percentile = percentile
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._initial_delay = initial_delay
+        self._budget = budget
+        self._min_samples = min_samples
+        self._latencies = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.hedges_denied = 0
+
+    def __reduce__(self):
+        # Locks cannot be pickled; a copy starts without observed
+        # latencies or counts
+        return (
+            HedgePolicy,
+            (
+                self._percentile,
+                self._min_delay,
+                self._max_delay,
+                self._initial_delay,
+                self._budget,
+                self._latencies.maxlen,
+                self._min_samples,
+            ),
+        )
+
+    def delay(self) -> float:
+        """Current hedge delay, in seconds."""
+        with self._lock:
+            if len(self._latencies) < self._min_samples:
+                return self._initial_delay
+            latencies = sorted(self._latencies)
+        index = min(
+            len(latencies) - 1,
+            int(len(latencies) * self._percentile / 100),
+        )
+        return min(self._max_delay, max(self._min_delay, latencies[index]))
+
+    def _observe(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _try_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges_fired + 1 > self._budget * self.requests:
+                self.hedges_denied += 1
+                return False
+            self.hedges_fired += 1
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+                "hedges_denied": self.hedges_denied,
+            }
+
+    async def run(self, request):
+        """Await *request()*, hedging it if it is slow.
+
+        Args:
+            request: coroutine function performing the request
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.requests += 1
+        primary = asyncio.ensure_future(request())
+        tasks = [primary]
+        # Latency is measured per request, so hedged requests do not
+        # inflate the observed latencies.
+        started = {primary: loop.time()}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.delay())
+            if not done and self._try_hedge():
+                hedge = asyncio.ensure_future(request())
+                tasks.append(hedge)
+                started[hedge] = loop.time()
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Prefer a successful request; if the first to finish
+                # failed, fall back to the other one.
+                failed = [task for task in done if task.exception()]
+                succeeded = [task for task in done if task not in failed]
+                if succeeded or not pending:
+                    winner = succeeded[0] if succeeded else failed[0]
+                    break
+            if winner is not primary:
+                with self._lock:
+                    self.hedges_won += 1
+            self._observe(loop.time() - started[winner])
+            return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    with contextlib.suppress(
+                        asyncio.CancelledError, Exception
+                    ):
+                        await task
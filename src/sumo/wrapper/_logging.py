@@ -1,36 +1,179 @@
 import logging
+import random
+import time
 from datetime import UTC, datetime
 
 
+def _level_number(level) -> int:
+    if isinstance(level, int):
+        return level
+    number = logging.getLevelNamesMapping().get(level.upper())
+    if number is None:
+        raise ValueError(f"Unknown level: {level}")
+    return number
+
+
+class _Repeats:
+    __slots__ = ("count", "record", "start")
+
+    def __init__(self, start, record):
+        self.start = start
+        self.record = record
+        self.count = 0
+
+
 class LogHandlerSumo(logging.Handler):
-    def __init__(self, sumo_client):
+    """Send log records to the message log of a Sumo instance.
+
+    During failure storms, the number of records sent can be reduced in
+    three ways, all disabled by default:
+
+    - sample_rates: fraction of records kept per level, e.g.
+      {"DEBUG": 0.1, "INFO": 0.5}; other levels are always kept.
+    - dedup_window: a record with the same logger, level and message as
+      one sent less than this many seconds ago is not sent, but counted.
+      When the window has passed, the message is sent once more with the
+      number of repeats.
+    - rate_limit: maximum records per second per logger, with bursts of
+      up to one second's worth. A count of dropped records is sent with
+      the next record let through.
+
+    Repeats still pending are sent when the handler is flushed or closed.
+
+    Args:
+        sumo_client: SumoClient used to send the records
+        rate_limit: maximum records per second per logger
+        dedup_window: seconds within which repeated records are counted
+            instead of sent
+        sample_rates: fraction of records to keep, by level
+    """
+
+    def __init__(
+        self,
+        sumo_client,
+        rate_limit: float | None = None,
+        dedup_window: float | None = None,
+        sample_rates: dict | None = None,
+    ):
         logging.Handler.__init__(self)
         self._sumoClient = sumo_client
+        self._rate_limit = rate_limit
+        self._dedup_window = dedup_window
+        self._sample_rates = {
+            _level_number(level): rate
+            for level, rate in (sample_rates or {}).items()
+        }
+        # logger name -> [tokens, last update, dropped records]
+        self._buckets = {}
+        # (logger name, level, message) -> _Repeats
+        self._repeats = {}
+        self._last_sweep = time.monotonic()
 
     def emit(self, record):
         try:
-            dt = (
-                datetime.now(UTC)
-                .replace(microsecond=0, tzinfo=None)
-                .isoformat()
-                + "Z"
-            )
-            json = {
-                "severity": record.levelname,
-                "message": record.getMessage(),
-                "timestamp": dt,
-                "source": record.name,
-                "pathname": record.pathname,
-                "funcname": record.funcName,
-                "linenumber": record.lineno,
-            }
-            if "objectUuid" in record.__dict__:
-                json["objectUuid"] = record.__dict__.get("objectUuid")
-
-            if "details" in record.__dict__:
-                json["details"] = record.__dict__.get("details")
-
-            self._sumoClient.post("/message-log/new", json=json)
+            rate = self._sample_rates.get(record.levelno)
+            if rate is not None and random.random() >= rate:
+                return
+            message = record.getMessage()
+            if self._dedup_window is not None and self._is_repeat(
+                record, message
+            ):
+                return
+            if self._rate_limit is not None and not self._admit(record):
+                return
+            self._send(record, message)
         except Exception:  # noqa: S110
             # Never fail on logging
             pass
+
+    def _is_repeat(self, record, message) -> bool:
+        now = time.monotonic()
+        if now - self._last_sweep >= self._dedup_window:
+            self._sweep(now)
+        key = (record.name, record.levelno, message)
+        repeats = self._repeats.get(key)
+        if repeats is not None and now - repeats.start < self._dedup_window:
+            repeats.count += 1
+            return True
+        if repeats is not None:
+            self._send_repeats(repeats)
+        self._repeats[key] = _Repeats(now, record)
+        return False
+
+    def _sweep(self, now):
+        """Send the counts of repeats whose window has passed, and forget
+        them."""
+        self._last_sweep = now
+        for key, repeats in list(self._repeats.items()):
+            if now - repeats.start >= self._dedup_window:
+                del self._repeats[key]
+                self._send_repeats(repeats)
+
+    def _send_repeats(self, repeats):
+        if repeats.count:
+            self._send(
+                repeats.record,
+                f"{repeats.record.getMessage()} (repeated {repeats.count} "
+                f"times in {self._dedup_window:g} s)",
+            )
+
+    def _admit(self, record) -> bool:
+        now = time.monotonic()
+        burst = max(1.0, self._rate_limit)
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            bucket = self._buckets[record.name] = [burst, now, 0]
+        bucket[0] = min(
+            burst, bucket[0] + (now - bucket[1]) * self._rate_limit
+        )
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1
+        if bucket[2]:
+            dropped, bucket[2] = bucket[2], 0
+            self._send(
+                record,
+                f"{dropped} records from {record.name} dropped by rate limit",
+                severity="WARNING",
+            )
+        return True
+
+    def flush(self):
+        if self._dedup_window is None:
+            return
+        with self.lock:
+            try:
+                for repeats in self._repeats.values():
+                    self._send_repeats(repeats)
+                self._repeats.clear()
+            except Exception:  # noqa: S110
+                # Never fail on logging
+                pass
+
+    def close(self):
+        self.flush()
+        super().close()
+
+    def _send(self, record, message, severity=None):
+        dt = (
+            datetime.now(UTC).replace(microsecond=0, tzinfo=None).isoformat()
+            + "Z"
+        )
+        json = {
+            "severity": severity or record.levelname,
+            "message": message,
+            "timestamp": dt,
+            "source": record.name,
+            "pathname": record.pathname,
+            "funcname": record.funcName,
+            "linenumber": record.lineno,
+        }
+        if "objectUuid" in record.__dict__:
+            json["objectUuid"] = record.__dict__.get("objectUuid")
+
+        if "details" in record.__dict__:
+            json["details"] = record.__dict__.get("details")
+
+        self._sumoClient.post("/message-log/new", json=json)
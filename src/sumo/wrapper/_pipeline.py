@@ -0,0 +1,243 @@
+import functools
+
+from ._deadline import check_deadline
+
+
+class Call:
+    """A request on its way through a Pipeline.
+
+    Attributes:
+        method: HTTP method
+        url: absolute URL
+        params: query parameters, as dictionary
+        headers: request headers, as dictionary; middleware may add to it
+        make_content: callable returning the body for one attempt, or None
+        follow_redirects: whether to follow redirects
+        retry_strategy: retry strategy overriding the pipeline's default
+        priority: priority class for a scheduler, or None if the caller
+            already holds a scheduler slot
+        hedge: whether the request may be hedged
+        stream: whether the response body is streamed. The send function
+            reads the body of error responses, and returns successful
+            responses unread, for the caller to read and close.
+        consume: callable reading the body of a successful response,
+            called by the send function within each attempt, so that
+            failures while reading are retried. Implies stream; the
+            response is closed when it returns. Async pipelines take a
+            coroutine function.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        make_content=None,
+        follow_redirects: bool = False,
+        retry_strategy=None,
+        priority: str | None = "normal",
+        hedge: bool = False,
+        stream: bool = False,
+        consume=None,
+    ):
+        self.method = method
+        self.url = url
+        self.params = params
+        self.headers = dict(headers or {})
+        self.make_content = make_content
+        self.follow_redirects = follow_redirects
+        self.retry_strategy = retry_strategy
+        self.priority = priority
+        self.hedge = hedge
+        self.stream = stream or consume is not None
+        self.consume = consume
+
+    def content(self):
+        return None if self.make_content is None else self.make_content()
+
+
+class Middleware:
+    """Base class for pipeline middleware.
+
+    A middleware receives each call together with the rest of the
+    pipeline, call_next, and returns the response. The default
+    implementations pass the call on unchanged, so a middleware only
+    needs to override what it changes.
+
+    The body of a successful response to a streaming call (call.stream)
+    has not been read when it reaches the middleware, and must be left
+    for the caller.
+
+    Examples:
+        Counting attempts::
+
+            class CountAttempts(Middleware):
+                def __init__(self):
+                    self.attempts = 0
+
+                def handle(self, call, call_next):
+                    self.attempts += 1
+                    return call_next(call)
+
+                async def handle_async(self, call, call_next):
+                    self.attempts += 1
+                    return await call_next(call)
+
+            sumo.pipeline.append(CountAttempts())
+    """
+
+    def handle(self, call: Call, call_next):
+        return call_next(call)
+
+    async def handle_async(self, call: Call, call_next):
+        return await call_next(call)
+
+
+class Pipeline:
+    """An ordered list of middleware in front of a send function.
+
+    The first middleware sees each call first. Middleware placed before
+    Retry runs once per call, middleware placed after it once per
+    attempt.
+
+    Args:
+        middleware: list of Middleware
+    """
+
+    def __init__(self, middleware):
+        self.middleware = list(middleware)
+
+    def __iter__(self):
+        return iter(self.middleware)
+
+    def append(self, middleware: Middleware):
+        """Add middleware to the end of the pipeline, i.e. around every
+        attempt."""
+        self.middleware.append(middleware)
+
+    def insert_before(self, cls, middleware: Middleware):
+        """Add middleware before the first middleware of type cls."""
+        for index, existing in enumerate(self.middleware):
+            if isinstance(existing, cls):
+                self.middleware.insert(index, middleware)
+                return
+        raise ValueError(f"No {cls.__name__} in pipeline")
+
+    def send(self, call: Call, send):
+        """Pass call through the middleware, then to send(call)."""
+        return self._dispatch(tuple(self.middleware), send, 0, call)
+
+    async def send_async(self, call: Call, send):
+        """Pass call through the middleware, then to await send(call)."""
+        return await self._dispatch_async(
+            tuple(self.middleware), send, 0, call
+        )
+
+    def _dispatch(self, middleware, send, index, call):
+        if index == len(middleware):
+            return send(call)
+        return middleware[index].handle(
+            call,
+            functools.partial(self._dispatch, middleware, send, index + 1),
+        )
+
+    async def _dispatch_async(self, middleware, send, index, call):
+        if index == len(middleware):
+            return await send(call)
+        return await middleware[index].handle_async(
+            call,
+            functools.partial(
+                self._dispatch_async, middleware, send, index + 1
+            ),
+        )
+
+
+class RaiseForStatus(Middleware):
+    """Raise httpx.HTTPStatusError for error responses, calling
+    on_unauthorized first for 401 responses."""
+
+    def __init__(self, on_unauthorized=None):
+        self._on_unauthorized = on_unauthorized
+
+    def _check(self, response):
+        if response.status_code == 401 and self._on_unauthorized is not None:
+            self._on_unauthorized()
+        response.raise_for_status()
+        return response
+
+    def handle(self, call, call_next):
+        return self._check(call_next(call))
+
+    async def handle_async(self, call, call_next):
+        return self._check(await call_next(call))
+
+
+class Authorization(Middleware):
+    """Add the auth provider's authorization headers, once per call.
+
+    Getting the headers may refresh the token through MSAL, which the
+    current deadline cannot interrupt; the refresh is not started once
+    the deadline has expired.
+    """
+
+    def __init__(self, auth):
+        self._auth = auth
+
+    def handle(self, call, call_next):
+        check_deadline()
+        call.headers.update(self._auth.get_authorization())
+        return call_next(call)
+
+    async def handle_async(self, call, call_next):
+        check_deadline()
+        call.headers.update(self._auth.get_authorization())
+        return await call_next(call)
+
+
+class Retry(Middleware):
+    """Retry the rest of the pipeline using the call's retry strategy,
+    or the default one."""
+
+    def __init__(self, retry_strategy):
+        self._retry_strategy = retry_strategy
+
+    def _strategy(self, call):
+        return (
+            call.retry_strategy
+            if call.retry_strategy
+            else self._retry_strategy
+        )
+
+    def handle(self, call, call_next):
+        return self._strategy(call).make_retryer()(call_next, call)
+
+    async def handle_async(self, call, call_next):
+        retryer = self._strategy(call).make_retryer_async()
+        return await retryer(call_next, call)
+
+
+class Hedging(Middleware):
+    """Hedge async calls allowing it, using a HedgePolicy."""
+
+    def __init__(self, hedge_policy):
+        self._hedge_policy = hedge_policy
+
+    async def handle_async(self, call, call_next):
+        if not call.hedge:
+            return await call_next(call)
+        return await self._hedge_policy.run(lambda: call_next(call))
+
+
+class Scheduling(Middleware):
+    """Hold a PriorityScheduler slot for each async attempt, unless the
+    caller holds one for the call."""
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    async def handle_async(self, call, call_next):
+        if call.priority is None:
+            return await call_next(call)
+        async with self._scheduler.slot(call.priority):
+            return await call_next(call)
@@ -0,0 +1,254 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger("sumo.wrapper")
+
+# Minimum time between progress callbacks for a transfer, in seconds
+DEFAULT_PROGRESS_INTERVAL = 0.5
+
+# Weight of the latest rate in the moving average
+_SMOOTHING = 0.3
+
+
+class Progress:
+    """Progress of a transfer, as passed to progress callbacks.
+
+    Attributes:
+        name: object id or blob path, or "total" for aggregates
+        bytes_done: bytes transferred so far
+        total: size of the transfer in bytes, if known
+        rate: bytes per second since the previous report
+        average_rate: exponential moving average of rate
+        elapsed: seconds since the transfer started
+        finished: whether the transfer has completed
+    """
+
+    __slots__ = (
+        "average_rate",
+        "bytes_done",
+        "elapsed",
+        "finished",
+        "name",
+        "rate",
+        "total",
+    )
+
+    def __init__(
+        self,
+        name,
+        bytes_done,
+        total,
+        rate,
+        average_rate,
+        elapsed,
+        finished,
+    ):
+        self.name = name
+        self.bytes_done = bytes_done
+        self.total = total
+        self.rate = rate
+        self.average_rate = average_rate
+        self.elapsed = elapsed
+        self.finished = finished
+
+    @property
+    def fraction(self) -> float | None:
+        if not self.total:
+            return None
+        return self.bytes_done / self.total
+
+    def __repr__(self):
+        return (
+            f"Progress({self.name!r}, {self.bytes_done}/{self.total}, "
+            f"{self.rate:.0f} B/s, finished={self.finished})"
+        )
+
+
+class _RateMeter:
+    def __init__(self, interval):
+        self._interval = interval
+        self.start = time.monotonic()
+        self._last_time = self.start
+        self._last_bytes = 0
+        self.rate = 0.0
+        self.average_rate = None
+
+    def due(self, now) -> bool:
+        return now - self._last_time >= self._interval
+
+    def sample(self, now, bytes_done):
+        elapsed = now - self._last_time
+        if elapsed > 0:
+            self.rate = (bytes_done - self._last_bytes) / elapsed
+            self.average_rate = (
+                self.rate
+                if self.average_rate is None
+                else _SMOOTHING * self.rate
+                + (1 - _SMOOTHING) * self.average_rate
+            )
+        self._last_time = now
+        self._last_bytes = bytes_done
+
+    def finish(self, now, bytes_done):
+        elapsed = now - self.start
+        self.rate = bytes_done / elapsed if elapsed > 0 else 0.0
+        if self.average_rate is None:
+            self.average_rate = self.rate
+
+
+class ProgressTracker:
+    """Count the bytes of one transfer and report progress to a
+    callback, at most once per interval and when the transfer finishes.
+    """
+
+    def __init__(
+        self,
+        callback,
+        name,
+        total=None,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+    ):
+        self._callback = callback
+        self._name = name
+        self.total = total
+        self._interval = interval
+        self.restart()
+
+    def restart(self, total=None):
+        """Start counting from zero, e.g. when a transfer is retried."""
+        if total is not None:
+            self.total = total
+        self._meter = _RateMeter(self._interval)
+        self.bytes_done = 0
+
+    def update(self, nbytes: int):
+        self.bytes_done += nbytes
+        now = time.monotonic()
+        if self._meter.due(now):
+            self._report(now, finished=False)
+
+    def finish(self):
+        self._report(time.monotonic(), finished=True)
+
+    def _report(self, now, finished):
+        meter = self._meter
+        if finished:
+            # Report the mean over the whole transfer; the time since the
+            # last report may be too short for a meaningful rate.
+            meter.finish(now, self.bytes_done)
+        else:
+            meter.sample(now, self.bytes_done)
+        self._callback(
+            Progress(
+                self._name,
+                self.bytes_done,
+                self.total,
+                meter.rate,
+                meter.average_rate or 0.0,
+                now - meter.start,
+                finished,
+            )
+        )
+
+
+class TransferMonitor:
+    """Progress callback aggregating many transfers, e.g. the blobs of
+    upload_blobs or get_blobs.
+
+    Pass the monitor as progress= to any number of transfers, from any
+    threads. Each report is forwarded to *callback*, followed by the
+    aggregate over all transfers (named "total") at most once per
+    interval.
+
+    Args:
+        callback: called with each Progress, and with the aggregate
+        interval: minimum time between aggregate reports, in seconds
+    """
+
+    def __init__(self, callback=None, interval=DEFAULT_PROGRESS_INTERVAL):
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._meter = _RateMeter(interval)
+        self._done = {}
+        self._totals = {}
+        self._active = set()
+
+    def __call__(self, progress: Progress):
+        now = time.monotonic()
+        with self._lock:
+            self._done[progress.name] = progress.bytes_done
+            self._totals[progress.name] = progress.total
+            if progress.finished:
+                self._active.discard(progress.name)
+            else:
+                self._active.add(progress.name)
+            aggregate = None
+            if self._meter.due(now) or not self._active:
+                aggregate = self._aggregate(now)
+        if self._callback is not None:
+            self._callback(progress)
+            if aggregate is not None:
+                self._callback(aggregate)
+
+    def _aggregate(self, now) -> Progress:
+        bytes_done = sum(self._done.values())
+        if self._active:
+            self._meter.sample(now, bytes_done)
+        else:
+            self._meter.finish(now, bytes_done)
+        totals = self._totals.values()
+        return Progress(
+            "total",
+            bytes_done,
+            None if None in totals else sum(totals),
+            self._meter.rate,
+            self._meter.average_rate or 0.0,
+            now - self._meter.start,
+            not self._active,
+        )
+
+    def snapshot(self) -> Progress:
+        """Aggregate progress over all transfers so far."""
+        with self._lock:
+            return self._aggregate(time.monotonic())
+
+
+def _megabytes(nbytes):
+    return nbytes / (1024 * 1024)
+
+
+class ProgressReporter:
+    """Progress callback writing one line per report to the
+    sumo.wrapper logger, or to the console.
+
+    Examples:
+        Reporting upload progress::
+
+            sumo.blob_client.upload_blob(
+                blob, blob_url, progress=ProgressReporter(console=True)
+            )
+    """
+
+    def __init__(self, console: bool = False, level: int = logging.INFO):
+        self._console = console
+        self._level = level
+
+    def __call__(self, progress: Progress):
+        line = (
+            f"{progress.name}: {_megabytes(progress.bytes_done):.1f}"
+            + (
+                f"/{_megabytes(progress.total):.1f} MB "
+                f"({progress.fraction:.0%})"
+                if progress.total
+                else " MB"
+            )
+            + f", {_megabytes(progress.rate):.1f} MB/s"
+            f" (avg {_megabytes(progress.average_rate):.1f} MB/s)"
+            + (" done" if progress.finished else "")
+        )
+        if self._console:
+            # One write per line, so lines from threads do not mix
+            print(line + "\n", end="", flush=True)
+        else:
+            logger.log(self._level, line)
@@ -0,0 +1,236 @@
+import asyncio
+import base64
+import collections
+import gzip
+import json
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+# Query parameters of pre-authorized (SAS) blob URLs. They change between
+# runs, so they are ignored when matching requests on replay.
+_SAS_PARAMS = {
+    "sig",
+    "se",
+    "st",
+    "sp",
+    "sv",
+    "sr",
+    "spr",
+    "skoid",
+    "sktid",
+    "skt",
+    "ske",
+    "sks",
+    "skv",
+}
+
+
+def _request_key(method, url) -> str:
+    parts = urlsplit(str(url))
+    query = urlencode(
+        sorted(
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in _SAS_PARAMS
+        )
+    )
+    return f"{method} {urlunsplit(parts._replace(query=query))}"
+
+
+class Recorder:
+    """Append request/response pairs to a recording.
+
+    The recording is a gzip-compressed file of JSON lines, one per
+    exchange, holding the response status, headers, raw (still encoded)
+    body and the time it took. Request headers are not recorded, but
+    response headers are, including redirect locations with
+    pre-authorized blob URLs, so recordings should be kept private.
+
+    A new recording is started unless *append* is true. An unpickled
+    recorder appends to the recording.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if not append:
+            # Start a new recording
+            with gzip.open(path, "wb"):
+                pass
+
+    def __reduce__(self):
+        return (Recorder, (self.path, True))
+
+    def record(self, method, url, status_code, headers, body, elapsed):
+        line = json.dumps(
+            {
+                "key": _request_key(method, url),
+                "status_code": status_code,
+                "headers": list(headers),
+                "body": base64.b64encode(body).decode("ascii"),
+                "elapsed": elapsed,
+            }
+        )
+        with self._lock, gzip.open(self.path, "ab") as f:
+            # Each record is a complete gzip member, so the recording
+            # stays readable if the process dies.
+            f.write(line.encode("utf-8") + b"\n")
+
+    def record_json(self, method, url, obj):
+        self.record(
+            method,
+            url,
+            200,
+            [("content-type", "application/json")],
+            json.dumps(obj).encode("utf-8"),
+            0.0,
+        )
+
+
+class Replayer:
+    """Serve responses from a recording made by Recorder.
+
+    Requests are matched on method and URL, ignoring blob SAS
+    parameters. Repeated requests to the same URL (e.g. polling) get the
+    recorded responses in order.
+
+    An unpickled replayer serves the recording again from the start.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = collections.defaultdict(collections.deque)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries[entry["key"]].append(entry)
+
+    def __reduce__(self):
+        return (Replayer, (self.path,))
+
+    def next(self, method, url) -> dict:
+        key = _request_key(method, url)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise LookupError(f"No recorded response for {key}")
+            return entries.popleft()
+
+    def json(self, method, url):
+        return json.loads(base64.b64decode(self.next(method, url)["body"]))
+
+
+def _response(entry) -> httpx.Response:
+    return httpx.Response(
+        entry["status_code"],
+        headers=entry["headers"],
+        content=base64.b64decode(entry["body"]),
+    )
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Transport that records every exchange made through *transport*."""
+
+    def __init__(self, recorder: Recorder, transport=None):
+        self._recorder = recorder
+        self._transport = (
+            transport if transport is not None else httpx.HTTPTransport()
+        )
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            # Read the raw stream: the body is recorded still encoded
+            body = b"".join(response.stream)
+        finally:
+            response.close()
+        elapsed = time.perf_counter() - start
+        self._recorder.record(
+            request.method,
+            request.url,
+            response.status_code,
+            response.headers.multi_items(),
+            body,
+            elapsed,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=body,
+            extensions=response.extensions,
+        )
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    """Async transport that records every exchange made through
+    *transport*."""
+
+    def __init__(self, recorder: Recorder, transport=None):
+        self._recorder = recorder
+        self._transport = (
+            transport if transport is not None else httpx.AsyncHTTPTransport()
+        )
+
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        try:
+            body = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - start
+        self._recorder.record(
+            request.method,
+            request.url,
+            response.status_code,
+            response.headers.multi_items(),
+            body,
+            elapsed,
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=body,
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """Transport serving recorded responses, optionally with the recorded
+    latency."""
+
+    def __init__(self, replayer: Replayer, latency: bool = False):
+        self._replayer = replayer
+        self._latency = latency
+
+    def handle_request(self, request):
+        entry = self._replayer.next(request.method, request.url)
+        if self._latency:
+            time.sleep(entry["elapsed"])
+        return _response(entry)
+
+
+class AsyncReplayTransport(httpx.AsyncBaseTransport):
+    """Async transport serving recorded responses, optionally with the
+    recorded latency."""
+
+    def __init__(self, replayer: Replayer, latency: bool = False):
+        self._replayer = replayer
+        self._latency = latency
+
+    async def handle_async_request(self, request):
+        entry = self._replayer.next(request.method, request.url)
+        if self._latency:
+            await asyncio.sleep(entry["elapsed"])
+        return _response(entry)
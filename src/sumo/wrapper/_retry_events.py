@@ -0,0 +1,233 @@
+import collections
+import logging
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("sumo.wrapper")
+
+# Retries logged individually per interval; further retries in the same
+# interval are counted and logged as one summary.
+DEFAULT_SUMMARY_INTERVAL = 10.0
+DEFAULT_MAX_LOGGED_PER_INTERVAL = 10
+
+# Object ids in paths would make every route unique
+_UUID = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
+    re.IGNORECASE,
+)
+
+
+class RetryEvent:
+    """A retry about to happen, as logged and counted by log_retry.
+
+    Attributes:
+        route: "METHOD /path" of the request, or the retried function
+        attempt: number of the attempt that failed
+        wait: seconds until the next attempt
+        elapsed: seconds since the first attempt
+        status_code: HTTP status of the failed attempt, if it got one
+        exception: exception raised by the failed attempt, if any
+    """
+
+    __slots__ = (
+        "attempt",
+        "elapsed",
+        "exception",
+        "route",
+        "status_code",
+        "wait",
+    )
+
+    def __init__(self, route, attempt, wait, elapsed, status_code, exception):
+        self.route = route
+        self.attempt = attempt
+        self.wait = wait
+        self.elapsed = elapsed
+        self.status_code = status_code
+        self.exception = exception
+
+    @property
+    def cause(self) -> str:
+        """Status code or exception type name of the failed attempt."""
+        if self.exception is not None:
+            return type(self.exception).__name__
+        return str(self.status_code)
+
+    def __repr__(self):
+        return (
+            f"RetryEvent({self.route!r}, attempt={self.attempt}, "
+            f"cause={self.cause}, wait={self.wait:.2f})"
+        )
+
+
+class RetryStats:
+    """Thread-safe counters of retries, by route and by cause.
+
+    The counters of all clients in the process are in retry_stats.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._retries = 0
+            self._wait = 0.0
+            self._by_route = collections.Counter()
+            self._by_cause = collections.Counter()
+
+    def record(self, event: RetryEvent):
+        with self._lock:
+            self._retries += 1
+            self._wait += event.wait
+            self._by_route[event.route] += 1
+            self._by_cause[event.cause] += 1
+
+    def snapshot(self) -> dict:
+        """Counters so far: number of retries, total seconds waited, and
+        retries by route and by cause.
+
+        Also logs the summary of retries not yet logged individually, so
+        the log agrees with the counters.
+        """
+        _retry_log.flush()
+        with self._lock:
+            return {
+                "retries": self._retries,
+                "wait": self._wait,
+                "by_route": dict(self._by_route),
+                "by_cause": dict(self._by_cause),
+            }
+
+
+retry_stats = RetryStats()
+
+
+class _RetryLog:
+    """Log retries individually up to a limit per interval, then as
+    summaries, so retry storms do not flood the log.
+
+    The summary of suppressed retries is logged when the interval ends,
+    or earlier by flush().
+    """
+
+    def __init__(
+        self,
+        interval=DEFAULT_SUMMARY_INTERVAL,
+        max_logged=DEFAULT_MAX_LOGGED_PER_INTERVAL,
+    ):
+        self._interval = interval
+        self._max_logged = max_logged
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._summary_start = self._window_start
+        self._logged = 0
+        self._suppressed = collections.Counter()
+        self._timer = None
+
+    def log(self, event: RetryEvent):
+        now = time.monotonic()
+        with self._lock:
+            summary = None
+            if now - self._window_start >= self._interval:
+                summary = self._take_summary(now)
+                self._window_start = now
+                self._logged = 0
+            suppress = self._logged >= self._max_logged
+            if suppress:
+                self._suppressed[event.cause] += 1
+                if self._timer is None:
+                    self._start_timer(
+                        self._window_start + self._interval - now
+                    )
+            else:
+                self._logged += 1
+        self._log_summary(summary)
+        if not suppress:
+            logger.info(
+                f"Retrying {event.route} after {event.cause} "
+                f"(attempt {event.attempt}, elapsed {event.elapsed:.1f} s, "
+                f"waiting {event.wait:.1f} s)",
+                extra={"retry_event": event},
+            )
+
+    def flush(self):
+        """Log the summary of retries suppressed so far, if any."""
+        with self._lock:
+            summary = self._take_summary(time.monotonic())
+        self._log_summary(summary)
+
+    def _start_timer(self, delay):
+        # Log the summary at the end of the interval even if no further
+        # retry happens
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _take_summary(self, now):
+        """Pop the suppressed retries; the lock must be held."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        summary = None
+        if self._suppressed:
+            summary = (now - self._summary_start, self._suppressed)
+            self._suppressed = collections.Counter()
+        self._summary_start = now
+        return summary
+
+    def _log_summary(self, summary):
+        if summary is None:
+            return
+        seconds, causes = summary
+        logger.warning(
+            f"{causes.total()} more retries in {seconds:.0f} s: "
+            + ", ".join(f"{cause} x {n}" for cause, n in causes.items()),
+            extra={"retry_summary": dict(causes)},
+        )
+
+
+_retry_log = _RetryLog()
+
+
+def _route(retry_state) -> str:
+    # The pipeline's Retry middleware retries call_next(call)
+    if retry_state.args and hasattr(retry_state.args[0], "url"):
+        call = retry_state.args[0]
+        path = _UUID.sub("{id}", urlsplit(str(call.url)).path)
+        return f"{call.method} {path}"
+    name = getattr(retry_state.fn, "__qualname__", None)
+    if name is None:
+        return "unknown"
+    return name.split(".<locals>")[0]
+
+
+def log_retry(retry_state):
+    """Default before_sleep callback of retryers: count the retry in
+    retry_stats and log it as a RetryEvent to the sumo.wrapper logger.
+
+    Each record carries the event as record.retry_event. Under retry
+    storms, only the first few retries per interval are logged, followed
+    by a warning summarizing the rest (record.retry_summary).
+    """
+    outcome = retry_state.outcome
+    exception = outcome.exception() if outcome.failed else None
+    status_code = (
+        None
+        if outcome.failed
+        else getattr(outcome.result(), "status_code", None)
+    )
+    next_action = retry_state.next_action
+    event = RetryEvent(
+        _route(retry_state),
+        retry_state.attempt_number,
+        next_action.sleep if next_action is not None else 0.0,
+        retry_state.seconds_since_start or 0.0,
+        status_code,
+        exception,
+    )
+    retry_stats.record(event)
+    _retry_log.log(event)
@@ -1,17 +1,8 @@
 import httpx
 import tenacity as tn
 
-
-def _log_retry_info(retry_state):
-    # logger.log(
-    #     logging.INFO,
-    #     f"Attempts: {retry_state.attempt_number}; "
-    #     f"Elapsed: {retry_state.seconds_since_start}",
-    # )
-    print(
-        f"Attempts: {retry_state.attempt_number}; "
-        f"Elapsed:  {retry_state.seconds_since_start}"
-    )
+from ._deadline import stop_at_deadline
+from ._retry_events import log_retry
 
 
 # Define the conditions for retrying based on exception types
@@ -42,7 +33,7 @@ class RetryStrategy:
         stop_after=6,
         multiplier=0.5,
         exp_base=2,
-        before_sleep=_log_retry_info,
+        before_sleep=log_retry,
     ):
         self._stop_after = stop_after
         self._multiplier = multiplier
@@ -51,7 +42,9 @@ class RetryStrategy:
 
     def make_retryer(self) -> tn.Retrying:
         return tn.Retrying(
-            stop=tn.stop_after_attempt(self._stop_after),
+            stop=(
+                tn.stop_after_attempt(self._stop_after) | stop_at_deadline()
+            ),
             retry=(
                 tn.retry_if_exception(_is_retryable_exception)
                 | tn.retry_if_result(_is_retryable_status_code)
@@ -70,7 +63,9 @@ class RetryStrategy:
 
     def make_retryer_async(self) -> tn.AsyncRetrying:
         return tn.AsyncRetrying(
-            stop=tn.stop_after_attempt(self._stop_after),
+            stop=(
+                tn.stop_after_attempt(self._stop_after) | stop_at_deadline()
+            ),
             retry=(
                 tn.retry_if_exception(_is_retryable_exception)
                 | tn.retry_if_result(_is_retryable_status_code)
@@ -0,0 +1,118 @@
+import asyncio
+import collections
+import contextlib
+
+DEFAULT_WEIGHTS = {"interactive": 8, "normal": 4, "bulk": 1}
+
+
+class PriorityScheduler:
+    """Admission control for async requests, with priority classes.
+
+    At most *max_concurrency* requests run at once. When a slot frees up
+    and requests are waiting, the class that has received the least
+    service relative to its weight goes next (stride scheduling), so
+    backlogged classes share slots in proportion to their weights and
+    bulk traffic cannot starve interactive requests. *limits* optionally
+    caps the number of concurrent requests per class.
+
+    A scheduler must only be used from a single event loop.
+
+    Args:
+        max_concurrency: maximum number of concurrent requests; keep this
+            at or below the async client's connection limit
+        weights: relative share of slots per priority class; merged
+            onto DEFAULT_WEIGHTS, so the default classes are always
+            available
+        limits: maximum concurrent requests per priority class
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        weights: dict | None = None,
+        limits: dict | None = None,
+    ):
+        self._max_concurrency = max_concurrency
+        self._weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        for name, weight in self._weights.items():
+            if weight <= 0:
+                raise ValueError(f"Weight of {name} must be positive")
+        self._limits = dict(limits or {})
+        self._running = 0
+        self._running_by_class = collections.Counter()
+        self._waiters = {name: collections.deque() for name in self._weights}
+        self._pass = dict.fromkeys(self._weights, 0.0)
+        self._virtual_time = 0.0
+
+    def __reduce__(self):
+        # Waiters belong to an event loop; a copy starts idle
+        return (
+            PriorityScheduler,
+            (self._max_concurrency, self._weights, self._limits),
+        )
+
+    def _has_capacity(self, priority) -> bool:
+        limit = self._limits.get(priority)
+        return self._running < self._max_concurrency and (
+            limit is None or self._running_by_class[priority] < limit
+        )
+
+    def _start(self, priority):
+        self._running += 1
+        self._running_by_class[priority] += 1
+        self._virtual_time = self._pass[priority]
+        self._pass[priority] += 1.0 / self._weights[priority]
+
+    def _dispatch(self):
+        while True:
+            ready = [
+                name
+                for name, waiters in self._waiters.items()
+                if waiters and self._has_capacity(name)
+            ]
+            if not ready:
+                return
+            priority = min(ready, key=lambda name: self._pass[name])
+            waiter = self._waiters[priority].popleft()
+            if waiter.done():
+                # Cancelled while waiting
+                continue
+            self._start(priority)
+            waiter.set_result(None)
+
+    async def _acquire(self, priority):
+        if priority not in self._weights:
+            raise ValueError(f"Unknown priority: {priority}")
+        waiters = self._waiters[priority]
+        if not waiters:
+            # A class that was idle does not get credit for the idle time
+            self._pass[priority] = max(
+                self._pass[priority], self._virtual_time
+            )
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before cancellation
+                self._release(priority)
+            else:
+                with contextlib.suppress(ValueError):
+                    waiters.remove(waiter)
+            raise
+
+    def _release(self, priority):
+        self._running -= 1
+        self._running_by_class[priority] -= 1
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: str = "normal"):
+        """Wait for, and hold, a slot for a request of the given class."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
@@ -0,0 +1,116 @@
+import re
+
+_STRUCTURAL = re.compile(rb'[{}\[\]",:]')
+_STRING_END = re.compile(rb'["\\]')
+
+_QUOTE = ord('"')
+_BACKSLASH = ord("\\")
+_OPEN = (ord("{"), ord("["))
+_CLOSE = (ord("}"), ord("]"))
+_OBJECT = ord("{")
+_ARRAY = ord("[")
+_COLON = ord(":")
+_COMMA = ord(",")
+
+
+class HitStreamParser:
+    """Incrementally extract the elements of a JSON array nested in a
+    search response, by default ``hits.hits``.
+
+    Bytes are fed in arbitrary chunks; only the element currently being
+    received is kept in memory. Each complete element is parsed with
+    *loads* and returned from :meth:`feed`.
+    """
+
+    def __init__(self, loads, path=("hits", "hits")):
+        self._loads = loads
+        self._path = [key.encode("utf-8") for key in path]
+        self._buffer = bytearray()
+        self._pos = 0
+        # One entry per open container: [kind, current key, expecting key]
+        self._stack = []
+        self._in_string = False
+        self._key_start = None
+        self._element_start = None
+
+    def _at_target(self) -> bool:
+        depth = len(self._path)
+        if len(self._stack) != depth + 1 or self._stack[depth][0] != _ARRAY:
+            return False
+        return all(
+            self._stack[i][0] == _OBJECT and self._stack[i][1] == key
+            for i, key in enumerate(self._path)
+        )
+
+    def feed(self, chunk: bytes) -> list:
+        """Consume a chunk of the response body.
+
+        Returns:
+            The elements completed by this chunk, parsed.
+        """
+        buf = self._buffer
+        buf += chunk
+        pos = self._pos
+        stack = self._stack
+        elements = []
+        while True:
+            if self._in_string:
+                m = _STRING_END.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                if buf[m.start()] == _BACKSLASH:
+                    if m.start() + 1 >= len(buf):
+                        # The escaped character is in the next chunk
+                        pos = m.start()
+                        break
+                    pos = m.start() + 2
+                    continue
+                self._in_string = False
+                if self._key_start is not None:
+                    stack[-1][1] = bytes(buf[self._key_start : m.start()])
+                    self._key_start = None
+                pos = m.end()
+                continue
+
+            m = _STRUCTURAL.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            c = buf[m.start()]
+            pos = m.end()
+            if c == _QUOTE:
+                self._in_string = True
+                if stack and stack[-1][0] == _OBJECT and stack[-1][2]:
+                    self._key_start = pos
+            elif c in _OPEN:
+                if self._element_start is None and self._at_target():
+                    self._element_start = m.start()
+                stack.append([c, None, c == _OBJECT])
+            elif c in _CLOSE:
+                stack.pop()
+                if self._element_start is not None and self._at_target():
+                    elements.append(
+                        self._loads(bytes(buf[self._element_start : pos]))
+                    )
+                    self._element_start = None
+            elif c == _COLON:
+                stack[-1][2] = False
+            elif c == _COMMA and stack[-1][0] == _OBJECT:
+                stack[-1][2] = True
+
+        # Drop everything that is no longer needed
+        keep = pos
+        if self._element_start is not None:
+            keep = min(keep, self._element_start)
+        if self._key_start is not None:
+            keep = min(keep, self._key_start)
+        if keep > 0:
+            del buf[:keep]
+            pos -= keep
+            if self._element_start is not None:
+                self._element_start -= keep
+            if self._key_start is not None:
+                self._key_start -= keep
+        self._pos = pos
+        return elements
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import threading
+import time
+
+# Chunk size for throttled uploads; small chunks keep pacing smooth
+THROTTLED_CHUNK_SIZE = 64 * 1024
+
+_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_rate(value) -> float:
+    """Parse a bandwidth in bytes per second, e.g. 1048576, "500K" or
+    "20M" (K, M and G are multiples of 1024).
+
+    Raises:
+        ValueError: if value is not a positive rate
+    """
+    if isinstance(value, str):
+        text = value.strip().upper().removesuffix("B")
+        unit = text[-1:] if text[-1:] in _UNITS else ""
+        try:
+            rate = float(text.removesuffix(unit)) * _UNITS[unit]
+        except ValueError:
+            raise ValueError(f"Invalid bandwidth limit: {value}") from None
+    else:
+        rate = float(value)
+    if rate <= 0:
+        raise ValueError(f"Invalid bandwidth limit: {value}")
+    return rate
+
+
+class BandwidthLimiter:
+    """Token bucket limiting the bytes per second of blob transfers.
+
+    A limiter can be shared by several clients, threads and event loops.
+    Transfers reserve tokens for each chunk and wait until the bucket has
+    refilled, so the long-term rate never exceeds *rate*, while at most
+    *burst* bytes may be sent at once.
+
+    Args:
+        rate: bytes per second, or a string like "20M"; see parse_rate
+        burst: bucket size in bytes. Defaults to a tenth of a second's
+            worth of bytes, and at least one throttled chunk.
+    """
+
+    def __init__(self, rate, burst: int | None = None):
+        self.rate = parse_rate(rate)
+        self.burst = (
+            burst
+            if burst is not None
+            else max(THROTTLED_CHUNK_SIZE, int(self.rate / 10))
+        )
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def reserve(self, nbytes: int) -> float:
+        """Take nbytes from the bucket, going into debt if needed.
+
+        Returns:
+            Seconds to wait before sending the bytes
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._updated) * self.rate,
+            )
+            self._updated = now
+            self._tokens -= nbytes
+            return max(0.0, -self._tokens / self.rate)
+
+
+_process_limiter = None
+_process_limiter_lock = threading.Lock()
+_process_limiter_configured = False
+
+
+def set_process_bandwidth_limit(rate):
+    """Limit the bandwidth of blob transfers of all clients in this
+    process, in addition to any per-client limit.
+
+    Args:
+        rate: bytes per second, a string like "20M", a BandwidthLimiter,
+            or None to remove the limit. Overrides the
+            SUMO_BANDWIDTH_LIMIT environment variable.
+    """
+    global _process_limiter, _process_limiter_configured
+    with _process_limiter_lock:
+        if rate is None or isinstance(rate, BandwidthLimiter):
+            _process_limiter = rate
+        else:
+            _process_limiter = BandwidthLimiter(rate)
+        _process_limiter_configured = True
+
+
+def process_limiter() -> BandwidthLimiter | None:
+    """The process-wide limiter, set up from SUMO_BANDWIDTH_LIMIT on
+    first use."""
+    global _process_limiter, _process_limiter_configured
+    if not _process_limiter_configured:
+        with _process_limiter_lock:
+            if not _process_limiter_configured:
+                value = os.environ.get("SUMO_BANDWIDTH_LIMIT")
+                if value:
+                    _process_limiter = BandwidthLimiter(value)
+                _process_limiter_configured = True
+    return _process_limiter
+
+
+def active_limiters(limiter: BandwidthLimiter | None) -> tuple:
+    """The limiters applying to a client's transfers: its own and the
+    process-wide one."""
+    return tuple(
+        candidate
+        for candidate in (limiter, process_limiter())
+        if candidate is not None
+    )
+
+
+def pace(limiters, nbytes: int):
+    """Wait until nbytes may be sent under all limiters."""
+    if limiters:
+        delay = max(limiter.reserve(nbytes) for limiter in limiters)
+        if delay > 0:
+            time.sleep(delay)
+
+
+async def pace_async(limiters, nbytes: int):
+    if limiters:
+        delay = max(limiter.reserve(nbytes) for limiter in limiters)
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+
+REGISTERED = "registered"
+COMMITTED = "committed"
+
+
+class UploadJournal:
+    """Append-only record of upload progress, used to resume uploads.
+
+    Each line in the journal file is a JSON record of a state change for
+    one object, identified by a caller-chosen key: metadata registered
+    (with object id and blob URL), or blob committed. The file is replayed
+    when the journal is opened, so a restarted upload can skip completed
+    objects and finish partial ones.
+
+    Records are written with a single line-buffered write each; pass
+    fsync=True to also force them to disk, at the cost of throughput.
+    The journal contains pre-authorized blob URLs, so the file is created
+    readable by the owner only.
+    """
+
+    def __init__(self, path, fsync: bool = False):
+        self._path = path
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._entries = {}
+        line = "\n"
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Partial last line from an interrupted write
+                        continue
+                    key = record.pop("key")
+                    self._entries.setdefault(key, {}).update(record)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._file = open(fd, "a", buffering=1, encoding="utf-8")  # noqa: SIM115
+        if not line.endswith("\n"):
+            # Terminate a partial last line so it does not corrupt the
+            # next record.
+            self._file.write("\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        return False
+
+    def close(self):
+        self._file.close()
+
+    def get(self, key) -> dict | None:
+        """Get the recorded state for *key*, or None if it is unknown."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry is not None else None
+
+    def is_committed(self, key) -> bool:
+        entry = self.get(key)
+        return entry is not None and entry["state"] == COMMITTED
+
+    def _append(self, key, record):
+        line = json.dumps({"key": key, **record}) + "\n"
+        with self._lock:
+            self._file.write(line)
+            if self._fsync:
+                os.fsync(self._file.fileno())
+            self._entries.setdefault(key, {}).update(record)
+
+    def record_registered(self, key, object_id, blob_url):
+        """Record that metadata for *key* has been registered."""
+        self._append(
+            key,
+            {
+                "state": REGISTERED,
+                "object_id": object_id,
+                "blob_url": blob_url,
+            },
+        )
+
+    def record_committed(self, key):
+        """Record that the blob for *key* has been uploaded."""
+        self._append(key, {"state": COMMITTED})
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+
+from ._buffers import nbytes
+from ._hashing import blob_key
+
+logger = logging.getLogger("sumo.wrapper")
+
+# Default budget of blob bytes queued or being uploaded
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class UploadQueue:
+    """Bounded queue of async uploads, for producers that generate blobs
+    faster than they can be uploaded.
+
+    put() and put_object() queue an upload and return as soon as the
+    blob fits within *max_bytes* of blobs queued or being uploaded;
+    otherwise they wait until enough uploads have finished. Up to
+    *max_workers* uploads run concurrently. A blob larger than max_bytes
+    is admitted once nothing else is in flight.
+
+    Failed uploads do not stop the queue; join() waits for all queued
+    uploads and returns the failures. Leaving an ``async with`` block
+    joins the queue, or cancels the uploads in flight if the block
+    raised.
+
+    The queue must only be used from a single event loop, and the blobs
+    must not be modified until they are uploaded.
+
+    Args:
+        sumo: SumoClient used for the uploads
+        max_bytes: maximum total size of blobs queued or being uploaded
+        max_workers: maximum number of concurrent uploads
+        skip_unchanged: skip unchanged blobs; see BlobClient.upload_blob
+        progress: progress callback used for every blob
+        verify: send MD5 checksums with blobs queued by put(); see
+            BlobClient.upload_blob
+
+    Attributes:
+        bytes_in_flight: total size of blobs queued or being uploaded
+        results: response or object id of each finished upload, by key
+        failures: (key, exception) for each failed upload
+
+    Examples:
+        Exporting surfaces as they are computed::
+
+            async with UploadQueue(sumo, max_bytes=512 << 20) as queue:
+                for metadata, surface in simulate():
+                    await queue.put_object(case_uuid, metadata, surface)
+            for key, ex in queue.failures:
+                print(f"{key} failed: {ex}")
+    """
+
+    def __init__(
+        self,
+        sumo,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        skip_unchanged: bool = False,
+        progress=None,
+        verify: bool = False,
+    ):
+        if max_bytes <= 0 or max_workers <= 0:
+            raise ValueError("max_bytes and max_workers must be positive")
+        self._sumo = sumo
+        self._max_bytes = max_bytes
+        self._max_workers = max_workers
+        self._skip_unchanged = skip_unchanged
+        self._progress = progress
+        self._verify = verify
+        self._queue = asyncio.Queue()
+        self._budget = asyncio.Condition()
+        self._workers = []
+        self.bytes_in_flight = 0
+        self.results = {}
+        self.failures = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.join()
+        else:
+            await self.cancel()
+        return False
+
+    async def put(self, blob, url: str):
+        """Queue a blob upload to a pre-authorized URL, waiting while the
+        queue is full. Failures are reported by the URL's blob path."""
+        await self._put(
+            blob_key(url),
+            nbytes(blob),
+            lambda: self._sumo.blob_client.upload_blob_async(
+                blob,
+                url,
+                skip_unchanged=self._skip_unchanged,
+                progress=self._progress,
+                verify=self._verify,
+            ),
+        )
+
+    async def put_object(
+        self,
+        parent_id: str,
+        metadata: dict,
+        blob,
+        journal=None,
+        key: str | None = None,
+    ):
+        """Queue registering an object and uploading its blob, waiting
+        while the queue is full; see SumoClient.upload_object_async.
+
+        The object id is stored in results, and failures reported, by
+        *key*, which defaults to metadata["file"]["relative_path"].
+        """
+        if key is None:
+            key = metadata["file"]["relative_path"]
+        await self._put(
+            key,
+            nbytes(blob),
+            lambda: self._sumo.upload_object_async(
+                parent_id, metadata, blob, journal=journal, key=key
+            ),
+        )
+
+    async def _put(self, key, size, upload):
+        async with self._budget:
+            await self._budget.wait_for(
+                lambda: (
+                    self.bytes_in_flight == 0
+                    or self.bytes_in_flight + size <= self._max_bytes
+                )
+            )
+            self.bytes_in_flight += size
+        self._queue.put_nowait((key, size, upload))
+        if len(self._workers) < self._max_workers:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def _work(self):
+        while True:
+            key, size, upload = await self._queue.get()
+            try:
+                self.results[key] = await upload()
+            except Exception as ex:
+                # Not the message: it may contain a pre-authorized URL
+                logger.warning(f"Upload of {key} failed: {type(ex).__name__}")
+                self.failures.append((key, ex))
+            finally:
+                async with self._budget:
+                    self.bytes_in_flight -= size
+                    self._budget.notify_all()
+                self._queue.task_done()
+                # Do not keep the blob alive while waiting for the next
+                del upload
+
+    async def join(self) -> list:
+        """Wait until all queued uploads have finished.
+
+        Returns:
+            (key, exception) for each failed upload, in order of failure
+        """
+        try:
+            await self._queue.join()
+        finally:
+            await self.cancel()
+        return list(self.failures)
+
+    async def cancel(self):
+        """Cancel the uploads in flight, and drop queued uploads."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        async with self._budget:
+            while not self._queue.empty():
+                _, size, _ = self._queue.get_nowait()
+                self._queue.task_done()
+                self.bytes_in_flight -= size
+            self._budget.notify_all()
@@ -1,21 +1,91 @@
 import asyncio
 import contextlib
+import functools
 import logging
 import os
 import re
+import threading
 import time
+import weakref
 
 import httpx
-import jwt
 
-from ._auth_provider import cleanup_shared_keys, get_auth_provider
+from ._auth_provider import (
+    AuthProviderReplay,
+    cleanup_shared_keys,
+    get_auth_provider,
+)
+from ._batch import (
+    DEFAULT_MAX_WORKERS,
+    batched,
+    iter_in_tasks,
+    iter_in_threads,
+    run_in_task_group,
+    run_in_threads,
+)
 from ._blob_client import BlobClient
+from ._buffers import (
+    BufferWriter,
+    BytesWriter,
+    FileWriter,
+    as_writable_view,
+    request_content,
+)
+from ._bulk import (
+    BULK_UNKNOWN_ROUTE,
+    BULK_UNSUPPORTED,
+    DEFAULT_BULK_BATCH_SIZE,
+    item_result,
+    ndjson_lines,
+)
+from ._codec import JsonCodec, get_codec
+from ._compression import (
+    DEFAULT_COMPRESSION_THRESHOLD,
+    compress_body,
+    resolve_encoding,
+)
+from ._deadline import attempt_timeout, sleep_time
 from ._decorators import (
-    raise_for_status,
-    raise_for_status_async,
+    with_deadline,
+    with_deadline_async,
+)
+from ._hashing import (
+    HashIndex,
+    StreamMD5,
+    UploadStats,
+    check_md5,
+    expected_md5,
 )
+from ._hedging import HedgePolicy
 from ._logging import LogHandlerSumo
+from ._pipeline import (
+    Authorization,
+    Call,
+    Hedging,
+    Pipeline,
+    RaiseForStatus,
+    Retry,
+    Scheduling,
+)
+from ._progress import ProgressTracker
+from ._recording import (
+    AsyncRecordingTransport,
+    AsyncReplayTransport,
+    Recorder,
+    RecordingTransport,
+    Replayer,
+    ReplayTransport,
+)
 from ._retry_strategy import RetryStrategy
+from ._scheduler import PriorityScheduler
+from ._streaming import HitStreamParser
+from ._throttle import (
+    BandwidthLimiter,
+    active_limiters,
+    pace,
+    pace_async,
+)
+from ._upload_journal import COMMITTED, REGISTERED, UploadJournal
 
 logger = logging.getLogger("sumo.wrapper")
 
@@ -27,9 +97,72 @@ WELL_KNOWN = os.environ.get(
 
 well_known = None
 
+# Clients in this process, so connection pools can be reset after fork
+_live_clients = weakref.WeakSet()
+
+# Held while an unpickled client is set up from its spec
+_materialize_lock = threading.RLock()
+
+
+def _client_from_spec(spec):
+    client = SumoClient.__new__(SumoClient)
+    client._pending_spec = spec
+    return client
+
+
+def _reset_clients_after_fork():
+    # One failing client must not leave the others with the parent's
+    # sockets
+    for client in list(_live_clients):
+        try:
+            client._reset_after_fork()
+        except Exception:
+            logger.warning("Failed to reset client after fork", exc_info=True)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_clients_after_fork)
+
+
+def _follows_redirects(path) -> bool:
+    """Whether GET-requests to path are redirected to blob storage."""
+    return (
+        re.match(
+            r"^/objects\('[0-9a-fA-F-]{8}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{12}'\)/blob$",
+            path,
+        )
+        is not None
+        or re.match(
+            r"^/tasks\('[0-9a-fA-F-]{8}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{12}'\)/result$",
+            path,
+        )
+        is not None
+    )
+
+
+def _content_length(response):
+    """Size of a response body, if known before decoding."""
+    if "content-encoding" in response.headers:
+        return None
+    content_length = response.headers.get("content-length")
+    return int(content_length) if content_length is not None else None
+
+
+def _delete_invalid_shared_key(auth):
+    if auth.delete_token():
+        print(
+            "Invalid shared key detected and deleted, run again to reset automatically"
+        )
+
 
 class SumoClient:
-    """Authenticate and perform requests to the Sumo API."""
+    """Authenticate and perform requests to the Sumo API.
+
+    The synchronous methods may be called concurrently from several
+    threads: they share the underlying httpx.Client, whose connection
+    pool is thread-safe. The client's configuration must not be changed
+    while requests are in flight.
+    """
 
     _client: httpx.Client
     _async_client: httpx.AsyncClient
@@ -47,6 +180,18 @@ class SumoClient:
         http_client=None,
         async_http_client=None,
         client_id: str | None = None,
+        compression: str | None = None,
+        compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        json_codec: str | JsonCodec | None = None,
+        hash_index: str | HashIndex | None = None,
+        record_to: str | None = None,
+        replay_from: str | None = None,
+        replay_latency: bool = False,
+        hedge_policy: HedgePolicy | None = None,
+        warm_up: str | None = None,
+        scheduler: PriorityScheduler | None = None,
+        middleware: list | None = None,
+        bandwidth_limit: float | str | BandwidthLimiter | None = None,
     ):
         """Initialize a new Sumo object
 
@@ -68,57 +213,89 @@ class SumoClient:
                 Defaults to None.
             client_id (Optional[str]): Client ID for authentication. If None, will use
                 AZURE_CLIENT_ID from environment variables or the config. Defaults to None.
+            compression (Optional[str]): Content encoding for JSON request bodies;
+                "gzip", "zstd", "br" or "auto" (best available). zstd and br require
+                the zstandard and brotli packages. Defaults to None (no compression).
+            compression_threshold (int): Minimum JSON body size in bytes before
+                compression is applied. Defaults to DEFAULT_COMPRESSION_THRESHOLD.
+            json_codec (Optional[str | JsonCodec]): Codec for JSON request bodies and
+                for get_json/get_json_async; "orjson", "msgspec", "json" or a JsonCodec
+                instance. Defaults to None (request bodies are serialized by the
+                standard library, responses parsed by the fastest installed codec).
+            hash_index (Optional[str | HashIndex]): Local index of uploaded blob hashes,
+                or a path to one, used by blob uploads with skip_unchanged=True.
+                Defaults to None.
+            record_to (Optional[str]): Record all requests and responses to this file,
+                for later replay. Defaults to None.
+            replay_from (Optional[str]): Serve requests from a recording made with
+                record_to instead of the network. No authentication is performed.
+                Defaults to None.
+            replay_latency (bool): When replaying, delay each response by the time
+                it took when recorded. Defaults to False.
+            hedge_policy (Optional[HedgePolicy]): Hedge slow get_async requests by
+                sending a duplicate request. Defaults to None (no hedging).
+            warm_up (Optional[str]): Connect to the Sumo API while authentication is
+                being set up, so the first request does not pay for DNS, TCP and TLS
+                setup. "sync" waits for the connection before returning, "background"
+                does not. Only the Sumo API host is warmed up, not blob storage,
+                whose host is only known from the blob URLs. Unpickled clients do
+                not warm up. Defaults to None (no warm-up).
+            scheduler (Optional[PriorityScheduler]): Schedule async requests by
+                priority class, passed per call as priority=. Defaults to None
+                (no scheduling).
+            middleware (Optional[list[Middleware]]): Extra middleware for the
+                request pipeline, run once per call, after authorization and
+                before retries. Also used for blob uploads. Defaults to None.
+            bandwidth_limit (Optional[float | str | BandwidthLimiter]): Limit for
+                blob uploads and downloads by this client, in bytes per second
+                (e.g. 10485760 or "10M"), or a BandwidthLimiter shared with other
+                clients. The SUMO_BANDWIDTH_LIMIT environment variable sets an
+                additional process-wide limit. Defaults to None (no limit).
         """
 
+        if (record_to or replay_from) and (http_client or async_http_client):
+            raise ValueError(
+                "record_to and replay_from cannot be combined with "
+                "http_client or async_http_client"
+            )
+        if record_to and replay_from:
+            raise ValueError("Both record_to and replay_from given.")
+
         if retry_strategy is None:
             retry_strategy = RetryStrategy()
         logger.setLevel(verbosity)
         global well_known
-        if well_known is None:
-
-            def _get():
-                return httpx.get(WELL_KNOWN, timeout=timeout)
-
-            retryer = retry_strategy.make_retryer()
-            well_known = retryer(_get).json()
-        if env not in well_known["envs"]:
-            raise ValueError(f"Invalid environment: {env}")
-
-        tenant_id = well_known["tenant_id"]
-        authority_host = well_known["authority"]
-        config = well_known["envs"][env]
-        resource_id = config["resource_id"]
-        base_url = config["base_url"]
-        self.client_id = (
-            client_id
-            or os.environ.get("AZURE_CLIENT_ID")
-            or config["client_id"]
-        )
-        self.env = env
-        self._verbosity = verbosity
-
-        self._retry_strategy = retry_strategy
-        if http_client is None:
-            self._client = httpx.Client()
-            self._borrowed_client = False
+        recorder = None
+        replayer = None
+        if replay_from is not None:
+            replayer = Replayer(replay_from)
+            connection_info = replayer.json("GET", WELL_KNOWN)
         else:
-            self._client = http_client
-            self._borrowed_client = True
-
-        if async_http_client is None:
-            self._async_client = httpx.AsyncClient()
-            self._borrowed_async_client = False
-        else:
-            self._async_client = async_http_client
-            self._borrowed_async_client = True
+            if well_known is None:
+
+                def _get():
+                    return httpx.get(WELL_KNOWN, timeout=timeout)
+
+                retryer = retry_strategy.make_retryer()
+                well_known = retryer(_get).json()
+            connection_info = well_known
+            if record_to is not None:
+                recorder = Recorder(record_to)
+                recorder.record_json("GET", WELL_KNOWN, connection_info)
+        if env not in connection_info["envs"]:
+            raise ValueError(f"Invalid environment: {env}")
 
-        self._timeout = timeout
+        tenant_id = connection_info["tenant_id"]
+        authority_host = connection_info["authority"]
+        config = connection_info["envs"][env]
 
         access_token = None
         refresh_token = None
         if token:
             logger.debug("Token provided")
 
+            import jwt
+
             payload = None
             with contextlib.suppress(jwt.InvalidTokenError):
                 payload = jwt.decode(
@@ -136,18 +313,307 @@ class SumoClient:
                 refresh_token = token
 
         cleanup_shared_keys()
-        self.auth = get_auth_provider(
-            client_id=self.client_id,
+        self._setup(
+            env=env,
+            base_url=config["base_url"],
+            resource_id=config["resource_id"],
             authority=f"{authority_host}{tenant_id}",
-            resource_id=resource_id,
-            interactive=interactive,
-            refresh_token=refresh_token,
+            client_id=(
+                client_id
+                or os.environ.get("AZURE_CLIENT_ID")
+                or config["client_id"]
+            ),
             access_token=access_token,
+            refresh_token=refresh_token,
+            interactive=interactive,
             devicecode=devicecode,
+            verbosity=verbosity,
+            retry_strategy=retry_strategy,
+            timeout=timeout,
             case_uuid=case_uuid,
+            http_client=http_client,
+            async_http_client=async_http_client,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            json_codec=json_codec,
+            hash_index=hash_index,
+            recorder=recorder,
+            replayer=replayer,
+            replay_latency=replay_latency,
+            hedge_policy=hedge_policy,
+            warm_up=warm_up if replayer is None else None,
+            scheduler=scheduler,
+            middleware=middleware,
+            bandwidth_limit=bandwidth_limit,
         )
 
+    def _setup(
+        self,
+        env,
+        base_url,
+        resource_id,
+        authority,
+        client_id,
+        access_token,
+        refresh_token,
+        interactive,
+        devicecode,
+        verbosity,
+        retry_strategy,
+        timeout,
+        case_uuid,
+        compression,
+        compression_threshold,
+        json_codec,
+        hash_index=None,
+        recorder=None,
+        replayer=None,
+        replay_latency=False,
+        hedge_policy=None,
+        warm_up=None,
+        scheduler=None,
+        middleware=None,
+        bandwidth_limit=None,
+        http_client=None,
+        async_http_client=None,
+    ):
+        """Set up connections and authentication from resolved
+        configuration. Shared by __init__ and unpickling."""
+        self.client_id = client_id
+        self.env = env
+        self._verbosity = verbosity
+        self._resource_id = resource_id
+        self._authority = authority
+        self._access_token = access_token
+        self._refresh_token = refresh_token
+        self._case_uuid = case_uuid
+
+        self._retry_strategy = retry_strategy
+        self._recorder = recorder
+        self._replayer = replayer
+        self._replay_latency = replay_latency
+        if http_client is None:
+            self._client = self._new_client()
+            self._borrowed_client = False
+        else:
+            self._client = http_client
+            self._borrowed_client = True
+
+        if async_http_client is None:
+            self._async_client = self._new_async_client()
+            self._borrowed_async_client = False
+        else:
+            self._async_client = async_http_client
+            self._borrowed_async_client = True
+
+        self._timeout = timeout
+        self._compression = resolve_encoding(compression)
+        self._compression_threshold = compression_threshold
+        self.json_codec = get_codec(json_codec)
+        if isinstance(hash_index, str):
+            hash_index = HashIndex(hash_index)
+        self._hash_index = hash_index
+        self.upload_stats = UploadStats()
+        self.hedge_policy = hedge_policy
+        self.scheduler = scheduler
+        if bandwidth_limit is None or isinstance(
+            bandwidth_limit, BandwidthLimiter
+        ):
+            self.bandwidth_limiter = bandwidth_limit
+        else:
+            self.bandwidth_limiter = BandwidthLimiter(bandwidth_limit)
+        # None until the bulk registration endpoint has been tried
+        self._bulk_registration = None
+
         self.base_url = base_url
+        self.warm_up_seconds = None
+        self.auth_seconds = None
+        if warm_up not in (None, "sync", "background"):
+            raise ValueError(f"Invalid warm_up: {warm_up}")
+        warm_up_thread = None
+        if warm_up is not None:
+            warm_up_thread = threading.Thread(
+                target=self._warm_up, name="sumo-warm-up", daemon=True
+            )
+            warm_up_thread.start()
+
+        auth_start = time.perf_counter()
+        if replayer is not None:
+            self.auth = AuthProviderReplay(resource_id)
+        else:
+            self.auth = get_auth_provider(
+                client_id=client_id,
+                authority=authority,
+                resource_id=resource_id,
+                interactive=interactive,
+                refresh_token=refresh_token,
+                access_token=access_token,
+                devicecode=devicecode,
+                case_uuid=case_uuid,
+            )
+
+        self.auth_seconds = time.perf_counter() - auth_start
+
+        self._middleware = list(middleware or [])
+        stack = [
+            RaiseForStatus(
+                functools.partial(_delete_invalid_shared_key, self.auth)
+            ),
+            Authorization(self.auth),
+            *self._middleware,
+            Retry(retry_strategy),
+        ]
+        if hedge_policy is not None:
+            stack.append(Hedging(hedge_policy))
+        if scheduler is not None:
+            stack.append(Scheduling(scheduler))
+        self.pipeline = Pipeline(stack)
+        # To detect changes to the pipeline, which cannot be pickled
+        self._initial_stack = tuple(stack)
+        if warm_up == "sync":
+            warm_up_thread.join()
+            logger.info(
+                f"Connection warm-up took {self.warm_up_seconds:.3f}s, "
+                f"saved {self.warm_up_saved:.3f}s by overlapping with "
+                "authentication"
+            )
+
+        _live_clients.add(self)
+
+    def _new_client(self) -> httpx.Client:
+        """New connection pool, recording or replaying if enabled."""
+        if self._recorder is not None:
+            return httpx.Client(transport=RecordingTransport(self._recorder))
+        if self._replayer is not None:
+            return httpx.Client(
+                transport=ReplayTransport(self._replayer, self._replay_latency)
+            )
+        return httpx.Client()
+
+    def _new_async_client(self) -> httpx.AsyncClient:
+        """New async connection pool, recording or replaying if enabled."""
+        if self._recorder is not None:
+            return httpx.AsyncClient(
+                transport=AsyncRecordingTransport(self._recorder)
+            )
+        if self._replayer is not None:
+            return httpx.AsyncClient(
+                transport=AsyncReplayTransport(
+                    self._replayer, self._replay_latency
+                )
+            )
+        return httpx.AsyncClient()
+
+    def _warm_up(self):
+        """Open a pooled connection to the Sumo API."""
+        start = time.perf_counter()
+        # Any response will do; only the connection matters.
+        with contextlib.suppress(httpx.HTTPError):
+            self._client.head(self.base_url, timeout=self._timeout)
+        self.warm_up_seconds = time.perf_counter() - start
+
+    @property
+    def warm_up_saved(self) -> float | None:
+        """Seconds of connection setup hidden behind authentication, or
+        None if no warm-up has completed."""
+        if self.warm_up_seconds is None or self.auth_seconds is None:
+            return None
+        return min(self.warm_up_seconds, self.auth_seconds)
+
+    def __reduce__(self):
+        """Pickle as a lightweight spec.
+
+        Connections and the authentication provider are not pickled; the
+        unpickled client rebuilds them on first use, without fetching the
+        well-known configuration again. Interactive login is never
+        attempted in the rebuilt client, so it must be able to
+        authenticate from a token, a shared key, the token cache or a
+        managed identity.
+
+        A recording client keeps recording, appending to the same file. A
+        replaying client replays the recording again from the start.
+
+        The middleware and scheduler given to the constructor are
+        pickled with the client; the unpickled scheduler starts idle.
+        Connection warm-up is not: unpickled clients connect on their
+        first request.
+
+        Raises:
+            TypeError: If middleware has been added to the pipeline after
+                construction; pass it as middleware= instead
+        """
+        pending = self.__dict__.get("_pending_spec")
+        if pending is not None:
+            # Not set up since unpickled
+            return (_client_from_spec, (pending,))
+        if tuple(self.pipeline) != self._initial_stack:
+            raise TypeError(
+                "Cannot pickle a SumoClient whose pipeline was changed "
+                "after construction; pass the middleware as middleware="
+            )
+        spec = {
+            "env": self.env,
+            "base_url": self.base_url,
+            "resource_id": self._resource_id,
+            "authority": self._authority,
+            "client_id": self.client_id,
+            "access_token": self._access_token,
+            "refresh_token": self._refresh_token,
+            "interactive": False,
+            "devicecode": False,
+            "verbosity": self._verbosity,
+            "retry_strategy": self._retry_strategy,
+            "timeout": self._timeout,
+            "case_uuid": self._case_uuid,
+            "compression": self._compression,
+            "compression_threshold": self._compression_threshold,
+            "json_codec": self.json_codec,
+            "recorder": self._recorder,
+            "replayer": self._replayer,
+            "replay_latency": self._replay_latency,
+            "hedge_policy": self.hedge_policy,
+            "scheduler": self.scheduler,
+            "middleware": self._middleware,
+            "bandwidth_limit": (
+                self.bandwidth_limiter.rate
+                if self.bandwidth_limiter is not None
+                else None
+            ),
+            "hash_index": (
+                self._hash_index.path if self._hash_index is not None else None
+            ),
+        }
+        return (_client_from_spec, (spec,))
+
+    def __getattr__(self, name):
+        # Only called for missing attributes: materialize an unpickled
+        # client on first use. The spec is kept until _setup succeeds,
+        # so a failed setup is tried again on the next access.
+        if "_pending_spec" in self.__dict__:
+            with _materialize_lock:
+                spec = self.__dict__.get("_pending_spec")
+                if spec is not None and "_materializing" not in self.__dict__:
+                    self._materializing = True
+                    try:
+                        self._setup(**spec)
+                    finally:
+                        del self._materializing
+                    del self._pending_spec
+        return object.__getattribute__(self, name)
+
+    def _reset_after_fork(self):
+        """Replace connection pools inherited from the parent process.
+
+        The inherited clients share sockets with the parent, so they are
+        dropped without being closed.
+        """
+        if "_pending_spec" in self.__dict__:
+            return
+        if not self._borrowed_client:
+            self._client = self._new_client()
+        if not self._borrowed_async_client:
+            self._async_client = self._new_async_client()
+        self.auth.reset_after_fork()
 
     def __enter__(self):
         return self
@@ -166,16 +632,18 @@ class SumoClient:
         return False
 
     def __del__(self):
-        if self._client is not None and not self._borrowed_client:
-            self._client.close()
-        if self._async_client is not None and not self._borrowed_async_client:
+        client = self.__dict__.get("_client")
+        async_client = self.__dict__.get("_async_client")
+        if client is not None and not self._borrowed_client:
+            client.close()
+        if async_client is not None and not self._borrowed_async_client:
 
             async def closeit(client):
                 await client.aclose()
 
             try:
                 loop = asyncio.get_running_loop()
-                loop.create_task(closeit(self._async_client))
+                loop.create_task(closeit(async_client))
             except RuntimeError:
                 pass
 
@@ -202,6 +670,13 @@ class SumoClient:
             Uploading blob async::
 
                 await sumo.blob_client.upload_blob_async(blob, blob_url)
+
+            Skipping blobs that are unchanged since the previous upload::
+
+                sumo = SumoClient("dev", hash_index="~/.sumo/hashes")
+
+                sumo.blob_client.upload_blob(blob, blob_url, skip_unchanged=True)
+                print(sumo.upload_stats.bytes_saved)
         """
 
         return BlobClient(
@@ -209,16 +684,111 @@ class SumoClient:
             self._async_client,
             self._timeout,
             self._retry_strategy,
+            hash_index=self._hash_index,
+            stats=self.upload_stats,
+            scheduler=self.scheduler,
+            middleware=self._middleware,
+            bandwidth_limiter=self.bandwidth_limiter,
+        )
+
+    def _encode_json(self, json) -> tuple[bytes, dict]:
+        """Serialize a JSON payload, compressing it if enabled.
+
+        Responses are decompressed by httpx, which advertises the
+        encodings it can decode in its default Accept-Encoding header.
+        """
+        content = self.json_codec.dumps(json)
+        return compress_body(
+            content, self._compression, self._compression_threshold
         )
 
+    def parse_json(self, response: httpx.Response):
+        """Parse the body of a response using the client's JSON codec.
+
+        Equivalent to response.json(), but typically much faster for
+        large search results when orjson or msgspec is installed.
+        """
+        return self.json_codec.loads(response.content)
+
+    def _slot(self, priority):
+        """Context manager holding a scheduler slot for an async request."""
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        return self.scheduler.slot(priority)
+
     def _handle_invalid_shared_key(self):
         """Handle the invalid shared key by deleting it."""
-        if self.auth.delete_token():
-            print(
-                "Invalid shared key detected and deleted, run again to reset automatically"
+        _delete_invalid_shared_key(self.auth)
+
+    def _send(self, call: Call) -> httpx.Response:
+        """Send one attempt of a call; the end of the request pipeline."""
+        if not call.stream:
+            return self._client.request(
+                call.method,
+                call.url,
+                params=call.params,
+                headers=call.headers,
+                content=call.content(),
+                follow_redirects=call.follow_redirects,
+                timeout=attempt_timeout(self._timeout),
             )
+        request = self._client.build_request(
+            call.method,
+            call.url,
+            params=call.params,
+            headers=call.headers,
+            content=call.content(),
+            timeout=attempt_timeout(self._timeout),
+        )
+        response = self._client.send(
+            request, stream=True, follow_redirects=call.follow_redirects
+        )
+        if not response.is_error and call.consume is None:
+            # Read and closed by the caller
+            return response
+        try:
+            if response.is_error:
+                response.read()
+            else:
+                call.consume(response)
+        finally:
+            response.close()
+        return response
+
+    async def _send_async(self, call: Call) -> httpx.Response:
+        if not call.stream:
+            return await self._async_client.request(
+                call.method,
+                call.url,
+                params=call.params,
+                headers=call.headers,
+                content=call.content(),
+                follow_redirects=call.follow_redirects,
+                timeout=attempt_timeout(self._timeout),
+            )
+        request = self._async_client.build_request(
+            call.method,
+            call.url,
+            params=call.params,
+            headers=call.headers,
+            content=call.content(),
+            timeout=attempt_timeout(self._timeout),
+        )
+        response = await self._async_client.send(
+            request, stream=True, follow_redirects=call.follow_redirects
+        )
+        if not response.is_error and call.consume is None:
+            return response
+        try:
+            if response.is_error:
+                await response.aread()
+            else:
+                await call.consume(response)
+        finally:
+            await response.aclose()
+        return response
 
-    @raise_for_status
+    @with_deadline
     def get(
         self,
         path: str,
@@ -230,6 +800,8 @@ class SumoClient:
         Args:
             path: Path to a Sumo endpoint
             params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
 
         Returns:
             Sumo JSON response as a dictionary
@@ -256,42 +828,216 @@ class SumoClient:
             "Content-Type": "application/json",
         }
 
-        headers.update(self.auth.get_authorization())
+        call = Call(
+            "GET",
+            f"{self.base_url}{path}",
+            headers=headers,
+            params=params,
+            follow_redirects=_follows_redirects(path),
+            retry_strategy=retry_strategy,
+        )
+        return self.pipeline.send(call, self._send)
 
-        follow_redirects = False
-        if (
-            re.match(
-                r"^/objects\('[0-9a-fA-F-]{8}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{12}'\)/blob$",
-                path,
-            )
-            is not None
-            or re.match(
-                r"^/tasks\('[0-9a-fA-F-]{8}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{12}'\)/result$",
-                path,
-            )
-            is not None
-        ):
-            follow_redirects = True
+    @with_deadline
+    def get_json(
+        self,
+        path: str,
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+    ):
+        """Performs a GET-request to the Sumo API and parses the response.
 
-        def _get():
-            return self._client.get(
-                f"{self.base_url}{path}",
-                params=params,
-                headers=headers,
-                follow_redirects=follow_redirects,
-                timeout=self._timeout,
-            )
+        Args:
+            path: Path to a Sumo endpoint
+            params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+
+        Returns:
+            Parsed JSON response
+
+        Examples:
+            Searching for cases::
+
+                sumo = SumoClient("dev")
+
+                hits = sumo.get_json(
+                    path="/search",
+                    params={"$query": "class:case", "$size": 3},
+                )["hits"]["hits"]
+        """
+        return self.parse_json(
+            self.get(path, params=params, retry_strategy=retry_strategy)
+        )
+
+    def stream_search(
+        self,
+        path: str = "/search",
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+    ):
+        """Performs a search and yields the hits one at a time.
+
+        The response body is parsed incrementally as it is received, so
+        only a single hit is held in memory at any time, regardless of
+        the size of the result set.
 
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer()
-        return retryer(_get)
+        Args:
+            path: Path to a Sumo search endpoint
+            params: query parameters, as dictionary
+
+        Yields:
+            Each element of hits.hits in the response, parsed
+
+        Examples:
+            Iterating over a large search result::
+
+                sumo = SumoClient("dev")
+
+                for hit in sumo.stream_search(
+                    params={"$query": f"fmu.case.uuid:{case_uuid}", "$size": 10000}
+                ):
+                    print(hit["_id"])
+        """
+
+        headers = {
+            "Content-Type": "application/json",
+        }
+
+        call = Call(
+            "GET",
+            f"{self.base_url}{path}",
+            params=params,
+            headers=headers,
+            retry_strategy=retry_strategy,
+            stream=True,
+        )
+        response = self.pipeline.send(call, self._send)
+        try:
+            parser = HitStreamParser(self.json_codec.loads)
+            for chunk in response.iter_bytes():
+                yield from parser.feed(chunk)
+        finally:
+            response.close()
+
+    @with_deadline
+    def read_blob_into(
+        self,
+        object_id: str,
+        buffer,
+        retry_strategy: RetryStrategy | None = None,
+        progress=None,
+        verify: bool = False,
+    ) -> int:
+        """Download the blob of an object straight into a buffer.
+
+        The body is copied into the buffer as it is received, without
+        allocating the whole blob, so a stack of blobs can be read into
+        slices of one preallocated array.
+
+        Args:
+            object_id: uuid of the object
+            buffer: writable, contiguous buffer-protocol object (bytearray,
+                memoryview, mmap, numpy array) of exactly the blob's size
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            progress: callback receiving a Progress as the blob is
+                received, e.g. a ProgressReporter
+            verify: check the blob against the MD5 stored with it, if
+                any; the blob is hashed as it is received
+
+        Returns:
+            Number of bytes read
+
+        Raises:
+            ValueError: If the blob size does not match the buffer size
+            ChecksumMismatchError: If verify is set and the blob does not
+                match its stored MD5
+
+        Examples:
+            Reading realizations into one array::
+
+                sumo = SumoClient("dev")
 
-    @raise_for_status
+                stack = numpy.empty((len(object_ids), nrow, ncol), "<f4")
+                for i, object_id in enumerate(object_ids):
+                    sumo.read_blob_into(object_id, stack[i])
+        """
+        view = as_writable_view(buffer)
+        return self._read_blob(
+            object_id,
+            lambda response: BufferWriter(view, response),
+            retry_strategy,
+            progress,
+            verify,
+        )
+
+    def _read_blob(
+        self,
+        object_id,
+        make_writer,
+        retry_strategy=None,
+        progress=None,
+        verify=False,
+    ):
+        """Stream the blob of an object into the writer returned by
+        make_writer(response), which is called for every attempt.
+
+        Returns:
+            The result of closing the writer
+        """
+        path = f"/objects('{object_id}')/blob"
+
+        result = None
+        tracker = (
+            ProgressTracker(progress, object_id)
+            if progress is not None
+            else None
+        )
+        limiters = active_limiters(self.bandwidth_limiter)
+
+        def _consume(response):
+            nonlocal result
+            writer = make_writer(response)
+            if tracker is not None:
+                tracker.restart(_content_length(response))
+            expected = expected_md5(response) if verify else None
+            hasher = StreamMD5() if expected is not None else None
+            try:
+                for chunk in response.iter_bytes():
+                    writer.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    if tracker is not None:
+                        tracker.update(len(chunk))
+                    pace(limiters, len(chunk))
+                if hasher is not None:
+                    check_md5(hasher.base64digest(), expected, object_id)
+            except BaseException:
+                writer.abort()
+                raise
+            finally:
+                if hasher is not None:
+                    hasher.close()
+            result = writer.close()
+
+        call = Call(
+            "GET",
+            f"{self.base_url}{path}",
+            follow_redirects=_follows_redirects(path),
+            retry_strategy=retry_strategy,
+            consume=_consume,
+        )
+        self.pipeline.send(call, self._send)
+        if tracker is not None:
+            tracker.finish()
+        return result
+
+    @with_deadline
     def post(
         self,
         path: str,
-        blob: bytes | None = None,
+        blob: bytes | memoryview | None = None,
         json: dict | None = None,
         params: dict | None = None,
         retry_strategy: RetryStrategy | None = None,
@@ -303,9 +1049,13 @@ class SumoClient:
 
         Args:
             path: Path to a Sumo endpoint
-            blob: Blob payload
+            blob: Blob payload; any object supporting the buffer protocol
+                (bytes, bytearray, memoryview, mmap, numpy array), sent
+                without copying
             json: Json payload
             params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
 
         Returns:
             Sumo response object
@@ -336,40 +1086,43 @@ class SumoClient:
                     json=object_metadata
                 )
         """
-        if blob and json:
+        if blob is not None and json is not None:
             raise ValueError("Both blob and json given to post.")
 
         content_type = (
-            "application/octet-stream" if blob else "application/json"
+            "application/octet-stream"
+            if blob is not None
+            else "application/json"
         )
 
         headers = {
             "Content-Type": content_type,
         }
 
-        headers.update(self.auth.get_authorization())
+        if json is not None:
+            blob, encoding_headers = self._encode_json(json)
+            headers.update(encoding_headers)
 
-        def _post():
-            return self._client.post(
-                f"{self.base_url}{path}",
-                content=blob,
-                json=json,
-                headers=headers,
-                params=params,
-                timeout=self._timeout,
-            )
-
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer()
-
-        return retryer(_post)
+        make_content, content_headers = request_content(
+            blob, asynchronous=False
+        )
+        headers.update(content_headers)
+
+        call = Call(
+            "POST",
+            f"{self.base_url}{path}",
+            headers=headers,
+            params=params,
+            make_content=make_content,
+            retry_strategy=retry_strategy,
+        )
+        return self.pipeline.send(call, self._send)
 
-    @raise_for_status
+    @with_deadline
     def put(
         self,
         path: str,
-        blob: bytes | None = None,
+        blob: bytes | memoryview | None = None,
         json: dict | None = None,
         retry_strategy: RetryStrategy | None = None,
     ) -> httpx.Response:
@@ -380,14 +1133,18 @@ class SumoClient:
 
         Args:
             path: Path to a Sumo endpoint
-            blob: Blob payload
+            blob: Blob payload; any object supporting the buffer protocol
+                (bytes, bytearray, memoryview, mmap, numpy array), sent
+                without copying
             json: Json payload
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
 
         Returns:
             Sumo response object
         """
 
-        if blob and json:
+        if blob is not None and json is not None:
             raise ValueError("Both blob and json given to post")
 
         content_type = (
@@ -400,24 +1157,25 @@ class SumoClient:
             "Content-Type": content_type,
         }
 
-        headers.update(self.auth.get_authorization())
+        if json is not None:
+            blob, encoding_headers = self._encode_json(json)
+            headers.update(encoding_headers)
 
-        def _put():
-            return self._client.put(
-                f"{self.base_url}{path}",
-                content=blob,
-                json=json,
-                headers=headers,
-                timeout=self._timeout,
-            )
-
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer()
-
-        return retryer(_put)
+        make_content, content_headers = request_content(
+            blob, asynchronous=False
+        )
+        headers.update(content_headers)
+
+        call = Call(
+            "PUT",
+            f"{self.base_url}{path}",
+            headers=headers,
+            make_content=make_content,
+            retry_strategy=retry_strategy,
+        )
+        return self.pipeline.send(call, self._send)
 
-    @raise_for_status
+    @with_deadline
     def delete(
         self,
         path: str,
@@ -429,6 +1187,8 @@ class SumoClient:
         Args:
             path: Path to a Sumo endpoint
             params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
 
         Returns:
             Sumo JSON response as a dictionary
@@ -446,21 +1206,347 @@ class SumoClient:
             "Content-Type": "application/json",
         }
 
-        headers.update(self.auth.get_authorization())
+        call = Call(
+            "DELETE",
+            f"{self.base_url}{path}",
+            headers=headers,
+            params=params,
+            retry_strategy=retry_strategy,
+        )
+        return self.pipeline.send(call, self._send)
 
-        def _delete():
-            return self._client.delete(
-                f"{self.base_url}{path}",
-                headers=headers,
-                params=params,
-                timeout=self._timeout,
+    @with_deadline
+    def get_many(
+        self,
+        paths,
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+        cancel_event: threading.Event | None = None,
+    ) -> list:
+        """Performs GET-requests for several paths concurrently, using a
+        bounded pool of threads sharing the client's connection pool.
+
+        Args:
+            paths: Paths to Sumo endpoints
+            params: query parameters, as dictionary, used for every request
+            max_workers: maximum number of concurrent requests
+            return_exceptions: return exceptions in place of responses
+                instead of raising the first failure
+            cancel_event: threading.Event; when set, requests that have
+                not started yet are cancelled
+
+        Returns:
+            Responses (or exceptions), in the same order as paths
+
+        Examples:
+            Fetching metadata for many objects::
+
+                sumo = SumoClient("dev")
+
+                responses = sumo.get_many(
+                    [f"/objects('{object_id}')" for object_id in object_ids]
+                )
+        """
+        return run_in_threads(
+            lambda path: self.get(
+                path, params=params, retry_strategy=retry_strategy
+            ),
+            paths,
+            max_workers=max_workers,
+            return_exceptions=return_exceptions,
+            cancel_event=cancel_event,
+        )
+
+    def get_blobs(
+        self,
+        object_ids,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True,
+        directory: str | None = None,
+        return_exceptions: bool = False,
+        retry_strategy: RetryStrategy | None = None,
+        progress=None,
+        verify: bool = False,
+    ):
+        """Fetches the blobs of several objects concurrently, using a
+        bounded pool of threads sharing the client's connection pool.
+
+        Args:
+            object_ids: uuids of the objects
+            max_workers: maximum number of concurrent downloads
+            ordered: yield blobs in the order of object_ids; otherwise
+                as they complete
+            directory: if given, write each blob to a file named by its
+                object id in this directory, instead of returning it
+            return_exceptions: yield exceptions in place of blobs instead
+                of raising the first failure
+            progress: progress callback used for every blob; pass a
+                TransferMonitor for aggregate progress
+            verify: check each blob against its stored MD5; see
+                read_blob_into
+
+        Yields:
+            (object_id, blob) tuples, where blob is the content as bytes,
+            or the file path when directory is given
+
+        Examples:
+            Fetching the blobs of all realizations::
+
+                sumo = SumoClient("dev")
+
+                for object_id, blob in sumo.get_blobs(object_ids):
+                    ...
+        """
+
+        def _fetch(object_id):
+            if directory is None:
+                return self._read_blob(
+                    object_id,
+                    lambda response: BytesWriter(),
+                    retry_strategy,
+                    progress,
+                    verify,
+                )
+            filename = os.path.join(directory, object_id)
+            self._read_blob(
+                object_id,
+                lambda response: FileWriter(filename),
+                retry_strategy,
+                progress,
+                verify,
             )
+            return filename
+
+        yield from iter_in_threads(
+            _fetch,
+            object_ids,
+            max_workers=max_workers,
+            ordered=ordered,
+            return_exceptions=return_exceptions,
+        )
+
+    @with_deadline
+    def delete_many(
+        self,
+        paths,
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+        cancel_event: threading.Event | None = None,
+    ) -> list:
+        """Performs DELETE-requests for several paths concurrently, using a
+        bounded pool of threads sharing the client's connection pool.
+
+        Args:
+            paths: Paths to Sumo endpoints
+            params: query parameters, as dictionary, used for every request
+            max_workers: maximum number of concurrent requests
+            return_exceptions: return exceptions in place of responses
+                instead of raising the first failure
+            cancel_event: threading.Event; when set, requests that have
+                not started yet are cancelled
+
+        Returns:
+            Responses (or exceptions), in the same order as paths
+        """
+        return run_in_threads(
+            lambda path: self.delete(
+                path, params=params, retry_strategy=retry_strategy
+            ),
+            paths,
+            max_workers=max_workers,
+            return_exceptions=return_exceptions,
+            cancel_event=cancel_event,
+        )
+
+    @with_deadline
+    def upload_object(
+        self,
+        parent_id: str,
+        metadata: dict,
+        blob: bytes | memoryview,
+        journal: UploadJournal | None = None,
+        key: str | None = None,
+    ) -> str:
+        """Register metadata for a child object and upload its blob.
+
+        With a journal, objects already committed are skipped, and an
+        object whose metadata was registered but whose blob upload did
+        not finish reuses the recorded blob URL. If that URL has expired,
+        the metadata is registered again to obtain a fresh one.
+
+        Args:
+            parent_id: uuid of the parent object (case)
+            metadata: object metadata
+            blob: blob payload
+            journal: UploadJournal recording progress
+            key: key identifying the object in the journal. Defaults to
+                metadata["file"]["relative_path"].
+
+        Returns:
+            The object id
+
+        Examples:
+            Resumable upload of many objects::
+
+                sumo = SumoClient("dev")
+
+                with UploadJournal("upload.journal") as journal:
+                    for metadata, blob in objects:
+                        sumo.upload_object(case_id, metadata, blob, journal)
+        """
+        if key is None:
+            key = metadata["file"]["relative_path"]
+        entry = journal.get(key) if journal is not None else None
+        if entry is not None and entry["state"] == COMMITTED:
+            logger.debug(f"Skipping committed object {key}")
+            return entry["object_id"]
+
+        if entry is not None and entry["state"] == REGISTERED:
+            object_id = entry["object_id"]
+            try:
+                self.blob_client.upload_blob(blob, entry["blob_url"])
+            except httpx.HTTPStatusError as ex:
+                if ex.response.status_code != 403:
+                    raise
+                logger.debug(f"Blob URL for {key} expired, re-registering")
+            else:
+                journal.record_committed(key)
+                return object_id
+
+        response = self.post(f"/objects('{parent_id}')", json=metadata)
+        result = self.parse_json(response)
+        object_id = result["objectid"]
+        blob_url = result["blob_url"]
+        if journal is not None:
+            journal.record_registered(key, object_id, blob_url)
+        self.blob_client.upload_blob(blob, blob_url)
+        if journal is not None:
+            journal.record_committed(key)
+        return object_id
+
+    def register_objects(
+        self,
+        parent_id: str,
+        metadata,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+        retry_strategy: RetryStrategy | None = None,
+    ):
+        """Register metadata for many child objects.
+
+        Metadata is sent in batches, each as one streamed NDJSON request
+        to the bulk registration endpoint, and per-object results are
+        yielded as they stream back. If the server has no bulk endpoint
+        (405 or 501, or 404 before the endpoint has worked for this
+        client), objects are registered with concurrent per-object
+        requests instead, and the client does not try the bulk endpoint
+        again.
+
+        Args:
+            parent_id: uuid of the parent object (case)
+            metadata: iterable of object metadata; consumed one batch at
+                a time
+            batch_size: number of objects per bulk request
+            max_workers: maximum number of concurrent requests when
+                registering per object
+            return_exceptions: yield exceptions in place of results
+                instead of raising the first failure
+
+        Yields:
+            (metadata, result) tuples, in input order, where result is
+            the registration response, with objectid and blob_url
+
+        Examples:
+            Registering and uploading many objects::
 
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer()
+                sumo = SumoClient("dev")
+
+                for metadata, result in sumo.register_objects(
+                    case_id, (metadata for metadata, _ in objects)
+                ):
+                    ...
+        """
+        for batch in batched(metadata, batch_size):
+            response = None
+            if self._bulk_registration is not False:
+                response = self._send_bulk(parent_id, batch, retry_strategy)
+            if response is None:
+                yield from iter_in_threads(
+                    lambda item: self.parse_json(
+                        self.post(
+                            f"/objects('{parent_id}')",
+                            json=item,
+                            retry_strategy=retry_strategy,
+                        )
+                    ),
+                    batch,
+                    max_workers=max_workers,
+                    return_exceptions=return_exceptions,
+                )
+                continue
+            try:
+                lines = (line for line in response.iter_lines() if line)
+                for item in batch:
+                    line = next(lines, None)
+                    if line is None:
+                        raise httpx.RemoteProtocolError(
+                            "Bulk registration response ended early",
+                            request=response.request,
+                        )
+                    try:
+                        result = item_result(
+                            line, self.json_codec.loads, response.request
+                        )
+                    except httpx.HTTPStatusError as ex:
+                        if not return_exceptions:
+                            raise
+                        result = ex
+                    yield item, result
+            finally:
+                response.close()
+
+    def _send_bulk(self, parent_id, batch, retry_strategy=None):
+        """Send a batch to the bulk registration endpoint.
 
-        return retryer(_delete)
+        Returns:
+            The streamed response, or None if the endpoint is unavailable
+        """
+        call = Call(
+            "POST",
+            f"{self.base_url}/objects('{parent_id}')/bulk",
+            headers={"Content-Type": "application/x-ndjson"},
+            make_content=lambda: ndjson_lines(batch, self.json_codec.dumps),
+            retry_strategy=retry_strategy,
+            stream=True,
+        )
+        try:
+            response = self.pipeline.send(call, self._send)
+        except httpx.HTTPStatusError as ex:
+            if not self._bulk_unsupported(ex):
+                raise
+            return None
+        self._bulk_registration = True
+        return response
+
+    def _bulk_unsupported(self, ex) -> bool:
+        """Whether a failed bulk request means that the server has no
+        bulk endpoint; if so, stop using it."""
+        status_code = ex.response.status_code
+        # Once the endpoint has worked, 404 means a missing parent
+        probing = (
+            status_code == BULK_UNKNOWN_ROUTE
+            and self._bulk_registration is None
+        )
+        if status_code not in BULK_UNSUPPORTED and not probing:
+            return False
+        logger.info("Bulk registration unavailable, registering per object")
+        self._bulk_registration = False
+        return True
 
     def _get_retry_details(self, response_in) -> tuple[str, int]:
         assert response_in.status_code == 202, (
@@ -476,6 +1562,7 @@ class SumoClient:
         retry_after = int(retry_after)
         return location, retry_after
 
+    @with_deadline
     def poll(
         self,
         response_in: httpx.Response,
@@ -486,6 +1573,8 @@ class SumoClient:
 
         Args:
             response_in: httpx.Response from a previous request, with 'location' and 'retry-after' headers.
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
 
         Returns:
             A new httpx.response object.
@@ -493,7 +1582,7 @@ class SumoClient:
         location, retry_after = self._get_retry_details(response_in)
         expiry = time.time() + timeout if timeout is not None else None
         while True:
-            time.sleep(retry_after)
+            time.sleep(sleep_time(retry_after))
             response = self.get(location, retry_strategy=retry_strategy)
             if response.status_code != 202:
                 return response
@@ -503,12 +1592,26 @@ class SumoClient:
                 )
             location, retry_after = self._get_retry_details(response)
 
-    def getLogger(self, name):
+    def getLogger(
+        self,
+        name,
+        rate_limit: float | None = None,
+        dedup_window: float | None = None,
+        sample_rates: dict | None = None,
+    ):
         """Gets a logger object that sends log objects into the message_log
         index for the Sumo instance.
 
         Args:
             name: string naming the logger instance
+            rate_limit: maximum records per second sent by the logger
+            dedup_window: seconds within which repeated records are
+                counted instead of sent
+            sample_rates: fraction of records to send, by level, e.g.
+                {"DEBUG": 0.1}
+
+        The limits only apply when the logger is first created; see
+        LogHandlerSumo.
 
         Returns:
             logger instance
@@ -518,7 +1621,12 @@ class SumoClient:
 
         logger = logging.getLogger(name)
         if len(logger.handlers) == 0:
-            handler = LogHandlerSumo(self)
+            handler = LogHandlerSumo(
+                self,
+                rate_limit=rate_limit,
+                dedup_window=dedup_window,
+                sample_rates=sample_rates,
+            )
             logger.addHandler(handler)
         return logger
 
@@ -542,7 +1650,10 @@ class SumoClient:
 
     def client_for_case(self, case_uuid, interactive=False):
         """Instantiate and return new SumoClient for accessing the
-        case identified by *case_uuid*."""
+        case identified by *case_uuid*.
+
+        The new client has the same options as this one, and shares its
+        hash index, scheduler and bandwidth limiter."""
         if self.auth.has_case_token(case_uuid):
             return SumoClient(
                 env=self.env,
@@ -551,22 +1662,37 @@ class SumoClient:
                 timeout=self._timeout,
                 case_uuid=case_uuid,
                 interactive=interactive,
+                compression=self._compression,
+                compression_threshold=self._compression_threshold,
+                json_codec=self.json_codec,
+                hash_index=self._hash_index,
+                hedge_policy=self.hedge_policy,
+                scheduler=self.scheduler,
+                middleware=self._middleware,
+                bandwidth_limit=self.bandwidth_limiter,
             )
         else:
             return self
 
-    @raise_for_status_async
+    @with_deadline_async
     async def get_async(
         self,
         path: str,
         params: dict | None = None,
         retry_strategy: RetryStrategy | None = None,
+        hedge: bool = True,
+        priority: str = "normal",
     ) -> httpx.Response:
         """Performs an async GET-request to the Sumo API.
 
         Args:
             path: Path to a Sumo endpoint
             params: query parameters, as dictionary
+            hedge: hedge the request according to the client's
+                hedge_policy, if any
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            priority: priority class for the client's scheduler, if any
 
         Returns:
             Sumo JSON response as a dictionary
@@ -593,46 +1719,287 @@ class SumoClient:
             "Content-Type": "application/json",
         }
 
-        headers.update(self.auth.get_authorization())
+        call = Call(
+            "GET",
+            f"{self.base_url}{path}",
+            headers=headers,
+            params=params,
+            follow_redirects=_follows_redirects(path),
+            retry_strategy=retry_strategy,
+            priority=priority,
+            hedge=hedge,
+        )
+        return await self.pipeline.send_async(call, self._send_async)
 
-        follow_redirects = False
-        if (
-            re.match(
-                r"^/objects\('[0-9a-fA-F-]{8}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{12}'\)/blob$",
-                path,
-            )
-            is not None
-            or re.match(
-                r"^/tasks\('[0-9a-fA-F-]{8}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{4}-[0-9a-fA-F-]{12}'\)/result$",
-                path,
-            )
-            is not None
-        ):
-            follow_redirects = True
+    @with_deadline_async
+    async def get_json_async(
+        self,
+        path: str,
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+        priority: str = "normal",
+    ):
+        """Performs an async GET-request to the Sumo API and parses the
+        response.
 
-        async def _get():
-            return await self._async_client.get(
-                f"{self.base_url}{path}",
+        Args:
+            path: Path to a Sumo endpoint
+            params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            priority: priority class for the client's scheduler, if any
+
+        Returns:
+            Parsed JSON response
+        """
+        return self.parse_json(
+            await self.get_async(
+                path,
                 params=params,
-                headers=headers,
-                follow_redirects=follow_redirects,
-                timeout=self._timeout,
+                retry_strategy=retry_strategy,
+                priority=priority,
             )
+        )
+
+    async def stream_search_async(
+        self,
+        path: str = "/search",
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+        priority: str = "normal",
+    ):
+        """Performs an async search and yields the hits one at a time.
+
+        See stream_search.
+
+        Args:
+            path: Path to a Sumo search endpoint
+            params: query parameters, as dictionary
+            priority: priority class for the client's scheduler, if any
+
+        Yields:
+            Each element of hits.hits in the response, parsed
 
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer_async()
+        Examples:
+            Iterating over a large search result::
+
+                async for hit in sumo.stream_search_async(
+                    params={"$query": f"fmu.case.uuid:{case_uuid}", "$size": 10000}
+                ):
+                    print(hit["_id"])
+        """
+
+        headers = {
+            "Content-Type": "application/json",
+        }
+
+        call = Call(
+            "GET",
+            f"{self.base_url}{path}",
+            params=params,
+            headers=headers,
+            retry_strategy=retry_strategy,
+            # The slot is held here while streaming, since the
+            # connection is busy
+            priority=None,
+            stream=True,
+        )
+        async with self._slot(priority):
+            response = await self.pipeline.send_async(call, self._send_async)
+            try:
+                parser = HitStreamParser(self.json_codec.loads)
+                async for chunk in response.aiter_bytes():
+                    for hit in parser.feed(chunk):
+                        yield hit
+            finally:
+                await response.aclose()
+
+    @with_deadline_async
+    async def read_blob_into_async(
+        self,
+        object_id: str,
+        buffer,
+        retry_strategy: RetryStrategy | None = None,
+        priority: str = "normal",
+        progress=None,
+        verify: bool = False,
+    ) -> int:
+        """Download the blob of an object straight into a buffer, async.
+
+        Args:
+            object_id: uuid of the object
+            buffer: writable, contiguous buffer-protocol object of exactly
+                the blob's size; see read_blob_into
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            priority: priority class for the client's scheduler, if any
+            progress: callback receiving a Progress as the blob is
+                received, e.g. a ProgressReporter
+            verify: check the blob against the MD5 stored with it, if
+                any; the blob is hashed as it is received
 
-        return await retryer(_get)
+        Returns:
+            Number of bytes read
+
+        Raises:
+            ValueError: If the blob size does not match the buffer size
+            ChecksumMismatchError: If verify is set and the blob does not
+                match its stored MD5
+        """
+        view = as_writable_view(buffer)
+        return await self._read_blob_async(
+            object_id,
+            lambda response: BufferWriter(view, response),
+            retry_strategy,
+            priority,
+            progress,
+            verify,
+        )
+
+    async def _read_blob_async(
+        self,
+        object_id,
+        make_writer,
+        retry_strategy=None,
+        priority="normal",
+        progress=None,
+        verify=False,
+    ):
+        """Async counterpart of _read_blob."""
+        path = f"/objects('{object_id}')/blob"
+
+        result = None
+        tracker = (
+            ProgressTracker(progress, object_id)
+            if progress is not None
+            else None
+        )
+        limiters = active_limiters(self.bandwidth_limiter)
+
+        async def _consume(response):
+            nonlocal result
+            writer = make_writer(response)
+            if tracker is not None:
+                tracker.restart(_content_length(response))
+            expected = expected_md5(response) if verify else None
+            hasher = StreamMD5() if expected is not None else None
+            try:
+                async for chunk in response.aiter_bytes():
+                    writer.write(chunk)
+                    if hasher is not None:
+                        await hasher.update_async(chunk)
+                    if tracker is not None:
+                        tracker.update(len(chunk))
+                    await pace_async(limiters, len(chunk))
+                if hasher is not None:
+                    check_md5(
+                        await hasher.base64digest_async(),
+                        expected,
+                        object_id,
+                    )
+            except BaseException:
+                writer.abort()
+                raise
+            finally:
+                if hasher is not None:
+                    hasher.close()
+            result = writer.close()
+
+        call = Call(
+            "GET",
+            f"{self.base_url}{path}",
+            follow_redirects=_follows_redirects(path),
+            retry_strategy=retry_strategy,
+            priority=priority,
+            consume=_consume,
+        )
+        await self.pipeline.send_async(call, self._send_async)
+        if tracker is not None:
+            tracker.finish()
+        return result
 
-    @raise_for_status_async
+    async def get_blobs_async(
+        self,
+        object_ids,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True,
+        directory: str | None = None,
+        return_exceptions: bool = False,
+        retry_strategy: RetryStrategy | None = None,
+        priority: str = "bulk",
+        progress=None,
+        verify: bool = False,
+    ):
+        """Fetches the blobs of several objects concurrently, async.
+
+        Args:
+            object_ids: uuids of the objects
+            max_concurrency: maximum number of concurrent downloads
+            ordered: yield blobs in the order of object_ids; otherwise
+                as they complete
+            directory: if given, write each blob to a file named by its
+                object id in this directory, instead of returning it
+            return_exceptions: yield exceptions in place of blobs instead
+                of raising the first failure
+            priority: priority class for the client's scheduler, if any
+            progress: progress callback used for every blob; pass a
+                TransferMonitor for aggregate progress
+            verify: check each blob against its stored MD5; see
+                read_blob_into
+
+        Yields:
+            (object_id, blob) tuples; see get_blobs
+
+        Examples:
+            Fetching the blobs of all realizations, as they arrive::
+
+                async for object_id, blob in sumo.get_blobs_async(
+                    object_ids, ordered=False
+                ):
+                    ...
+        """
+
+        async def _fetch(object_id):
+            if directory is None:
+                return await self._read_blob_async(
+                    object_id,
+                    lambda response: BytesWriter(),
+                    retry_strategy,
+                    priority,
+                    progress,
+                    verify,
+                )
+            filename = os.path.join(directory, object_id)
+            # Local writes are small and fast compared to the download, so
+            # they are done on the event loop.
+            await self._read_blob_async(
+                object_id,
+                lambda response: FileWriter(filename),
+                retry_strategy,
+                priority,
+                progress,
+                verify,
+            )
+            return filename
+
+        async for item in iter_in_tasks(
+            _fetch,
+            object_ids,
+            max_concurrency=max_concurrency,
+            ordered=ordered,
+            return_exceptions=return_exceptions,
+        ):
+            yield item
+
+    @with_deadline_async
     async def post_async(
         self,
         path: str,
-        blob: bytes | None = None,
+        blob: bytes | memoryview | None = None,
         json: dict | None = None,
         params: dict | None = None,
         retry_strategy: RetryStrategy | None = None,
+        priority: str = "normal",
     ) -> httpx.Response:
         """Performs an async POST-request to the Sumo API.
 
@@ -641,9 +2008,14 @@ class SumoClient:
 
         Args:
             path: Path to a Sumo endpoint
-            blob: Blob payload
+            blob: Blob payload; any object supporting the buffer protocol
+                (bytes, bytearray, memoryview, mmap, numpy array), sent
+                without copying
             json: Json payload
             params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            priority: priority class for the client's scheduler, if any
 
         Returns:
             Sumo response object
@@ -675,42 +2047,47 @@ class SumoClient:
                 )
         """
 
-        if blob and json:
+        if blob is not None and json is not None:
             raise ValueError("Both blob and json given to post.")
 
         content_type = (
-            "application/octet-stream" if blob else "application/json"
+            "application/octet-stream"
+            if blob is not None
+            else "application/json"
         )
 
         headers = {
             "Content-Type": content_type,
         }
 
-        headers.update(self.auth.get_authorization())
+        if json is not None:
+            blob, encoding_headers = self._encode_json(json)
+            headers.update(encoding_headers)
 
-        async def _post():
-            return await self._async_client.post(
-                url=f"{self.base_url}{path}",
-                content=blob,
-                json=json,
-                headers=headers,
-                params=params,
-                timeout=self._timeout,
-            )
-
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer_async()
-
-        return await retryer(_post)
+        make_content, content_headers = request_content(
+            blob, asynchronous=True
+        )
+        headers.update(content_headers)
+
+        call = Call(
+            "POST",
+            f"{self.base_url}{path}",
+            headers=headers,
+            params=params,
+            make_content=make_content,
+            retry_strategy=retry_strategy,
+            priority=priority,
+        )
+        return await self.pipeline.send_async(call, self._send_async)
 
-    @raise_for_status_async
+    @with_deadline_async
     async def put_async(
         self,
         path: str,
-        blob: bytes | None = None,
+        blob: bytes | memoryview | None = None,
         json: dict | None = None,
         retry_strategy: RetryStrategy | None = None,
+        priority: str = "normal",
     ) -> httpx.Response:
         """Performs an async PUT-request to the Sumo API.
 
@@ -719,14 +2096,19 @@ class SumoClient:
 
         Args:
             path: Path to a Sumo endpoint
-            blob: Blob payload
+            blob: Blob payload; any object supporting the buffer protocol
+                (bytes, bytearray, memoryview, mmap, numpy array), sent
+                without copying
             json: Json payload
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            priority: priority class for the client's scheduler, if any
 
         Returns:
             Sumo response object
         """
 
-        if blob and json:
+        if blob is not None and json is not None:
             raise ValueError("Both blob and json given to post")
 
         content_type = (
@@ -739,35 +2121,41 @@ class SumoClient:
             "Content-Type": content_type,
         }
 
-        headers.update(self.auth.get_authorization())
+        if json is not None:
+            blob, encoding_headers = self._encode_json(json)
+            headers.update(encoding_headers)
 
-        async def _put():
-            return await self._async_client.put(
-                url=f"{self.base_url}{path}",
-                content=blob,
-                json=json,
-                headers=headers,
-                timeout=self._timeout,
-            )
-
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer_async()
-
-        return await retryer(_put)
+        make_content, content_headers = request_content(
+            blob, asynchronous=True
+        )
+        headers.update(content_headers)
+
+        call = Call(
+            "PUT",
+            f"{self.base_url}{path}",
+            headers=headers,
+            make_content=make_content,
+            retry_strategy=retry_strategy,
+            priority=priority,
+        )
+        return await self.pipeline.send_async(call, self._send_async)
 
-    @raise_for_status_async
+    @with_deadline_async
     async def delete_async(
         self,
         path: str,
         params: dict | None = None,
         retry_strategy: RetryStrategy | None = None,
+        priority: str = "normal",
     ) -> httpx.Response:
         """Performs an async DELETE-request to the Sumo API.
 
         Args:
             path: Path to a Sumo endpoint
             params: query parameters, as dictionary
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
+            priority: priority class for the client's scheduler, if any
 
         Returns:
             Sumo JSON response as a dictionary
@@ -785,22 +2173,271 @@ class SumoClient:
             "Content-Type": "application/json",
         }
 
-        headers.update(self.auth.get_authorization())
+        call = Call(
+            "DELETE",
+            f"{self.base_url}{path}",
+            headers=headers,
+            params=params,
+            retry_strategy=retry_strategy,
+            priority=priority,
+        )
+        return await self.pipeline.send_async(call, self._send_async)
+
+    async def delete_many_async(
+        self,
+        paths,
+        params: dict | None = None,
+        retry_strategy: RetryStrategy | None = None,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+        priority: str = "bulk",
+    ) -> list:
+        """Performs async DELETE-requests for several paths concurrently.
+
+        Requests run in an asyncio.TaskGroup: if one fails (and
+        return_exceptions is False), or the caller is cancelled, the
+        requests in flight are cancelled before this returns.
+
+        Args:
+            paths: Paths to Sumo endpoints
+            params: query parameters, as dictionary, used for every request
+            max_concurrency: maximum number of concurrent requests
+            return_exceptions: return exceptions in place of responses
+                instead of raising the first failure
+            priority: priority class for the client's scheduler, if any
+
+        Returns:
+            Responses (or exceptions), in the same order as paths
+
+        Examples:
+            Deleting the objects of a failed iteration::
 
-        async def _delete():
-            return await self._async_client.delete(
-                url=f"{self.base_url}{path}",
-                headers=headers,
+                await sumo.delete_many_async(
+                    [f"/objects('{object_id}')" for object_id in object_ids]
+                )
+        """
+
+        return await run_in_task_group(
+            lambda path: self.delete_async(
+                path,
                 params=params,
-                timeout=self._timeout,
-            )
+                retry_strategy=retry_strategy,
+                priority=priority,
+            ),
+            paths,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+        )
+
+    async def run_batch_async(
+        self,
+        calls,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+    ) -> list:
+        """Runs several async calls, e.g. post_async, delete_async or
+        upload_blob_async, concurrently in an asyncio.TaskGroup.
+
+        Unlike asyncio.gather, at most max_concurrency calls run at once,
+        and no call outlives the batch: if one fails (and
+        return_exceptions is False), or the caller is cancelled, the calls
+        in flight are cancelled and their connections released before
+        this returns.
+
+        Args:
+            calls: functions without arguments returning awaitables;
+                calls are only started once there is room for them
+            max_concurrency: maximum number of concurrent calls
+            return_exceptions: return exceptions in place of results
+                instead of raising the first failure
 
-        retryer = (
-            retry_strategy if retry_strategy else self._retry_strategy
-        ).make_retryer_async()
+        Returns:
+            Results (or exceptions), in the same order as calls
+
+        Examples:
+            Updating several objects::
+
+                responses = await sumo.run_batch_async(
+                    [
+                        functools.partial(
+                            sumo.put_async,
+                            f"/objects('{object_id}')",
+                            json=metadata,
+                        )
+                        for object_id, metadata in updates.items()
+                    ]
+                )
+        """
+
+        return await run_in_task_group(
+            lambda call: call(),
+            calls,
+            max_concurrency=max_concurrency,
+            return_exceptions=return_exceptions,
+        )
 
-        return await retryer(_delete)
+    @with_deadline_async
+    async def upload_object_async(
+        self,
+        parent_id: str,
+        metadata: dict,
+        blob: bytes | memoryview,
+        journal: UploadJournal | None = None,
+        key: str | None = None,
+    ) -> str:
+        """Register metadata for a child object and upload its blob, async.
+
+        See upload_object.
+
+        Args:
+            parent_id: uuid of the parent object (case)
+            metadata: object metadata
+            blob: blob payload
+            journal: UploadJournal recording progress
+            key: key identifying the object in the journal. Defaults to
+                metadata["file"]["relative_path"].
+
+        Returns:
+            The object id
+        """
+        if key is None:
+            key = metadata["file"]["relative_path"]
+        entry = journal.get(key) if journal is not None else None
+        if entry is not None and entry["state"] == COMMITTED:
+            logger.debug(f"Skipping committed object {key}")
+            return entry["object_id"]
+
+        if entry is not None and entry["state"] == REGISTERED:
+            object_id = entry["object_id"]
+            try:
+                await self.blob_client.upload_blob_async(
+                    blob, entry["blob_url"]
+                )
+            except httpx.HTTPStatusError as ex:
+                if ex.response.status_code != 403:
+                    raise
+                logger.debug(f"Blob URL for {key} expired, re-registering")
+            else:
+                journal.record_committed(key)
+                return object_id
+
+        response = await self.post_async(
+            f"/objects('{parent_id}')", json=metadata
+        )
+        result = self.parse_json(response)
+        object_id = result["objectid"]
+        blob_url = result["blob_url"]
+        if journal is not None:
+            journal.record_registered(key, object_id, blob_url)
+        await self.blob_client.upload_blob_async(blob, blob_url)
+        if journal is not None:
+            journal.record_committed(key)
+        return object_id
+
+    async def register_objects_async(
+        self,
+        parent_id: str,
+        metadata,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_WORKERS,
+        return_exceptions: bool = False,
+        retry_strategy: RetryStrategy | None = None,
+        priority: str = "bulk",
+    ):
+        """Register metadata for many child objects, async.
+
+        Args:
+            parent_id: uuid of the parent object (case)
+            metadata: iterable of object metadata; consumed one batch at
+                a time
+            batch_size: number of objects per bulk request
+            max_concurrency: maximum number of concurrent requests when
+                registering per object
+            return_exceptions: yield exceptions in place of results
+                instead of raising the first failure
+            priority: priority class for the client's scheduler, if any
+
+        Yields:
+            (metadata, result) tuples, in input order; see
+            register_objects
+        """
+
+        async def _register(item):
+            return self.parse_json(
+                await self.post_async(
+                    f"/objects('{parent_id}')",
+                    json=item,
+                    retry_strategy=retry_strategy,
+                    priority=priority,
+                )
+            )
+
+        for batch in batched(metadata, batch_size):
+            response = None
+            if self._bulk_registration is not False:
+                response = await self._send_bulk_async(
+                    parent_id, batch, retry_strategy, priority
+                )
+            if response is None:
+                async for pair in iter_in_tasks(
+                    _register,
+                    batch,
+                    max_concurrency=max_concurrency,
+                    return_exceptions=return_exceptions,
+                ):
+                    yield pair
+                continue
+            try:
+                lines = response.aiter_lines()
+                for item in batch:
+                    line = ""
+                    while not line:
+                        line = await anext(lines, None)
+                        if line is None:
+                            raise httpx.RemoteProtocolError(
+                                "Bulk registration response ended early",
+                                request=response.request,
+                            )
+                    try:
+                        result = item_result(
+                            line, self.json_codec.loads, response.request
+                        )
+                    except httpx.HTTPStatusError as ex:
+                        if not return_exceptions:
+                            raise
+                        result = ex
+                    yield item, result
+            finally:
+                await response.aclose()
+
+    async def _send_bulk_async(
+        self, parent_id, batch, retry_strategy=None, priority="bulk"
+    ):
+        """Async counterpart of _send_bulk."""
+
+        async def _lines():
+            for line in ndjson_lines(batch, self.json_codec.dumps):
+                yield line
+
+        call = Call(
+            "POST",
+            f"{self.base_url}/objects('{parent_id}')/bulk",
+            headers={"Content-Type": "application/x-ndjson"},
+            make_content=_lines,
+            retry_strategy=retry_strategy,
+            priority=priority,
+            stream=True,
+        )
+        try:
+            response = await self.pipeline.send_async(call, self._send_async)
+        except httpx.HTTPStatusError as ex:
+            if not self._bulk_unsupported(ex):
+                raise
+            return None
+        self._bulk_registration = True
+        return response
 
+    @with_deadline_async
     async def poll_async(
         self,
         response_in: httpx.Response,
@@ -811,6 +2448,8 @@ class SumoClient:
 
         Args:
             response_in: httpx.Response from a previous request, with 'location' and 'retry-after' headers.
+            deadline: overall time limit for the call in seconds, including
+                retries, waits and authentication
 
         Returns:
             A new httpx.response object.
@@ -818,7 +2457,7 @@ class SumoClient:
         location, retry_after = self._get_retry_details(response_in)
         expiry = time.time() + timeout if timeout is not None else None
         while True:
-            await asyncio.sleep(retry_after)
+            await asyncio.sleep(sleep_time(retry_after))
             response = await self.get_async(
                 location, retry_strategy=retry_strategy
             )
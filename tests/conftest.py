@@ -1,13 +1,37 @@
 import os
+import time
 
+import httpx
+import jwt
+import pytest
+
+import sumo.wrapper.sumo_client
 from sumo.wrapper import SumoClient
 
+# Connection info and token for offline clients; no request leaves the
+# process
+OFFLINE_WELL_KNOWN = {
+    "tenant_id": "tenant",
+    "authority": "https://login.example/",
+    "envs": {
+        "dev": {
+            "resource_id": "api://sumo",
+            "base_url": "https://sumo.example/api/v1",
+            "client_id": "client",
+        }
+    },
+}
+
 
 def pytest_addoption(parser):
     parser.addoption("--token", action="store", default="")
 
 
 def pytest_generate_tests(metafunc):
+    # Only tests against the Sumo API need a login
+    if "token" not in metafunc.fixturenames:
+        return
+
     # token = metafunc.config.option.token
     token = os.environ.get("ACCESS_TOKEN")
     token = token if token and len(token) > 0 else None
@@ -15,5 +39,32 @@ def pytest_generate_tests(metafunc):
     if token is None:
         _ = SumoClient(env="dev", interactive=True)
 
-    if "token" in metafunc.fixturenames:
-        metafunc.parametrize("token", [token])
+    metafunc.parametrize("token", [token])
+
+
+def offline_token(lifetime=3600):
+    return jwt.encode(
+        {"exp": int(time.time()) + lifetime, "aud": "api://sumo"},
+        "secret" * 6,
+        algorithm="HS256",
+    )
+
+
+@pytest.fixture
+def offline_client(monkeypatch):
+    """Factory of SumoClients whose requests are answered by a handler
+    function, through httpx.MockTransport."""
+    monkeypatch.setattr(
+        sumo.wrapper.sumo_client, "well_known", OFFLINE_WELL_KNOWN
+    )
+
+    def _make(handler=None, **kwargs):
+        if handler is not None:
+            transport = httpx.MockTransport(handler)
+            kwargs.setdefault("http_client", httpx.Client(transport=transport))
+            kwargs.setdefault(
+                "async_http_client", httpx.AsyncClient(transport=transport)
+            )
+        return SumoClient(env="dev", token=offline_token(), **kwargs)
+
+    return _make
@@ -0,0 +1,197 @@
+"""Offline tests of the batch helpers: get_many, delete_many, upload_blobs
+and their async counterparts"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import httpx
+import pytest
+
+
+class _SlowServer:
+    """Async handler answering paths starting with /fail with 404 after
+    a short delay, and other paths only after a long one, recording the
+    requests that were cancelled while in flight."""
+
+    def __init__(self, delay=10.0):
+        self.delay = delay
+        self.started = []
+        self.cancelled = []
+
+    async def __call__(self, request):
+        path = request.url.path.removeprefix("/api/v1")
+        self.started.append(path)
+        if path.startswith("/fail"):
+            await asyncio.sleep(0.01)
+            return httpx.Response(404)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(path)
+            raise
+        return httpx.Response(204)
+
+
+def test_delete_many_async_fail_fast_cancels_in_flight(offline_client):
+    server = _SlowServer()
+    sumo = offline_client(server)
+
+    start = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(sumo.delete_many_async(["/slow1", "/fail", "/slow2"]))
+
+    assert time.monotonic() - start < server.delay / 2
+    assert sorted(server.cancelled) == ["/slow1", "/slow2"]
+
+
+def test_delete_many_async_return_exceptions(offline_client):
+    server = _SlowServer(delay=0.01)
+    sumo = offline_client(server)
+
+    results = asyncio.run(
+        sumo.delete_many_async(["/a", "/fail", "/b"], return_exceptions=True)
+    )
+
+    assert [type(result) for result in results] == [
+        httpx.Response,
+        httpx.HTTPStatusError,
+        httpx.Response,
+    ]
+    assert server.cancelled == []
+
+
+def test_cancelling_caller_cancels_task_group(offline_client):
+    server = _SlowServer()
+    sumo = offline_client(server)
+
+    async def _run():
+        batch = asyncio.create_task(
+            sumo.run_batch_async(
+                [
+                    functools.partial(sumo.delete_async, f"/slow{i}")
+                    for i in range(6)
+                ],
+                max_concurrency=3,
+            )
+        )
+        while len(server.started) < 3:
+            await asyncio.sleep(0.01)
+        batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await batch
+
+    start = time.monotonic()
+    asyncio.run(_run())
+
+    assert time.monotonic() - start < server.delay / 2
+    # Calls not started yet are never started
+    assert len(server.started) == 3
+    assert sorted(server.cancelled) == sorted(server.started)
+
+
+def _reversed_delays(n):
+    """Sync handler finishing requests for later items first, so results
+    complete out of input order. Paths containing "fail" get 404."""
+
+    def _handle(request):
+        name = request.url.path.rsplit("/", 1)[-1]
+        if "fail" in name:
+            return httpx.Response(404)
+        index = int(name.removeprefix("b").removeprefix("p"))
+        time.sleep(0.01 * (n - index))
+        return httpx.Response(200, text=name)
+
+    return _handle
+
+
+def _blob_pairs(n):
+    return [
+        (bytes([i]), f"https://blob.example/c/b{i}?sig=s") for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("method", ["get_many", "delete_many"])
+def test_many_keeps_input_order(offline_client, method):
+    sumo = offline_client(_reversed_delays(6))
+
+    responses = getattr(sumo, method)([f"/p{i}" for i in range(6)])
+
+    assert [response.text for response in responses] == [
+        f"p{i}" for i in range(6)
+    ]
+
+
+def test_upload_blobs_keeps_input_order(offline_client):
+    sumo = offline_client(_reversed_delays(6))
+
+    responses = sumo.blob_client.upload_blobs(_blob_pairs(6))
+
+    assert [response.text for response in responses] == [
+        f"b{i}" for i in range(6)
+    ]
+
+
+@pytest.mark.parametrize("method", ["get_many", "delete_many"])
+def test_many_return_exceptions(offline_client, method):
+    sumo = offline_client(_reversed_delays(3))
+    paths = ["/p0", "/fail", "/p2"]
+
+    results = getattr(sumo, method)(paths, return_exceptions=True)
+
+    assert results[0].text == "p0"
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert results[2].text == "p2"
+    with pytest.raises(httpx.HTTPStatusError):
+        getattr(sumo, method)(paths)
+
+
+def test_upload_blobs_return_exceptions(offline_client):
+    sumo = offline_client(_reversed_delays(3))
+    pairs = _blob_pairs(3)
+    pairs[1] = (b"x", "https://blob.example/c/fail?sig=s")
+
+    results = sumo.blob_client.upload_blobs(pairs, return_exceptions=True)
+
+    assert isinstance(results[1], httpx.HTTPStatusError)
+    assert [results[0].text, results[2].text] == ["b0", "b2"]
+
+
+def _cancelling(cancel_event):
+    """Sync handler setting cancel_event when it gets the first
+    request."""
+
+    def _handle(request):
+        cancel_event.set()
+        return httpx.Response(200, text=request.url.path.rsplit("/")[-1])
+
+    return _handle
+
+
+@pytest.mark.parametrize("method", ["get_many", "delete_many"])
+def test_many_cancel_event(offline_client, method):
+    cancel_event = threading.Event()
+    sumo = offline_client(_cancelling(cancel_event))
+
+    results = getattr(sumo, method)(
+        ["/p0", "/p1", "/p2"],
+        max_workers=1,
+        return_exceptions=True,
+        cancel_event=cancel_event,
+    )
+
+    assert results[0].text == "p0"
+    assert all(isinstance(result, CancelledError) for result in results[1:])
+
+
+def test_upload_blobs_cancel_event(offline_client):
+    cancel_event = threading.Event()
+    sumo = offline_client(_cancelling(cancel_event))
+
+    with pytest.raises(CancelledError):
+        sumo.blob_client.upload_blobs(
+            _blob_pairs(3), max_workers=1, cancel_event=cancel_event
+        )
+    assert cancel_event.is_set()
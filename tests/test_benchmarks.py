@@ -0,0 +1,447 @@
+"""Offline benchmarks for the performance features of the wrapper.
+
+These do not talk to Sumo; run with ``pytest -s`` to see the numbers.
+"""
+
+import asyncio
+import base64
+import hashlib
+import http.server
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+import httpx
+import yaml
+
+sys.path.append(os.path.abspath(os.path.join("src")))
+
+from sumo.wrapper._blob_client import BlobClient
+from sumo.wrapper._buffers import DEFAULT_CHUNK_SIZE, iter_chunks
+from sumo.wrapper._codec import available_codecs, get_codec
+from sumo.wrapper._compression import available_encodings, compress
+from sumo.wrapper._logging import LogHandlerSumo
+from sumo.wrapper._progress import ProgressTracker
+from sumo.wrapper._retry_events import (
+    DEFAULT_MAX_LOGGED_PER_INTERVAL,
+    log_retry,
+    retry_stats,
+)
+from sumo.wrapper._retry_strategy import RetryStrategy
+from sumo.wrapper._streaming import HitStreamParser
+from sumo.wrapper._throttle import BandwidthLimiter
+from sumo.wrapper._upload_queue import UploadQueue
+
+
+def _search_response(n_hits=200):
+    with open("tests/testdata/surface.yml", "r") as stream:
+        surface = yaml.safe_load(stream)
+    hits = []
+    for i in range(n_hits):
+        source = json.loads(json.dumps(surface))
+        source["fmu"]["realization"]["id"] = i
+        hits.append({"_id": f"{i:032x}", "_source": source})
+    return {"hits": {"total": {"value": n_hits}, "hits": hits}}
+
+
+def test_compression_bytes_on_wire_and_cpu():
+    payload = json.dumps(
+        _search_response(), separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+    for encoding in available_encodings():
+        start = time.perf_counter()
+        compressed = compress(payload, encoding)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{encoding}: {len(payload)} -> {len(compressed)} bytes "
+            f"({len(compressed) / len(payload):.1%}) in {elapsed * 1000:.1f} ms"
+        )
+        # FMU metadata is highly repetitive; expect a large reduction.
+        assert len(compressed) < len(payload) / 5
+
+
+def test_json_codecs_on_fmu_metadata():
+    response = json.loads(json.dumps(_search_response(), default=str))
+    expected = json.dumps(response, sort_keys=True)
+
+    for name in available_codecs():
+        codec = get_codec(name)
+        start = time.perf_counter()
+        for _ in range(10):
+            data = codec.dumps(response)
+        dumps_elapsed = (time.perf_counter() - start) / 10
+        start = time.perf_counter()
+        for _ in range(10):
+            parsed = codec.loads(data)
+        loads_elapsed = (time.perf_counter() - start) / 10
+        print(
+            f"{name}: dumps {dumps_elapsed * 1000:.2f} ms, "
+            f"loads {loads_elapsed * 1000:.2f} ms for {len(data)} bytes"
+        )
+        assert json.dumps(parsed, sort_keys=True) == expected
+
+
+def test_streaming_search_parser_peak_memory():
+    response = _search_response(n_hits=1000)
+    data = json.dumps(response, default=str).encode("utf-8")
+    chunk_size = 64 * 1024
+
+    tracemalloc.start()
+    parser = HitStreamParser(json.loads)
+    count = 0
+    for i in range(0, len(data), chunk_size):
+        count += len(parser.feed(data[i : i + chunk_size]))
+    _, streaming_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    parsed = json.loads(data)
+    _, full_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{len(data)} bytes: streaming peak {streaming_peak} bytes, "
+        f"full parse peak {full_peak} bytes"
+    )
+    assert count == len(parsed["hits"]["hits"])
+    assert streaming_peak < full_peak / 10
+
+
+def test_buffer_upload_peak_memory():
+    # Small by default to spare CI runners; set SUMO_BENCHMARK_UPLOAD_MB,
+    # e.g. to 1024, for the large case
+    size = int(os.environ.get("SUMO_BENCHMARK_UPLOAD_MB", "16")) << 20
+    payload = bytearray(size)
+    received = []
+
+    class _Transport(httpx.BaseTransport):
+        # Consume the body chunk by chunk, like a socket would
+        def handle_request(self, request):
+            received.append(sum(len(chunk) for chunk in request.stream))
+            return httpx.Response(201)
+
+    with httpx.Client(transport=_Transport()) as client:
+        blob_client = BlobClient(client, None, 30, RetryStrategy())
+
+        tracemalloc.start()
+        blob_client.upload_blob(payload, "https://blob.example/x")
+        _, buffer_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        blob_client.upload_blob(bytes(payload), "https://blob.example/x")
+        _, copy_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(
+        f"upload of {size >> 20} MB: peak {buffer_peak >> 20} MB as buffer, "
+        f"{copy_peak >> 20} MB when copied to bytes first"
+    )
+    assert received == [size, size]
+    assert buffer_peak < 4 * DEFAULT_CHUNK_SIZE
+    assert copy_peak >= size
+
+
+def test_import_time_without_auth_libraries():
+    # Run in a fresh interpreter, as this process has imported everything
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import sumo.wrapper\n"
+        "print(time.perf_counter() - start)\n"
+        "for name in ('msal', 'msal_extensions', 'azure.identity', 'jwt',\n"
+        "             'orjson', 'msgspec', 'zstandard', 'brotli'):\n"
+        "    print(name in sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.abspath("src"))
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    print(f"import sumo.wrapper: {float(output[0]) * 1000:.0f} ms")
+    # Heavy auth, JSON and compression libraries are loaded by the code
+    # needing them
+    assert output[1:] == ["False"] * 8
+
+
+def test_progress_tracking_overhead():
+    view = memoryview(bytearray(64 << 20))
+    chunk_size = 64 * 1024
+    n_chunks = len(view) // chunk_size
+    reports = []
+
+    def _consume(tracker):
+        start = time.perf_counter()
+        for _ in iter_chunks(view, chunk_size, tracker):
+            pass
+        return time.perf_counter() - start
+
+    untracked = _consume(None)
+    tracker = ProgressTracker(reports.append, "blob", len(view))
+    tracked = _consume(tracker)
+    tracker.finish()
+    overhead = (tracked - untracked) / n_chunks
+    print(f"progress tracking: {overhead * 1e9:.0f} ns per chunk")
+
+    assert tracker.bytes_done == len(view)
+    # Throttled to one report per interval, plus the final one
+    assert len(reports) <= tracked / tracker._interval + 1
+    assert reports[-1].finished
+    assert reports[-1].bytes_done == reports[-1].total == len(view)
+
+
+class _SinkHandler(http.server.BaseHTTPRequestHandler):
+    # Stand-in for blob storage: read PUT bodies off the socket
+    def do_PUT(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 16)))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_bandwidth_limit_pacing():
+    size = 2 << 20
+    rate = 1 << 20
+    payload = bytearray(size)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/blob"
+
+    def _expected(limiter):
+        # The initial burst is sent at once, the rest at the rate
+        return (size - limiter.burst) / rate
+
+    try:
+        with httpx.Client() as client:
+            limiter = BandwidthLimiter(rate)
+            blob_client = BlobClient(
+                client, None, 30, RetryStrategy(), bandwidth_limiter=limiter
+            )
+            start = time.perf_counter()
+            blob_client.upload_blob(payload, url)
+            sync_elapsed = time.perf_counter() - start
+            sync_expected = _expected(limiter)
+
+        async def _upload():
+            async with httpx.AsyncClient() as async_client:
+                limiter = BandwidthLimiter(rate)
+                blob_client = BlobClient(
+                    None,
+                    async_client,
+                    30,
+                    RetryStrategy(),
+                    bandwidth_limiter=limiter,
+                )
+                start = time.perf_counter()
+                await blob_client.upload_blob_async(payload, url)
+                return time.perf_counter() - start, _expected(limiter)
+
+        async_elapsed, async_expected = asyncio.run(_upload())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(
+        f"upload of {size >> 20} MB at {rate >> 20} MB/s: "
+        f"{sync_elapsed:.2f} s sync, {async_elapsed:.2f} s async, "
+        f"{sync_expected:.2f} s expected"
+    )
+    for elapsed, expected in (
+        (sync_elapsed, sync_expected),
+        (async_elapsed, async_expected),
+    ):
+        # Only the lower bound is reliable; loaded CI runners are slow
+        assert elapsed >= expected * 0.95
+
+
+def test_upload_queue_bounds_memory():
+    blob_size = 4 << 20
+    max_bytes = 16 << 20
+    n_blobs = 32
+    received = []
+
+    class _Transport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            await asyncio.sleep(0.01)
+            received.append(
+                sum([len(chunk) async for chunk in request.stream])
+            )
+            return httpx.Response(201)
+
+    async def _produce():
+        async with httpx.AsyncClient(transport=_Transport()) as client:
+            sumo = types.SimpleNamespace(
+                blob_client=BlobClient(None, client, 30, RetryStrategy())
+            )
+            queue = UploadQueue(sumo, max_bytes=max_bytes, max_workers=4)
+            tracemalloc.start()
+            for i in range(n_blobs):
+                # A fast producer: each blob is new memory
+                await queue.put(bytearray(blob_size), f"https://b.x/{i}")
+                assert queue.bytes_in_flight <= max_bytes
+            failures = await queue.join()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return failures, peak
+
+    failures, peak = asyncio.run(_produce())
+    print(
+        f"upload queue of {n_blobs} x {blob_size >> 20} MB blobs: "
+        f"peak {peak >> 20} MB with a {max_bytes >> 20} MB budget"
+    )
+    assert failures == []
+    assert received == [blob_size] * n_blobs
+    assert peak < max_bytes + 2 * blob_size
+
+
+def test_retry_storm_logging(caplog):
+    n_retries = 10000
+
+    def _storm(before_sleep):
+        attempts = iter(range(n_retries + 1))
+
+        def _flaky():
+            if next(attempts) < n_retries:
+                raise httpx.ConnectError("refused")
+            return httpx.Response(200)
+
+        retryer = RetryStrategy(
+            stop_after=n_retries + 1, multiplier=0, before_sleep=before_sleep
+        ).make_retryer()
+        start = time.perf_counter()
+        assert retryer(_flaky).status_code == 200
+        return time.perf_counter() - start
+
+    retry_stats.reset()
+    with caplog.at_level(logging.INFO, logger="sumo.wrapper"):
+        untracked = _storm(None)
+        tracked = _storm(log_retry)
+        # Reading the counters logs the summary of suppressed retries
+        stats = retry_stats.snapshot()
+    overhead = (tracked - untracked) / n_retries
+
+    print(
+        f"retry storm: {overhead * 1e6:.1f} us per retry for telemetry, "
+        f"{len(caplog.records)} records for {n_retries} retries"
+    )
+    assert stats["retries"] == n_retries
+    assert stats["by_cause"] == {"ConnectError": n_retries}
+    assert len(caplog.records) <= DEFAULT_MAX_LOGGED_PER_INTERVAL + 1
+    assert caplog.records[0].retry_event.attempt == 1
+    summarized = sum(
+        sum(record.retry_summary.values())
+        for record in caplog.records
+        if hasattr(record, "retry_summary")
+    )
+    individual = sum(
+        hasattr(record, "retry_event") for record in caplog.records
+    )
+    assert summarized + individual == n_retries
+
+
+def test_log_handler_storm():
+    n_records = 20000
+
+    class _MessageLog:
+        def __init__(self):
+            self.messages = []
+
+        def post(self, path, json):
+            self.messages.append(json["message"])
+
+    def _storm(**limits):
+        message_log = _MessageLog()
+        handler = LogHandlerSumo(message_log, **limits)
+        storm_logger = logging.getLogger(f"sumo.benchmark.{len(limits)}")
+        storm_logger.propagate = False
+        storm_logger.addHandler(handler)
+        try:
+            start = time.perf_counter()
+            for _ in range(n_records):
+                storm_logger.warning("Surface %s not found", "top_reek")
+            elapsed = time.perf_counter() - start
+            handler.flush()
+        finally:
+            storm_logger.removeHandler(handler)
+        return elapsed / n_records, message_log.messages
+
+    unlimited, sent_all = _storm()
+    limited, sent = _storm(dedup_window=60, rate_limit=10)
+    print(
+        f"log storm: {unlimited * 1e6:.1f} us per record sending all, "
+        f"{limited * 1e6:.1f} us with dedup, {len(sent)} records sent"
+    )
+    assert len(sent_all) == n_records
+    assert sent == [
+        "Surface top_reek not found",
+        f"Surface top_reek not found (repeated {n_records - 1} times in 60 s)",
+    ]
+
+
+def test_verified_upload_single_pass():
+    size = 64 << 20
+    block_size = 8 << 20
+    payload = bytearray(os.urandom(size))
+    blocks = []
+    committed = []
+
+    def _md5(data):
+        return base64.b64encode(hashlib.md5(data).digest()).decode()
+
+    class _Transport(httpx.BaseTransport):
+        # Check block checksums like blob storage, without keeping the data
+        def handle_request(self, request):
+            params = request.url.params
+            if params.get("comp") == "blocklist":
+                request.read()
+                committed.append(request.headers["x-ms-blob-content-md5"])
+                return httpx.Response(201)
+            md5 = hashlib.md5()
+            for chunk in request.stream:
+                md5.update(chunk)
+            if params.get("comp") == "block":
+                digest = base64.b64encode(md5.digest()).decode()
+                if digest != request.headers["content-md5"]:
+                    return httpx.Response(400)
+                blocks.append(params["blockid"])
+            return httpx.Response(201)
+
+    with httpx.Client(transport=_Transport()) as client:
+        blob_client = BlobClient(
+            client, None, 30, RetryStrategy(), block_size=block_size
+        )
+        url = "https://blob.example/x"
+
+        start = time.perf_counter()
+        blob_client.upload_blob(payload, url)
+        unverified = time.perf_counter() - start
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        blob_client.upload_blob(payload, url, verify=True)
+        verified = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(
+        f"upload of {size >> 20} MB: {unverified:.2f} s, "
+        f"{verified:.2f} s with MD5 checksums, peak {peak >> 20} MB"
+    )
+    assert len(blocks) == size // block_size
+    assert committed == [_md5(payload)]
+    assert peak < 4 * DEFAULT_CHUNK_SIZE
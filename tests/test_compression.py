@@ -0,0 +1,73 @@
+"""Offline tests of compressed JSON request bodies"""
+
+import gzip
+import json
+
+import httpx
+import pytest
+
+from sumo.wrapper._compression import available_encodings, resolve_encoding
+
+LARGE = {"hits": [{"realization": i, "name": "surface"} for i in range(200)]}
+SMALL = {"name": "surface"}
+
+
+class _Server:
+    """Handler recording the encoding and decoded body of requests."""
+
+    def __init__(self):
+        self.bodies = []
+
+    def __call__(self, request):
+        encoding = request.headers.get("Content-Encoding")
+        body = request.read()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        self.bodies.append((request.method, encoding, json.loads(body)))
+        return httpx.Response(200, json={})
+
+
+@pytest.mark.parametrize("method", ["post", "put"])
+def test_large_body_is_compressed(offline_client, method):
+    server = _Server()
+    sumo = offline_client(server, compression="gzip")
+
+    getattr(sumo, method)("/objects", json=LARGE)
+
+    assert server.bodies == [(method.upper(), "gzip", LARGE)]
+
+
+@pytest.mark.parametrize("method", ["post", "put"])
+def test_small_body_is_sent_as_is(offline_client, method):
+    server = _Server()
+    sumo = offline_client(server, compression="gzip")
+
+    getattr(sumo, method)("/objects", json=SMALL)
+
+    assert server.bodies == [(method.upper(), None, SMALL)]
+
+
+def test_threshold_is_configurable(offline_client):
+    server = _Server()
+    sumo = offline_client(server, compression="gzip", compression_threshold=1)
+
+    sumo.post("/objects", json=SMALL)
+
+    assert server.bodies == [("POST", "gzip", SMALL)]
+
+
+def test_no_compression_by_default(offline_client):
+    server = _Server()
+    sumo = offline_client(server)
+
+    sumo.post("/objects", json=LARGE)
+
+    assert server.bodies == [("POST", None, LARGE)]
+
+
+def test_resolve_encoding():
+    assert resolve_encoding(None) is None
+    assert resolve_encoding("gzip") == "gzip"
+    assert resolve_encoding("auto") == available_encodings()[0]
+    with pytest.raises(ValueError):
+        resolve_encoding("deflate")
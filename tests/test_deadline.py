@@ -0,0 +1,116 @@
+"""Offline tests of overall deadlines for calls"""
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from sumo.wrapper import DeadlineExceeded, RetryStrategy, deadline
+from sumo.wrapper._deadline import attempt_timeout, current_deadline
+from sumo.wrapper._pipeline import Call
+
+
+def test_deadline_stops_retry_loop(offline_client):
+    attempts = []
+
+    def _unavailable(request):
+        attempts.append(time.monotonic())
+        return httpx.Response(503)
+
+    sumo = offline_client(
+        _unavailable, retry_strategy=RetryStrategy(stop_after=20)
+    )
+
+    start = time.monotonic()
+    with pytest.raises(httpx.HTTPStatusError):
+        sumo.get("/x", deadline=1.0)
+    elapsed = time.monotonic() - start
+
+    # Without the deadline, 20 attempts would take minutes
+    assert 1 <= len(attempts) < 20
+    assert elapsed < 2.0
+
+
+def test_attempt_timeout_raises_when_expired():
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            attempt_timeout(30.0)
+
+
+def test_attempt_timeout_is_capped():
+    with deadline(5):
+        timeout = attempt_timeout(30.0)
+    assert timeout.read <= 5
+    assert attempt_timeout(30.0) == 30.0
+
+
+def test_expired_deadline_fails_call(offline_client):
+    requests = []
+    sumo = offline_client(
+        lambda request: requests.append(request) or httpx.Response(200)
+    )
+
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            sumo.get("/x")
+    assert requests == []
+
+
+def test_nested_deadline_cannot_extend():
+    with deadline(1) as outer:
+        with deadline(60) as inner:
+            assert inner is outer
+            assert current_deadline().remaining() <= 1
+        with deadline(0.5) as shorter:
+            assert shorter.expires_at < outer.expires_at
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_call_deadline_inside_shorter_scope(offline_client):
+    sumo = offline_client(lambda request: httpx.Response(200))
+
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            sumo.get("/x", deadline=60)
+
+
+def test_deadline_reaches_get_many_threads(offline_client):
+    threads = set()
+
+    def _handle(request):
+        threads.add(threading.get_ident())
+        return httpx.Response(200)
+
+    sumo = offline_client(_handle)
+
+    assert len(sumo.get_many(["/a", "/b"])) == 2
+    with deadline(0.01):
+        time.sleep(0.02)
+        results = sumo.get_many(["/a", "/b", "/c"], return_exceptions=True)
+
+    assert all(isinstance(result, DeadlineExceeded) for result in results)
+    assert threading.get_ident() not in threads
+
+
+def test_expired_deadline_skips_token_refresh(offline_client):
+    refreshes = []
+    sumo = offline_client(lambda request: httpx.Response(200))
+    get_authorization = sumo.auth.get_authorization
+    sumo.auth.get_authorization = lambda: (
+        refreshes.append(time.monotonic()) or get_authorization()
+    )
+
+    sumo.get("/x", deadline=5)
+    with deadline(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded):
+            sumo.pipeline.send(
+                Call("GET", "https://sumo.example/api/v1/x"), sumo._send
+            )
+
+    assert len(refreshes) == 1
@@ -0,0 +1,260 @@
+"""Offline tests of blob downloads into buffers, of multi-object blob
+fetches and of verifying downloads"""
+
+import asyncio
+import os
+import re
+import time
+
+import httpx
+import pytest
+
+from sumo.wrapper import ChecksumMismatchError
+from sumo.wrapper._hashing import md5_base64
+
+OBJECT_IDS = [f"00000000-0000-4000-8000-00000000000{i}" for i in range(4)]
+MISSING_ID = "00000000-0000-4000-8000-0000000000ff"
+
+
+def _object_id(request):
+    return re.search(r"objects\('([^']+)'\)", request.url.path).group(1)
+
+
+def _blob(object_id):
+    return f"blob of {object_id}".encode()
+
+
+def _blobs(request):
+    """Handler serving each object's blob; later objects in OBJECT_IDS
+    are served first."""
+    object_id = _object_id(request)
+    if object_id == MISSING_ID:
+        return httpx.Response(404)
+    time.sleep(0.01 * (len(OBJECT_IDS) - OBJECT_IDS.index(object_id)))
+    return httpx.Response(200, content=_blob(object_id))
+
+
+def _chunked(body):
+    """Handler serving body without a Content-Length."""
+
+    def _handle(request):
+        return httpx.Response(200, content=iter([body[:3], body[3:]]))
+
+    return _handle
+
+
+def _chunked_async(body):
+    """Async handler serving body without a Content-Length."""
+
+    async def _chunks():
+        yield body[:3]
+        yield body[3:]
+
+    async def _handle(request):
+        return httpx.Response(200, content=_chunks())
+
+    return _handle
+
+
+def test_read_blob_into_slice_of_buffer(offline_client):
+    sumo = offline_client(_blobs)
+    size = len(_blob(OBJECT_IDS[0]))
+    stack = bytearray(2 * size)
+    view = memoryview(stack)
+
+    for i, object_id in enumerate(OBJECT_IDS[:2]):
+        assert sumo.read_blob_into(object_id, view[i * size :][:size]) == size
+
+    assert stack == _blob(OBJECT_IDS[0]) + _blob(OBJECT_IDS[1])
+
+
+def test_read_blob_into_follows_redirect(offline_client):
+    def _handle(request):
+        if request.url.host == "blob.example":
+            return httpx.Response(200, content=b"blob")
+        return httpx.Response(
+            302, headers={"Location": "https://blob.example/c/b?sig=s"}
+        )
+
+    sumo = offline_client(_handle)
+    buffer = bytearray(4)
+
+    sumo.read_blob_into(OBJECT_IDS[0], buffer)
+
+    assert buffer == b"blob"
+
+
+@pytest.mark.parametrize("size", [3, 5])
+def test_read_blob_into_size_mismatch(offline_client, size):
+    requests = []
+
+    def _handle(request):
+        requests.append(request)
+        return httpx.Response(200, content=b"blob")
+
+    sumo = offline_client(_handle)
+
+    with pytest.raises(ValueError, match="4 bytes"):
+        sumo.read_blob_into(OBJECT_IDS[0], bytearray(size))
+    # Not retried
+    assert len(requests) == 1
+
+
+@pytest.mark.parametrize("size", [4, 8])
+def test_read_blob_into_size_mismatch_without_length(offline_client, size):
+    sumo = offline_client(_chunked(b"blob body"))
+
+    with pytest.raises(ValueError):
+        sumo.read_blob_into(OBJECT_IDS[0], bytearray(size))
+
+
+def test_read_blob_into_error_status(offline_client):
+    sumo = offline_client(_blobs)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        sumo.read_blob_into(MISSING_ID, bytearray(4))
+
+
+def test_read_blob_into_async(offline_client):
+    sumo = offline_client(_chunked_async(b"blob body"))
+    buffer = bytearray(9)
+
+    size = asyncio.run(sumo.read_blob_into_async(OBJECT_IDS[0], buffer))
+
+    assert size == 9
+    assert buffer == b"blob body"
+    with pytest.raises(ValueError):
+        asyncio.run(sumo.read_blob_into_async(OBJECT_IDS[0], bytearray(4)))
+
+
+def test_get_blobs_in_input_order(offline_client):
+    sumo = offline_client(_blobs)
+
+    pairs = list(sumo.get_blobs(OBJECT_IDS))
+
+    assert pairs == [(object_id, _blob(object_id)) for object_id in OBJECT_IDS]
+
+
+def test_get_blobs_unordered(offline_client):
+    sumo = offline_client(_blobs)
+
+    pairs = list(sumo.get_blobs(OBJECT_IDS, ordered=False))
+
+    assert sorted(pairs) == sorted(
+        (object_id, _blob(object_id)) for object_id in OBJECT_IDS
+    )
+
+
+def test_get_blobs_return_exceptions(offline_client):
+    sumo = offline_client(_blobs)
+
+    pairs = list(
+        sumo.get_blobs(
+            [OBJECT_IDS[0], MISSING_ID, OBJECT_IDS[1]], return_exceptions=True
+        )
+    )
+
+    assert [object_id for object_id, _ in pairs] == [
+        OBJECT_IDS[0],
+        MISSING_ID,
+        OBJECT_IDS[1],
+    ]
+    assert isinstance(pairs[1][1], httpx.HTTPStatusError)
+
+
+def test_get_blobs_to_directory(offline_client, tmp_path):
+    sumo = offline_client(_blobs)
+
+    pairs = list(sumo.get_blobs(OBJECT_IDS, directory=str(tmp_path)))
+
+    assert [object_id for object_id, _ in pairs] == OBJECT_IDS
+    for object_id, path in pairs:
+        assert path == os.path.join(str(tmp_path), object_id)
+        with open(path, "rb") as f:
+            assert f.read() == _blob(object_id)
+
+
+def test_get_blobs_async(offline_client, tmp_path):
+    sumo = offline_client(_blobs)
+
+    async def _fetch(**kwargs):
+        return [pair async for pair in sumo.get_blobs_async(**kwargs)]
+
+    pairs = asyncio.run(_fetch(object_ids=OBJECT_IDS))
+    files = asyncio.run(_fetch(object_ids=OBJECT_IDS, directory=str(tmp_path)))
+
+    assert pairs == [(object_id, _blob(object_id)) for object_id in OBJECT_IDS]
+    assert [object_id for object_id, _ in files] == OBJECT_IDS
+    for object_id, path in files:
+        with open(path, "rb") as f:
+            assert f.read() == _blob(object_id)
+
+
+def _stored_md5(md5):
+    """Handler serving blobs with the given Content-MD5, recording the
+    requests."""
+    requests = []
+
+    def _handle(request):
+        requests.append(request)
+        blob = _blob(_object_id(request))
+        return httpx.Response(
+            200, headers={"Content-MD5": md5 or md5_base64(blob)}, content=blob
+        )
+
+    return _handle, requests
+
+
+def test_verified_download_matches(offline_client):
+    handler, _ = _stored_md5(None)
+    sumo = offline_client(handler)
+    buffer = bytearray(len(_blob(OBJECT_IDS[0])))
+
+    sumo.read_blob_into(OBJECT_IDS[0], buffer, verify=True)
+
+    assert buffer == _blob(OBJECT_IDS[0])
+
+
+def test_verified_download_mismatch(offline_client):
+    handler, requests = _stored_md5(md5_base64(b"other"))
+    sumo = offline_client(handler)
+    buffer = bytearray(len(_blob(OBJECT_IDS[0])))
+
+    with pytest.raises(ChecksumMismatchError):
+        sumo.read_blob_into(OBJECT_IDS[0], buffer, verify=True)
+    # Not retried
+    assert len(requests) == 1
+    # Not checked without verify
+    sumo.read_blob_into(OBJECT_IDS[0], buffer)
+
+
+def test_verified_download_mismatch_aborts_writer(offline_client, tmp_path):
+    handler, _ = _stored_md5(md5_base64(b"other"))
+    sumo = offline_client(handler)
+
+    with pytest.raises(ChecksumMismatchError):
+        list(
+            sumo.get_blobs(
+                OBJECT_IDS[:1], directory=str(tmp_path), verify=True
+            )
+        )
+
+    # Neither the file nor the partial download is left behind
+    assert os.listdir(tmp_path) == []
+
+
+def test_verified_download_async(offline_client):
+    good, _ = _stored_md5(None)
+    bad, _ = _stored_md5(md5_base64(b"other"))
+    size = len(_blob(OBJECT_IDS[0]))
+
+    async def _read(handler):
+        buffer = bytearray(size)
+        await offline_client(handler).read_blob_into_async(
+            OBJECT_IDS[0], buffer, verify=True
+        )
+        return buffer
+
+    assert asyncio.run(_read(good)) == _blob(OBJECT_IDS[0])
+    with pytest.raises(ChecksumMismatchError):
+        asyncio.run(_read(bad))
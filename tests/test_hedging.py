@@ -0,0 +1,124 @@
+"""Offline tests of hedged async requests"""
+
+import asyncio
+
+import httpx
+
+from sumo.wrapper import HedgePolicy
+
+
+class _Requests:
+    """Coroutine function whose first call is slow and later calls fast,
+    recording calls that were cancelled."""
+
+    def __init__(self, slow=5.0, fast=0.0):
+        self.slow = slow
+        self.fast = fast
+        self.calls = 0
+        self.cancelled = []
+
+    async def __call__(self):
+        number = self.calls
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.slow if number == 0 else self.fast)
+        except asyncio.CancelledError:
+            self.cancelled.append(number)
+            raise
+        return number
+
+
+def test_slow_request_is_hedged():
+    policy = HedgePolicy(initial_delay=0.02, budget=1.0)
+    request = _Requests()
+
+    result = asyncio.run(policy.run(request))
+
+    assert result == 1
+    assert request.cancelled == [0]
+    assert policy.stats() == {
+        "requests": 1,
+        "hedges_fired": 1,
+        "hedges_won": 1,
+        "hedges_denied": 0,
+    }
+
+
+def test_fast_request_is_not_hedged():
+    policy = HedgePolicy(initial_delay=1.0, budget=1.0)
+    request = _Requests(slow=0.0)
+
+    assert asyncio.run(policy.run(request)) == 0
+    assert request.calls == 1
+    assert policy.hedges_fired == 0
+
+
+def test_hedges_are_limited_by_budget():
+    policy = HedgePolicy(initial_delay=0.01, budget=0.5)
+
+    async def _run():
+        for _ in range(4):
+            await policy.run(_Requests(slow=0.2))
+
+    asyncio.run(_run())
+
+    # At most budget x requests hedges, counted as requests arrive
+    assert policy.hedges_fired == 2
+    assert policy.hedges_denied == 2
+    assert policy.requests == 4
+
+
+def test_cancelling_caller_cancels_hedges():
+    policy = HedgePolicy(initial_delay=0.01, budget=1.0)
+    request = _Requests(slow=5.0, fast=5.0)
+
+    async def _run():
+        task = asyncio.create_task(policy.run(request))
+        while request.calls < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(_run())
+    assert sorted(request.cancelled) == [0, 1]
+
+
+def test_delay_follows_observed_latencies():
+    policy = HedgePolicy(
+        percentile=50, min_delay=0.01, max_delay=1.0, min_samples=4
+    )
+    assert policy.delay() == 0.5
+    for latency in (0.1, 0.2, 0.3, 0.4):
+        policy._observe(latency)
+    assert policy.delay() == 0.3
+    for _ in range(10):
+        policy._observe(5.0)
+    assert policy.delay() == 1.0
+
+
+def test_get_async_is_hedged(offline_client):
+    calls = []
+
+    async def _handle(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"attempt": len(calls)})
+
+    policy = HedgePolicy(initial_delay=0.02, budget=1.0)
+    sumo = offline_client(_handle, hedge_policy=policy)
+
+    async def _run():
+        hedged = await sumo.get_async("/x")
+        unhedged = await sumo.get_async("/y", hedge=False)
+        return hedged, unhedged
+
+    hedged, unhedged = asyncio.run(_run())
+
+    assert hedged.json() == {"attempt": 2}
+    assert unhedged.json() == {"attempt": 3}
+    assert policy.hedges_fired == 1
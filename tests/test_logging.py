@@ -0,0 +1,72 @@
+"""Tests of sampling records in LogHandlerSumo"""
+
+import itertools
+import logging
+
+from sumo.wrapper import _logging
+from sumo.wrapper._logging import LogHandlerSumo
+
+
+class _Sumo:
+    """Stand-in for SumoClient, collecting the messages posted."""
+
+    def __init__(self):
+        self.messages = []
+
+    def post(self, path, json):
+        self.messages.append((json["severity"], json["message"]))
+
+
+def _log(handler, levels):
+    logger = logging.getLogger("test.sampling")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    try:
+        for i, level in enumerate(levels):
+            logger.log(level, f"record {i}")
+    finally:
+        logger.removeHandler(handler)
+
+
+def test_rates_of_zero_and_one_drop_or_keep_all():
+    sumo = _Sumo()
+    handler = LogHandlerSumo(
+        sumo, sample_rates={"DEBUG": 0, "INFO": 1, logging.WARNING: 0.0}
+    )
+
+    _log(
+        handler,
+        [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR] * 5,
+    )
+
+    # Levels without a rate are always kept
+    assert [severity for severity, _ in sumo.messages] == [
+        "INFO",
+        "ERROR",
+    ] * 5
+
+
+def test_fraction_of_records_kept(monkeypatch):
+    sumo = _Sumo()
+    handler = LogHandlerSumo(sumo, sample_rates={"INFO": 0.5})
+    draws = itertools.cycle([0.1, 0.6, 0.49, 0.5])
+    monkeypatch.setattr(_logging.random, "random", lambda: next(draws))
+
+    _log(handler, [logging.INFO] * 8)
+
+    # Kept when the draw is below the rate
+    assert [message for _, message in sumo.messages] == [
+        "record 0",
+        "record 2",
+        "record 4",
+        "record 6",
+    ]
+
+
+def test_no_sampling_by_default():
+    sumo = _Sumo()
+
+    _log(LogHandlerSumo(sumo), [logging.DEBUG, logging.INFO] * 3)
+
+    assert len(sumo.messages) == 6
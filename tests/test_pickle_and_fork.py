@@ -0,0 +1,272 @@
+"""Offline tests of pickling SumoClient and using it after fork"""
+
+import os
+import pickle
+import types
+
+import httpx
+import pytest
+import requests
+from conftest import OFFLINE_WELL_KNOWN, offline_token
+
+from sumo.wrapper import (
+    HedgePolicy,
+    Middleware,
+    PriorityScheduler,
+    SumoClient,
+    sumo_client,
+)
+from sumo.wrapper._auth_provider import (
+    AuthProvider,
+    AuthProviderAccessToken,
+    AuthProviderReplay,
+)
+from sumo.wrapper._recording import (
+    AsyncReplayTransport,
+    Recorder,
+    RecordingTransport,
+    Replayer,
+    ReplayTransport,
+)
+
+needs_fork = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="os.fork is not available"
+)
+
+
+class _Tag(Middleware):
+    def __init__(self, tag):
+        self.tag = tag
+
+    def handle(self, call, call_next):
+        call.headers["X-Tag"] = self.tag
+        return call_next(call)
+
+
+def _in_child(check):
+    """Run check() in a forked child; return whether it returned True."""
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            ok = check()
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status) == 0
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """A recording with two responses to GET /x."""
+    path = str(tmp_path / "session.rec.gz")
+    recorder = Recorder(path)
+    recorder.record_json("GET", sumo_client.WELL_KNOWN, OFFLINE_WELL_KNOWN)
+    for n in range(2):
+        recorder.record_json("GET", "https://sumo.example/api/v1/x", {"n": n})
+    return path
+
+
+def test_pickle_round_trip(offline_client):
+    sumo = offline_client(timeout=12.0, compression="gzip")
+
+    copy = pickle.loads(pickle.dumps(sumo))
+
+    # Set up lazily, on first use
+    assert "_pending_spec" in copy.__dict__
+    assert copy.base_url == sumo.base_url
+    assert "_pending_spec" not in copy.__dict__
+    assert copy.env == "dev"
+    assert copy._timeout == 12.0
+    assert copy._compression == "gzip"
+    assert copy.auth.get_token() == sumo.auth.get_token()
+
+
+def test_pickle_keeps_middleware_and_scheduler(offline_client):
+    scheduler = PriorityScheduler(max_concurrency=3, weights={"export": 2})
+    sumo = offline_client(middleware=[_Tag("a")], scheduler=scheduler)
+
+    copy = pickle.loads(pickle.dumps(sumo))
+
+    assert [m.tag for m in copy._middleware] == ["a"]
+    assert [m.tag for m in copy.pipeline if isinstance(m, _Tag)] == ["a"]
+    assert copy.scheduler._max_concurrency == 3
+    assert copy.scheduler._weights["export"] == 2
+    # Pickling again before first use
+    again = pickle.loads(pickle.dumps(pickle.loads(pickle.dumps(sumo))))
+    assert [m.tag for m in again._middleware] == ["a"]
+
+
+def test_pickle_keeps_hedge_policy(offline_client):
+    policy = HedgePolicy(percentile=90, initial_delay=0.2, window=50)
+    policy._observe(0.1)
+    sumo = offline_client(hedge_policy=policy)
+
+    copy = pickle.loads(pickle.dumps(sumo))
+
+    assert copy.hedge_policy._percentile == 90
+    assert copy.hedge_policy._initial_delay == 0.2
+    assert copy.hedge_policy._latencies.maxlen == 50
+    # Observed latencies are not carried over
+    assert len(copy.hedge_policy._latencies) == 0
+    assert copy.hedge_policy.delay() == 0.2
+
+
+def test_pickle_refuses_changed_pipeline(offline_client):
+    sumo = offline_client()
+    sumo.pipeline.append(_Tag("late"))
+
+    with pytest.raises(TypeError, match="middleware="):
+        pickle.dumps(sumo)
+
+
+def test_unpickled_client_retries_failed_setup(offline_client, monkeypatch):
+    copy = pickle.loads(pickle.dumps(offline_client()))
+    get_auth_provider = sumo_client.get_auth_provider
+
+    def _failing(**kwargs):
+        monkeypatch.setattr(
+            sumo_client, "get_auth_provider", get_auth_provider
+        )
+        raise OSError("token cache unavailable")
+
+    monkeypatch.setattr(sumo_client, "get_auth_provider", _failing)
+
+    with pytest.raises(OSError):
+        _ = copy.auth
+    # The spec is kept, so the next access sets the client up
+    assert copy.auth is not None
+    assert copy.base_url == "https://sumo.example/api/v1"
+
+
+def test_unpickled_client_missing_attribute(offline_client):
+    copy = pickle.loads(pickle.dumps(offline_client()))
+
+    with pytest.raises(AttributeError):
+        _ = copy.no_such_attribute
+    assert copy.env == "dev"
+
+
+@needs_fork
+def test_fork_replaces_connection_pools(offline_client):
+    sumo = offline_client()
+    client, async_client = sumo._client, sumo._async_client
+
+    assert _in_child(
+        lambda: (
+            sumo._client is not client
+            and sumo._async_client is not async_client
+        )
+    )
+    assert sumo._client is client
+    assert sumo._async_client is async_client
+
+
+@needs_fork
+def test_fork_resets_every_token_client(offline_client):
+    # Token clients have no MSAL application to reset
+    clients = [offline_client(), offline_client()]
+    pools = [sumo._client for sumo in clients]
+
+    assert _in_child(
+        lambda: all(
+            sumo._client is not pool
+            for sumo, pool in zip(clients, pools, strict=True)
+        )
+    )
+
+
+@needs_fork
+def test_fork_resets_clients_after_failing_one(offline_client, monkeypatch):
+    failing, sumo = offline_client(), offline_client()
+    client = sumo._client
+
+    def _fail():
+        raise RuntimeError("reset failed")
+
+    monkeypatch.setattr(failing, "_reset_after_fork", _fail)
+
+    assert _in_child(lambda: sumo._client is not client)
+
+
+@needs_fork
+def test_fork_keeps_borrowed_clients(offline_client):
+    sumo = offline_client(lambda request: httpx.Response(200))
+    client = sumo._client
+
+    assert _in_child(lambda: sumo._client is client)
+
+
+@needs_fork
+def test_fork_resets_msal_session(offline_client):
+    sumo = offline_client()
+    session = requests.Session()
+    adapter = session.get_adapter("https://login.example/")
+    sumo.auth._app = types.SimpleNamespace(
+        http_client=types.SimpleNamespace(http_client=session)
+    )
+
+    assert _in_child(
+        lambda: session.get_adapter("https://login.example/") is not adapter
+    )
+    assert session.get_adapter("https://login.example/") is adapter
+
+
+def test_unpickled_client_replays(recording):
+    sumo = SumoClient(env="dev", replay_from=recording)
+    assert sumo.get("/x").json() == {"n": 0}
+
+    copy = pickle.loads(pickle.dumps(sumo))
+
+    assert isinstance(copy._client._transport, ReplayTransport)
+    assert isinstance(copy.auth, AuthProviderReplay)
+    # From the start of the recording
+    assert copy.get("/x").json() == {"n": 0}
+    assert sumo.get("/x").json() == {"n": 1}
+
+
+def test_unpickled_client_keeps_recording(offline_client, tmp_path):
+    path = str(tmp_path / "session.rec.gz")
+    sumo = offline_client(record_to=path)
+
+    copy = pickle.loads(pickle.dumps(sumo))
+
+    assert isinstance(copy._client._transport, RecordingTransport)
+    assert copy._recorder.path == path
+    # Appends to the recording instead of starting over
+    assert len(Replayer(path)._entries) == 1
+
+
+@needs_fork
+def test_fork_keeps_replaying(recording):
+    sumo = SumoClient(env="dev", replay_from=recording)
+    client = sumo._client
+
+    assert _in_child(
+        lambda: (
+            sumo._client is not client
+            and isinstance(sumo._client._transport, ReplayTransport)
+            and isinstance(sumo._async_client._transport, AsyncReplayTransport)
+            and sumo.get("/x").json() == {"n": 0}
+        )
+    )
+
+
+@needs_fork
+def test_fork_keeps_recording(offline_client, tmp_path):
+    path = str(tmp_path / "session.rec.gz")
+    sumo = offline_client(record_to=path)
+    transport = sumo._client._transport
+
+    assert _in_child(
+        lambda: (
+            isinstance(sumo._client._transport, RecordingTransport)
+            and sumo._client._transport is not transport
+        )
+    )
+
+
+def test_reset_after_fork_without_msal():
+    # Providers without an MSAL application have nothing to reset
+    AuthProvider("api://sumo").reset_after_fork()
+    AuthProviderAccessToken(offline_token()).reset_after_fork()
@@ -0,0 +1,307 @@
+"""Offline tests of the request pipeline"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from sumo.wrapper import Middleware, PriorityScheduler, RetryStrategy
+from sumo.wrapper._pipeline import Call, Pipeline, RaiseForStatus, Retry
+
+OBJECT_ID = "00000000-0000-4000-8000-000000000001"
+SEARCH = {"hits": {"hits": [{"_id": "a"}, {"_id": "b"}]}}
+
+_no_wait = RetryStrategy(stop_after=3, multiplier=0)
+
+
+class _Calls(Middleware):
+    """Record the calls passing through the pipeline."""
+
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, call, call_next):
+        self.calls.append((call.method, call.url, call.stream))
+        return call_next(call)
+
+    async def handle_async(self, call, call_next):
+        self.calls.append((call.method, call.url, call.stream))
+        return await call_next(call)
+
+
+class _Trace(Middleware):
+    """Record entering and leaving the middleware in a shared list."""
+
+    def __init__(self, name, trace):
+        self.name = name
+        self.trace = trace
+
+    def handle(self, call, call_next):
+        self.trace.append(f"> {self.name}")
+        response = call_next(call)
+        self.trace.append(f"< {self.name}")
+        return response
+
+
+def test_pipeline_runs_middleware_in_order():
+    request = httpx.Request("GET", "https://sumo.example/api/v1/x")
+    response = httpx.Response(200, request=request)
+    trace = []
+
+    def _send(call):
+        trace.append("send")
+        return response
+
+    pipeline = Pipeline(
+        [
+            RaiseForStatus(),
+            *(_Trace(name, trace) for name in "abc"),
+            Retry(RetryStrategy()),
+        ]
+    )
+
+    result = pipeline.send(Call("GET", str(request.url)), _send)
+
+    assert result is response
+    assert trace == ["> a", "> b", "> c", "send", "< c", "< b", "< a"]
+    # Plain Middleware passes calls through
+    assert Pipeline([Middleware()] * 3).send(Call("GET", "u"), _send) is (
+        response
+    )
+
+
+def _flaky(responses):
+    """Handler returning the given responses in turn, recording the
+    requests."""
+    requests = []
+    responses = iter(responses)
+
+    def _handle(request):
+        requests.append(request)
+        return next(responses)
+
+    return _handle, requests
+
+
+def test_stream_search_goes_through_pipeline(offline_client):
+    handler, requests = _flaky(
+        [httpx.Response(503), httpx.Response(200, json=SEARCH)]
+    )
+    middleware = _Calls()
+    sumo = offline_client(
+        handler, middleware=[middleware], retry_strategy=_no_wait
+    )
+
+    hits = list(sumo.stream_search(params={"$query": "x"}))
+
+    assert [hit["_id"] for hit in hits] == ["a", "b"]
+    # Retried after the user middleware, which sees the call once
+    assert len(requests) == 2
+    assert middleware.calls == [
+        ("GET", "https://sumo.example/api/v1/search", True)
+    ]
+    assert requests[-1].headers["Authorization"].startswith("Bearer ")
+
+
+def test_stream_search_error_body_is_read(offline_client):
+    handler, _ = _flaky([httpx.Response(404, text="no such index")])
+    sumo = offline_client(handler)
+
+    with pytest.raises(httpx.HTTPStatusError) as raised:
+        list(sumo.stream_search())
+
+    assert raised.value.response.text == "no such index"
+
+
+def test_read_blob_goes_through_pipeline(offline_client):
+    handler, requests = _flaky(
+        [httpx.Response(502), httpx.Response(200, content=b"blob")]
+    )
+    middleware = _Calls()
+    sumo = offline_client(
+        handler, middleware=[middleware], retry_strategy=_no_wait
+    )
+    buffer = bytearray(4)
+
+    assert sumo.read_blob_into(OBJECT_ID, buffer) == 4
+
+    assert buffer == b"blob"
+    assert len(requests) == 2
+    assert middleware.calls == [
+        (
+            "GET",
+            f"https://sumo.example/api/v1/objects('{OBJECT_ID}')/blob",
+            True,
+        )
+    ]
+
+
+def test_read_blob_retries_failure_while_reading(offline_client):
+    attempts = []
+
+    def _body():
+        yield b"bl"
+        if len(attempts) == 1:
+            raise httpx.ReadError("connection reset")
+        yield b"ob"
+
+    def _handle(request):
+        attempts.append(request)
+        return httpx.Response(200, content=_body())
+
+    sumo = offline_client(_handle, retry_strategy=_no_wait)
+    buffer = bytearray(4)
+
+    sumo.read_blob_into(OBJECT_ID, buffer)
+
+    assert buffer == b"blob"
+    assert len(attempts) == 2
+
+
+def test_async_streaming_goes_through_pipeline(offline_client):
+    def _handle(request):
+        if request.url.path.endswith("/search"):
+            return httpx.Response(200, content=json.dumps(SEARCH).encode())
+        return httpx.Response(200, content=b"blob")
+
+    middleware = _Calls()
+    sumo = offline_client(
+        _handle,
+        middleware=[middleware],
+        scheduler=PriorityScheduler(max_concurrency=1),
+    )
+
+    async def _run():
+        hits = [hit async for hit in sumo.stream_search_async()]
+        buffers = [bytearray(4), bytearray(4)]
+        await asyncio.gather(
+            *(sumo.read_blob_into_async(OBJECT_ID, b) for b in buffers)
+        )
+        return hits, buffers
+
+    hits, buffers = asyncio.run(_run())
+
+    assert [hit["_id"] for hit in hits] == ["a", "b"]
+    assert buffers == [b"blob", b"blob"]
+    assert [call[2] for call in middleware.calls] == [True] * 3
+
+
+CASE_ID = "00000000-0000-4000-8000-00000000000c"
+
+
+def _registration(request):
+    """Handler of a server with a bulk registration endpoint."""
+    if request.url.path.endswith("/bulk"):
+        lines = request.read().splitlines()
+        body = b"".join(
+            json.dumps({"objectid": f"obj{i}", "blob_url": "u"}).encode()
+            + b"\n"
+            for i in range(len(lines))
+        )
+        return httpx.Response(200, content=body)
+    return httpx.Response(200, json={"objectid": "single"})
+
+
+class _Priorities(Middleware):
+    def __init__(self):
+        self.priorities = []
+
+    async def handle_async(self, call, call_next):
+        self.priorities.append((call.url.rsplit("/", 1)[-1], call.priority))
+        return await call_next(call)
+
+
+def test_register_objects_goes_through_pipeline(offline_client):
+    middleware = _Calls()
+    sumo = offline_client(_registration, middleware=[middleware])
+
+    results = list(sumo.register_objects(CASE_ID, [{"a": 1}, {"a": 2}]))
+
+    assert [result["objectid"] for _, result in results] == ["obj0", "obj1"]
+    assert middleware.calls == [
+        (
+            "POST",
+            f"https://sumo.example/api/v1/objects('{CASE_ID}')/bulk",
+            True,
+        )
+    ]
+
+
+def test_register_objects_missing_parent_is_an_error(offline_client):
+    missing = "00000000-0000-4000-8000-0000000000ff"
+
+    def _handle(request):
+        if missing in request.url.path:
+            return httpx.Response(404)
+        return _registration(request)
+
+    sumo = offline_client(_handle)
+    list(sumo.register_objects(CASE_ID, [{"a": 1}]))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        list(sumo.register_objects(missing, [{"a": 1}]))
+    # Not taken to mean that the server has no bulk endpoint, as it has
+    # worked before
+    assert sumo._bulk_registration is True
+
+
+def test_register_objects_probes_bulk_route_once(offline_client):
+    requests = []
+
+    def _handle(request):
+        requests.append(request.url.path.rsplit("/", 1)[-1])
+        if request.url.path.endswith("/bulk"):
+            # A server without the route
+            return httpx.Response(404)
+        return httpx.Response(200, json={"objectid": "single"})
+
+    sumo = offline_client(_handle)
+
+    for _ in range(2):
+        results = list(sumo.register_objects(CASE_ID, [{"a": 1}]))
+        assert [result["objectid"] for _, result in results] == ["single"]
+
+    assert requests == [
+        "bulk",
+        f"objects('{CASE_ID}')",
+        f"objects('{CASE_ID}')",
+    ]
+    assert sumo._bulk_registration is False
+
+
+@pytest.mark.parametrize("status_code", [404, 405, 501])
+def test_register_objects_falls_back_per_object(offline_client, status_code):
+    def _handle(request):
+        if request.url.path.endswith("/bulk"):
+            return httpx.Response(status_code)
+        return httpx.Response(200, json={"objectid": "single"})
+
+    sumo = offline_client(_handle)
+
+    results = list(sumo.register_objects(CASE_ID, [{"a": 1}, {"a": 2}]))
+
+    assert [result["objectid"] for _, result in results] == ["single"] * 2
+    assert sumo._bulk_registration is False
+
+
+def test_register_objects_async_priority(offline_client):
+    middleware = _Priorities()
+    sumo = offline_client(
+        _registration,
+        middleware=[middleware],
+        scheduler=PriorityScheduler(max_concurrency=1),
+    )
+
+    async def _run():
+        return [
+            result
+            async for _, result in sumo.register_objects_async(
+                CASE_ID, [{"a": 1}], priority="interactive"
+            )
+        ]
+
+    results = asyncio.run(_run())
+
+    assert results == [{"objectid": "obj0", "blob_url": "u"}]
+    assert middleware.priorities == [("bulk", "interactive")]
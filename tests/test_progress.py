@@ -0,0 +1,171 @@
+"""Offline tests of progress reporting for blob transfers"""
+
+import logging
+import threading
+
+import httpx
+
+from sumo.wrapper import ProgressReporter, RetryStrategy, TransferMonitor
+from sumo.wrapper._progress import Progress, ProgressTracker
+
+OBJECT_ID = "00000000-0000-4000-8000-000000000000"
+BLOB_URL = "https://blob.example/c/b?sig=s"
+BLOB = bytes(range(256)) * 1024
+FAST_RETRIES = RetryStrategy(multiplier=0.001)
+
+
+def _upload_fails_once():
+    """Handler reading each upload body, answering the first with 503."""
+    attempts = []
+
+    def _handle(request):
+        attempts.append(len(request.read()))
+        return httpx.Response(503 if len(attempts) == 1 else 201)
+
+    return _handle, attempts
+
+
+def _download_breaks_once():
+    """Handler whose first blob response breaks off after one chunk."""
+    attempts = []
+
+    def _body(broken):
+        yield BLOB[: len(BLOB) // 2]
+        if broken:
+            raise httpx.ReadError("connection reset")
+        yield BLOB[len(BLOB) // 2 :]
+
+    def _handle(request):
+        attempts.append(request)
+        return httpx.Response(
+            200,
+            headers={"Content-Length": str(len(BLOB))},
+            content=_body(broken=len(attempts) == 1),
+        )
+
+    return _handle, attempts
+
+
+def test_tracker_reports_finish():
+    reports = []
+    tracker = ProgressTracker(reports.append, "blob", 10, interval=3600)
+
+    tracker.update(4)
+    tracker.update(6)
+    # Throttled until the transfer finishes
+    assert reports == []
+    tracker.finish()
+
+    [report] = reports
+    assert report.finished
+    assert (report.name, report.bytes_done, report.total) == ("blob", 10, 10)
+    assert report.fraction == 1.0
+
+
+def test_retried_upload_restarts_progress(offline_client):
+    handler, attempts = _upload_fails_once()
+    reports = []
+    sumo = offline_client(handler, retry_strategy=FAST_RETRIES)
+
+    response = sumo.blob_client.upload_blob(
+        bytearray(BLOB), BLOB_URL, progress=reports.append
+    )
+
+    assert response.status_code == 201
+    assert attempts == [len(BLOB), len(BLOB)]
+    # Counted from zero on the second attempt, not double-counted
+    assert reports[-1].finished
+    assert reports[-1].bytes_done == reports[-1].total == len(BLOB)
+    assert all(report.bytes_done <= len(BLOB) for report in reports)
+
+
+def test_retried_download_restarts_progress(offline_client):
+    handler, attempts = _download_breaks_once()
+    reports = []
+    sumo = offline_client(handler, retry_strategy=FAST_RETRIES)
+    buffer = bytearray(len(BLOB))
+
+    sumo.read_blob_into(OBJECT_ID, buffer, progress=reports.append)
+
+    assert len(attempts) == 2
+    assert buffer == BLOB
+    assert [report.finished for report in reports] == [False] * (
+        len(reports) - 1
+    ) + [True]
+    assert reports[-1].bytes_done == reports[-1].total == len(BLOB)
+
+
+def test_monitor_aggregates_concurrent_transfers():
+    reports = []
+    monitor = TransferMonitor(reports.append, interval=3600)
+    sizes = {f"blob{i}": 1000 * (i + 1) for i in range(4)}
+    # All transfers are under way before any finishes
+    started = threading.Barrier(len(sizes))
+
+    def _transfer(name, size):
+        tracker = ProgressTracker(monitor, name, size, interval=0)
+        for i in range(10):
+            tracker.update(size // 10)
+            if i == 0:
+                started.wait()
+        tracker.finish()
+
+    threads = [
+        threading.Thread(target=_transfer, args=item) for item in sizes.items()
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    totals = [report for report in reports if report.name == "total"]
+    # The first report starts the interval; the last is when all finish
+    assert totals[-1].finished
+    assert totals[-1].bytes_done == totals[-1].total == sum(sizes.values())
+    assert not any(report.finished for report in totals[:-1])
+    finished = {
+        report.name: report.bytes_done
+        for report in reports
+        if report.finished and report.name != "total"
+    }
+    assert finished == sizes
+    snapshot = monitor.snapshot()
+    assert snapshot.finished
+    assert snapshot.bytes_done == sum(sizes.values())
+
+
+def test_monitor_total_unknown_if_any_size_is():
+    monitor = TransferMonitor()
+    monitor(Progress("a", 5, 10, 0.0, 0.0, 0.0, True))
+    monitor(Progress("b", 5, None, 0.0, 0.0, 0.0, False))
+
+    snapshot = monitor.snapshot()
+
+    assert snapshot.bytes_done == 10
+    assert snapshot.total is None
+    assert not snapshot.finished
+
+
+def test_reporter_logs_line(caplog):
+    reporter = ProgressReporter()
+
+    with caplog.at_level(logging.INFO, logger="sumo.wrapper"):
+        reporter(
+            Progress("blob", 1 << 20, 4 << 20, 1 << 20, 1 << 19, 1.0, False)
+        )
+        reporter(Progress("blob", 4 << 20, None, 1 << 20, 1 << 20, 4.0, True))
+
+    assert caplog.messages == [
+        "blob: 1.0/4.0 MB (25%), 1.0 MB/s (avg 0.5 MB/s)",
+        "blob: 4.0 MB, 1.0 MB/s (avg 1.0 MB/s) done",
+    ]
+
+
+def test_reporter_prints_to_console(capsys):
+    ProgressReporter(console=True)(
+        Progress("blob", 0, 10 << 20, 0.0, 0.0, 0.0, False)
+    )
+
+    assert capsys.readouterr().out == (
+        "blob: 0.0/10.0 MB (0%), 0.0 MB/s (avg 0.0 MB/s)\n"
+    )
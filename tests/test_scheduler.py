@@ -0,0 +1,163 @@
+"""Tests of the priority scheduler for async requests"""
+
+import asyncio
+
+import pytest
+
+from sumo.wrapper import PriorityScheduler
+
+
+async def _grant_order(scheduler, priorities):
+    """Queue one request per priority behind a request holding the only
+    slot, then release it; return the priorities in the order they were
+    granted a slot."""
+    granted = []
+    hold = asyncio.Event()
+
+    async def _holder():
+        async with scheduler.slot("normal"):
+            await hold.wait()
+
+    async def _request(priority):
+        async with scheduler.slot(priority):
+            granted.append(priority)
+            await asyncio.sleep(0)
+
+    holder = asyncio.create_task(_holder())
+    await asyncio.sleep(0)
+    requests = [asyncio.create_task(_request(p)) for p in priorities]
+    await asyncio.sleep(0)
+    hold.set()
+    await asyncio.gather(holder, *requests)
+    return granted
+
+
+def test_backlogged_classes_share_by_weight():
+    granted = asyncio.run(
+        _grant_order(
+            PriorityScheduler(max_concurrency=1),
+            ["bulk"] * 9 + ["interactive"] * 9,
+        )
+    )
+
+    # Interactive requests queued after bulk ones go first, 8 to 1
+    assert granted[:9].count("interactive") == 8
+    assert granted[:9].count("bulk") == 1
+    assert granted[9:] == ["interactive"] + ["bulk"] * 8
+
+
+def test_custom_weights_are_merged_onto_defaults():
+    scheduler = PriorityScheduler(max_concurrency=1, weights={"export": 2})
+
+    granted = asyncio.run(
+        _grant_order(scheduler, ["export"] * 4 + ["bulk"] * 4)
+    )
+
+    assert granted[:6].count("export") == 4
+    assert granted[:6].count("bulk") == 2
+    assert scheduler._weights == {
+        "interactive": 8,
+        "normal": 4,
+        "bulk": 1,
+        "export": 2,
+    }
+
+
+def test_custom_weights_override_defaults():
+    granted = asyncio.run(
+        _grant_order(
+            PriorityScheduler(max_concurrency=1, weights={"bulk": 8}),
+            ["bulk"] * 4 + ["interactive"] * 4,
+        )
+    )
+
+    assert granted == ["interactive", "bulk"] * 4
+
+
+@pytest.mark.parametrize("weight", [0, -1])
+def test_non_positive_weight(weight):
+    with pytest.raises(ValueError):
+        PriorityScheduler(weights={"bulk": weight})
+
+
+def test_unknown_priority():
+    async def _run():
+        async with PriorityScheduler().slot("urgent"):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(_run())
+
+
+def test_class_limit_caps_concurrency():
+    scheduler = PriorityScheduler(max_concurrency=4, limits={"bulk": 1})
+    running = {"bulk": 0, "normal": 0}
+    peak = {"bulk": 0, "normal": 0}
+
+    async def _request(priority):
+        async with scheduler.slot(priority):
+            running[priority] += 1
+            peak[priority] = max(peak[priority], running[priority])
+            await asyncio.sleep(0.01)
+            running[priority] -= 1
+
+    async def _run():
+        await asyncio.gather(
+            *(_request("bulk") for _ in range(3)),
+            *(_request("normal") for _ in range(3)),
+        )
+
+    asyncio.run(_run())
+
+    # Bulk is capped; normal requests use the remaining slots
+    assert peak == {"bulk": 1, "normal": 3}
+    assert scheduler._running == 0
+
+
+def test_cancelled_waiter_releases_its_place():
+    scheduler = PriorityScheduler(max_concurrency=1)
+    granted = []
+
+    async def _request(name, hold=None):
+        async with scheduler.slot("normal"):
+            granted.append(name)
+            if hold is not None:
+                await hold.wait()
+
+    async def _run():
+        hold = asyncio.Event()
+        holder = asyncio.create_task(_request("holder", hold))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(_request("cancelled"))
+        waiting = asyncio.create_task(_request("waiting"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        hold.set()
+        await asyncio.gather(holder, waiting)
+        assert cancelled.cancelled()
+
+    asyncio.run(_run())
+
+    assert granted == ["holder", "waiting"]
+    assert scheduler._running == 0
+    assert not any(scheduler._waiters.values())
+
+
+def test_cancel_after_grant_releases_slot():
+    scheduler = PriorityScheduler(max_concurrency=1)
+
+    async def _run():
+        async with scheduler.slot("normal"):
+            waiter = asyncio.create_task(scheduler._acquire("bulk"))
+            await asyncio.sleep(0)
+        # The slot has been granted to the waiter, which has not run yet
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        async with scheduler.slot("interactive"):
+            pass
+
+    asyncio.run(asyncio.wait_for(_run(), timeout=5))
+
+    assert scheduler._running == 0
@@ -0,0 +1,156 @@
+"""Offline tests of the bounded async upload queue"""
+
+import asyncio
+import logging
+
+import httpx
+import pytest
+
+from sumo.wrapper import UploadQueue
+
+CASE_ID = "00000000-0000-4000-8000-00000000000c"
+
+
+class _Server:
+    """Async handler registering objects and accepting blob uploads.
+
+    Uploads to blobs whose name contains "fail" are refused; uploads to
+    blobs whose name contains "slow" only finish after a long delay.
+    """
+
+    def __init__(self, queue=None):
+        self.queue = queue
+        self.registered = []
+        self.uploaded = []
+        self.cancelled = []
+        self.peak_bytes = 0
+
+    async def __call__(self, request):
+        if request.method == "POST":
+            metadata = httpx.Response(200, content=request.read()).json()
+            name = metadata["file"]["relative_path"]
+            self.registered.append(name)
+            return httpx.Response(
+                200,
+                json={
+                    "objectid": f"id-{name}",
+                    "blob_url": f"https://blob.example/c/{name}?sig=secret",
+                },
+            )
+        name = request.url.path.rsplit("/", 1)[-1]
+        if self.queue is not None:
+            self.peak_bytes = max(self.peak_bytes, self.queue.bytes_in_flight)
+        if "fail" in name:
+            return httpx.Response(403)
+        try:
+            await asyncio.sleep(10 if "slow" in name else 0.01)
+        except asyncio.CancelledError:
+            self.cancelled.append(name)
+            raise
+        self.uploaded.append(name)
+        return httpx.Response(201)
+
+
+def _metadata(name):
+    return {"file": {"relative_path": name}}
+
+
+def test_put_object_registers_and_uploads(offline_client):
+    server = _Server()
+    sumo = offline_client(server)
+
+    async def _run():
+        async with UploadQueue(sumo) as queue:
+            for name in ("a", "b"):
+                await queue.put_object(CASE_ID, _metadata(name), b"blob")
+        return queue
+
+    queue = asyncio.run(_run())
+
+    assert sorted(server.registered) == ["a", "b"]
+    assert sorted(server.uploaded) == ["a", "b"]
+    assert queue.results == {"a": "id-a", "b": "id-b"}
+    assert queue.failures == []
+    assert queue.bytes_in_flight == 0
+
+
+def test_put_uploads_to_url(offline_client):
+    server = _Server()
+    sumo = offline_client(server)
+
+    async def _run():
+        async with UploadQueue(sumo) as queue:
+            await queue.put(b"blob", "https://blob.example/c/a?sig=s")
+        return queue
+
+    queue = asyncio.run(_run())
+
+    assert server.uploaded == ["a"]
+    assert [response.status_code for response in queue.results.values()] == [
+        201
+    ]
+
+
+def test_failures_are_collected(offline_client, caplog):
+    server = _Server()
+    sumo = offline_client(server)
+
+    async def _run():
+        queue = UploadQueue(sumo, max_workers=2)
+        for name in ("a", "fail1", "b", "fail2"):
+            await queue.put_object(CASE_ID, _metadata(name), b"blob")
+        return queue, await queue.join()
+
+    with caplog.at_level(logging.WARNING, logger="sumo.wrapper"):
+        queue, failures = asyncio.run(_run())
+
+    # Other uploads are not stopped by failures
+    assert sorted(server.uploaded) == ["a", "b"]
+    assert sorted(key for key, _ in failures) == ["fail1", "fail2"]
+    assert all(isinstance(ex, httpx.HTTPStatusError) for _, ex in failures)
+    assert failures == queue.failures
+    assert sorted(queue.results) == ["a", "b"]
+    # Reported without the pre-authorized URL
+    assert len(caplog.messages) == 2
+    assert not any("sig=" in message for message in caplog.messages)
+
+
+def test_error_in_block_cancels_uploads(offline_client):
+    server = _Server()
+    sumo = offline_client(server)
+
+    async def _run():
+        with pytest.raises(RuntimeError):
+            async with UploadQueue(sumo, max_workers=2) as queue:
+                for name in ("slow1", "slow2", "slow3"):
+                    await queue.put_object(CASE_ID, _metadata(name), b"blob")
+                while len(server.registered) < 2:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                raise RuntimeError("producer failed")
+        return queue
+
+    queue = asyncio.run(asyncio.wait_for(_run(), timeout=5))
+
+    assert sorted(server.cancelled) == ["slow1", "slow2"]
+    # The queued upload is dropped without being started
+    assert "slow3" not in server.registered
+    assert server.uploaded == []
+    assert queue.bytes_in_flight == 0
+
+
+def test_memory_budget_is_respected(offline_client):
+    server = _Server()
+    sumo = offline_client(server)
+
+    async def _run():
+        async with UploadQueue(sumo, max_bytes=10, max_workers=4) as queue:
+            server.queue = queue
+            for i in range(8):
+                await queue.put(bytes(4), f"https://blob.example/c/b{i}?s=s")
+                assert queue.bytes_in_flight <= 10
+
+    asyncio.run(_run())
+
+    assert len(server.uploaded) == 8
+    assert server.peak_bytes <= 10
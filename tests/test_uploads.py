@@ -0,0 +1,206 @@
+"""Offline tests of resumable object uploads and skipping unchanged
+blobs"""
+
+import asyncio
+import hashlib
+import json
+
+import httpx
+import pytest
+
+from sumo.wrapper import UploadJournal
+from sumo.wrapper._upload_journal import COMMITTED, REGISTERED
+
+CASE_ID = "00000000-0000-4000-8000-00000000000c"
+OLD_URL = "https://blob.example/c/old?sig=old"
+NEW_URL = "https://blob.example/c/new?sig=new"
+METADATA = {"file": {"relative_path": "surface.gri"}}
+
+
+class _Server:
+    """Handler registering objects, with new blob URLs, and accepting
+    blob uploads except to URLs in *expired*."""
+
+    def __init__(self, expired=()):
+        self.expired = set(expired)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append((request.method, str(request.url)))
+        if request.method == "POST":
+            return httpx.Response(
+                200, json={"objectid": "new-object", "blob_url": NEW_URL}
+            )
+        if str(request.url) in self.expired:
+            return httpx.Response(403)
+        return httpx.Response(201)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    with UploadJournal(str(tmp_path / "upload.journal")) as journal:
+        yield journal
+
+
+def test_upload_object_records_progress(offline_client, journal):
+    server = _Server()
+    sumo = offline_client(server)
+
+    object_id = sumo.upload_object(CASE_ID, METADATA, b"blob", journal)
+
+    assert object_id == "new-object"
+    assert [method for method, _ in server.requests] == ["POST", "PUT"]
+    assert journal.get("surface.gri") == {
+        "state": COMMITTED,
+        "object_id": "new-object",
+        "blob_url": NEW_URL,
+    }
+
+
+def test_upload_object_skips_committed(offline_client, journal):
+    server = _Server()
+    sumo = offline_client(server)
+    journal.record_registered("surface.gri", "old-object", OLD_URL)
+    journal.record_committed("surface.gri")
+
+    object_id = sumo.upload_object(CASE_ID, METADATA, b"blob", journal)
+
+    assert object_id == "old-object"
+    assert server.requests == []
+
+
+def test_upload_object_reuses_registered_url(offline_client, journal):
+    server = _Server()
+    sumo = offline_client(server)
+    journal.record_registered("surface.gri", "old-object", OLD_URL)
+
+    object_id = sumo.upload_object(CASE_ID, METADATA, b"blob", journal)
+
+    assert object_id == "old-object"
+    assert server.requests == [("PUT", OLD_URL)]
+    assert journal.get("surface.gri")["state"] == COMMITTED
+
+
+def test_upload_object_reregisters_on_expired_url(offline_client, journal):
+    server = _Server(expired=[OLD_URL])
+    sumo = offline_client(server)
+    journal.record_registered("surface.gri", "old-object", OLD_URL)
+
+    object_id = sumo.upload_object(CASE_ID, METADATA, b"blob", journal)
+
+    assert object_id == "new-object"
+    assert [method for method, _ in server.requests] == ["PUT", "POST", "PUT"]
+    assert server.requests[-1] == ("PUT", NEW_URL)
+    assert journal.get("surface.gri") == {
+        "state": COMMITTED,
+        "object_id": "new-object",
+        "blob_url": NEW_URL,
+    }
+
+
+def test_journal_tolerates_truncated_last_line(tmp_path):
+    path = tmp_path / "upload.journal"
+    registered = {
+        "key": "a",
+        "state": REGISTERED,
+        "object_id": "object-a",
+        "blob_url": OLD_URL,
+    }
+    # Interrupted while writing the record for b
+    path.write_text(json.dumps(registered) + '\n{"key": "b", "sta')
+
+    with UploadJournal(str(path)) as journal:
+        assert journal.get("a")["state"] == REGISTERED
+        assert journal.get("b") is None
+        journal.record_committed("a")
+
+    with UploadJournal(str(path)) as journal:
+        assert journal.get("a")["state"] == COMMITTED
+        assert journal.get("b") is None
+
+
+def test_upload_blob_skips_unchanged(offline_client, tmp_path):
+    server = _Server()
+    index = str(tmp_path / "hashes")
+    sumo = offline_client(server, hash_index=index)
+    blob_client = sumo.blob_client
+
+    first = blob_client.upload_blob(b"blob", OLD_URL, skip_unchanged=True)
+    # Same blob location with a fresh SAS token
+    again = blob_client.upload_blob(
+        b"blob", "https://blob.example/c/old?sig=fresh", skip_unchanged=True
+    )
+    changed = blob_client.upload_blob(b"BLOB", OLD_URL, skip_unchanged=True)
+
+    assert "skipped" not in first.extensions
+    assert again.status_code == 200
+    assert again.extensions["skipped"]
+    assert "skipped" not in changed.extensions
+    assert len(server.requests) == 2
+    assert sumo.upload_stats.skipped == 1
+    assert sumo.upload_stats.bytes_saved == 4
+    assert sumo.upload_stats.uploaded == 2
+
+
+def test_hash_index_persists(offline_client, tmp_path):
+    server = _Server()
+    index = str(tmp_path / "hashes")
+    offline_client(server, hash_index=index).blob_client.upload_blob(
+        b"blob", OLD_URL, skip_unchanged=True
+    )
+
+    sumo = offline_client(server, hash_index=index)
+    response = sumo.blob_client.upload_blob(
+        b"blob", OLD_URL, skip_unchanged=True
+    )
+
+    assert response.extensions["skipped"]
+    assert len(server.requests) == 1
+
+
+def test_upload_blob_skips_matching_checksum(offline_client):
+    server = _Server()
+    sumo = offline_client(server)
+
+    skipped = sumo.blob_client.upload_blob(
+        b"blob",
+        OLD_URL,
+        skip_unchanged=True,
+        checksum_md5=hashlib.md5(b"blob").hexdigest().upper(),
+    )
+    uploaded = sumo.blob_client.upload_blob(
+        b"blob", OLD_URL, skip_unchanged=True, checksum_md5="0" * 32
+    )
+
+    assert skipped.extensions["skipped"]
+    assert "skipped" not in uploaded.extensions
+    assert len(server.requests) == 1
+
+
+def test_upload_blob_without_skip_always_uploads(offline_client, tmp_path):
+    server = _Server()
+    sumo = offline_client(server, hash_index=str(tmp_path / "hashes"))
+
+    for _ in range(2):
+        sumo.blob_client.upload_blob(b"blob", OLD_URL)
+
+    assert len(server.requests) == 2
+
+
+def test_upload_blob_async_skips_unchanged(offline_client, tmp_path):
+    server = _Server()
+    sumo = offline_client(server, hash_index=str(tmp_path / "hashes"))
+
+    async def _upload():
+        return [
+            await sumo.blob_client.upload_blob_async(
+                b"blob", OLD_URL, skip_unchanged=True
+            )
+            for _ in range(2)
+        ]
+
+    first, again = asyncio.run(_upload())
+
+    assert "skipped" not in first.extensions
+    assert again.extensions["skipped"]
+    assert len(server.requests) == 1
@@ -0,0 +1,70 @@
+"""Offline tests of connection warm-up during authentication"""
+
+import pickle
+
+import httpx
+import pytest
+
+from sumo.wrapper import SumoClient
+
+
+class _Server:
+    """Handler recording requests, failing HEAD requests if asked to."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append((request.method, str(request.url)))
+        if request.method == "HEAD" and self.fail:
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(200, json={})
+
+
+def test_warm_up_sends_head_to_api(offline_client):
+    server = _Server()
+
+    sumo = offline_client(server, warm_up="sync")
+
+    assert server.requests == [("HEAD", "https://sumo.example/api/v1")]
+    assert sumo.warm_up_seconds is not None
+    assert sumo.warm_up_saved == min(sumo.warm_up_seconds, sumo.auth_seconds)
+
+
+def test_warm_up_failure_is_tolerated(offline_client):
+    server = _Server(fail=True)
+
+    sumo = offline_client(server, warm_up="sync")
+
+    assert sumo.warm_up_seconds is not None
+    assert sumo.get("/x").status_code == 200
+    assert [method for method, _ in server.requests] == ["HEAD", "GET"]
+
+
+def test_no_warm_up_by_default(offline_client):
+    server = _Server()
+
+    sumo = offline_client(server)
+
+    assert server.requests == []
+    assert sumo.warm_up_seconds is None
+    assert sumo.warm_up_saved is None
+
+
+def test_invalid_warm_up(offline_client):
+    with pytest.raises(ValueError):
+        offline_client(_Server(), warm_up="eager")
+
+
+def test_unpickled_client_does_not_warm_up(offline_client, monkeypatch):
+    sumo = offline_client(_Server(), warm_up="sync")
+    warm_ups = []
+    monkeypatch.setattr(
+        SumoClient, "_warm_up", lambda self: warm_ups.append(self)
+    )
+
+    copy = pickle.loads(pickle.dumps(sumo))
+
+    assert copy.warm_up_seconds is None
+    assert warm_ups == []